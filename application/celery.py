@@ -17,8 +17,28 @@ app.conf.broker_connection_retry_on_startup = True
 app.conf.timezone = "Europe/Moscow"
 
 app.conf.beat_schedule = {
-    "setting-users-offline": {
-        "task": "users.tasks.start_setting_users_offline",
-        "schedule": 5 * 60,
-    }
+    "flushing-users-presence": {
+        "task": "users.tasks.start_flushing_presence",
+        "schedule": 60,
+    },
+    "flushing-chats-activity": {
+        "task": "chats.tasks.start_flushing_chat_activity",
+        "schedule": 10,
+    },
+    "draining-outbox": {
+        "task": "centrifugo.tasks.start_draining_outbox",
+        "schedule": 5,
+    },
+    "removing-old-messages": {
+        "task": "msges.tasks.start_removing_old_messages",
+        "schedule": 60 * 60,
+    },
+    "removing-old-chats": {
+        "task": "chats.tasks.start_removing_old_chats",
+        "schedule": 60 * 60,
+    },
+    "removing-delivered-outbox-events": {
+        "task": "centrifugo.tasks.start_removing_delivered_events",
+        "schedule": 60 * 60,
+    },
 }
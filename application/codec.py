@@ -0,0 +1,72 @@
+import json
+from functools import cache
+
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Datetimes go through the encoder to keep its format, e.g. "Z" for UTC
+ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME if orjson else 0
+)
+
+# JSON has to stay a strict javascript subset, as in DRF
+LINE_SEPARATORS = (
+    ("\u2028".encode(), b"\\u2028"),
+    ("\u2029".encode(), b"\\u2029"),
+)
+
+
+def get_backend():
+    return "orjson" if orjson else "json"
+
+
+@cache
+def get_default(encoder):
+    return encoder().default
+
+
+def escape(data):
+    for separator, escaped in LINE_SEPARATORS:
+        data = data.replace(separator, escaped)
+
+    return data
+
+
+def reject_constant(value):
+    raise ValueError(
+        f"Out of range float values are not JSON compliant: {value}"
+    )
+
+
+def dumps(value, encoder=JSONEncoder):
+    if orjson is not None:
+        try:
+            return escape(
+                orjson.dumps(
+                    value, default=get_default(encoder), option=ORJSON_OPTIONS
+                )
+            )
+        except orjson.JSONEncodeError:
+            # Integers over 64 bits and other values only json can encode
+            pass
+
+    return escape(
+        json.dumps(
+            value,
+            cls=encoder,
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":"),
+        ).encode()
+    )
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+
+    return json.loads(data, parse_constant=reject_constant)
@@ -1,24 +1,196 @@
+import hashlib
+import importlib
+import inspect
+import json
+import time
 from functools import wraps
-from time import time
 
-from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django_redis import get_redis_connection
 
+from application.celery import app
 
-def throttle(interval=5, timeout=10):
+KEY_PREFIX = "decorators"
+DEFERRED_TIMEOUT = 60
+
+# Undecorated functions by path, a Celery task on top hides __wrapped__
+deferred_functions = {}
+
+# Runs at most once while the key lives, sliding extends it on every call
+ACQUIRE_SCRIPT = """
+if redis.call('SET', KEYS[1], 1, 'NX', 'PX', ARGV[1]) then
+    return 1
+end
+if ARGV[2] == '1' then
+    redis.call('PEXPIRE', KEYS[1], ARGV[1])
+end
+return 0
+"""
+
+# Stores the latest arguments, returns 1 when a run has to be scheduled
+DEFER_SCRIPT = """
+redis.call('HSET', KEYS[1], 'args', ARGV[1], 'last', ARGV[2])
+redis.call('PEXPIRE', KEYS[1], ARGV[3])
+return redis.call('HSETNX', KEYS[1], 'scheduled', 1)
+"""
+
+# Returns the arguments to run with, or the milliseconds left to wait
+WAKE_SCRIPT = """
+local state = redis.call('HMGET', KEYS[1], 'args', 'last')
+if not state[1] then
+    return {0}
+end
+local remaining = tonumber(state[2]) + tonumber(ARGV[2]) - tonumber(ARGV[1])
+if ARGV[3] == '1' and remaining > 0 then
+    return {remaining}
+end
+redis.call('DEL', KEYS[1])
+return {0, state[1]}
+"""
+
+
+def encode(value):
+    return json.dumps(value, cls=DjangoJSONEncoder, sort_keys=True)
+
+
+def get_path(func):
+    return f"{func.__module__}.{func.__qualname__}"
+
+
+def get_key(func, args, kwargs, key=None):
+    if key:
+        value = key(*args, **kwargs)
+    else:
+        # Positional and keyword calls of the same arguments share a key
+        arguments = inspect.signature(func).bind(*args, **kwargs)
+        arguments.apply_defaults()
+        value = arguments.arguments
+
+    digest = hashlib.sha1(encode(value).encode()).hexdigest()
+
+    return f"{KEY_PREFIX}:{get_path(func)}:{digest}"
+
+
+def get_milliseconds(seconds):
+    return max(int(seconds * 1000), 1)
+
+
+def acquire(key, window, sliding=False):
+    script = get_redis_connection("default").register_script(ACQUIRE_SCRIPT)
+    return bool(
+        script(
+            keys=[key],
+            args=[get_milliseconds(window), "1" if sliding else "0"],
+        )
+    )
+
+
+def defer(func, key, window, quiet, args, kwargs):
+    script = get_redis_connection("default").register_script(DEFER_SCRIPT)
+    scheduled = script(
+        keys=[key],
+        args=[
+            encode([args, kwargs]),
+            get_milliseconds(time.time()),
+            get_milliseconds(window + DEFERRED_TIMEOUT),
+        ],
+    )
+
+    if scheduled:
+        start_deferred_call.apply_async(
+            kwargs={
+                "path": get_path(func),
+                "key": key,
+                "window": window,
+                "quiet": quiet,
+            },
+            countdown=window,
+        )
+
+
+def run_deferred_call(path, key, window, quiet):
+    script = get_redis_connection("default").register_script(WAKE_SCRIPT)
+    result = script(
+        keys=[key],
+        args=[
+            get_milliseconds(time.time()),
+            get_milliseconds(window),
+            "1" if quiet else "0",
+        ],
+    )
+
+    if len(result) == 1:
+        if result[0] > 0:
+            start_deferred_call.apply_async(
+                kwargs={
+                    "path": path,
+                    "key": key,
+                    "window": window,
+                    "quiet": quiet,
+                },
+                countdown=result[0] / 1000,
+            )
+
+        return None
+
+    if path not in deferred_functions:
+        # Importing the module runs the decorators, which register the path
+        importlib.import_module(path.rsplit(".", 1)[0])
+
+    args, kwargs = json.loads(result[1])
+
+    return deferred_functions[path](*args, **kwargs)
+
+
+@app.task(name="application.decorators.start_deferred_call")
+def start_deferred_call(path, key, window, quiet):
+    run_deferred_call(path, key, window, quiet)
+
+
+def once_per_window(window, key=None):
     def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if acquire(get_key(func, args, kwargs, key), window):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def debounce(window, key=None, leading=False):
+    def decorator(func):
+        deferred_functions[get_path(func)] = func
 
         @wraps(func)
         def wrapper(*args, **kwargs):
-            key = f"{func.__name__}_{str(args)}_{str(sorted(kwargs.items()))}"
-            last = cache.get(key)
+            call_key = get_key(func, args, kwargs, key)
 
-            if last and (time() - last) < interval * 60:
-                return
+            if not leading:
+                defer(func, call_key, window, True, args, kwargs)
+            elif acquire(call_key, window, sliding=True):
+                return func(*args, **kwargs)
 
-            result = func(*args, **kwargs)
-            cache.set(key, time(), timeout=timeout * 60)
+        return wrapper
+
+    return decorator
 
-            return result
+
+def coalesce(window, key=None):
+    def decorator(func):
+        deferred_functions[get_path(func)] = func
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            defer(
+                func,
+                get_key(func, args, kwargs, key),
+                window,
+                False,
+                args,
+                kwargs,
+            )
 
         return wrapper
 
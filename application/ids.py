@@ -0,0 +1,27 @@
+import os
+import threading
+import time
+import uuid
+
+_lock = threading.Lock()
+_last = 0
+
+
+def uuid7():
+    global _last
+
+    # 48 bits of unix milliseconds followed by a 12 bit counter, so ids
+    # generated by one process keep increasing within the same millisecond
+    with _lock:
+        value = max(time.time_ns() // 1_000_000 << 12, _last + 1)
+        _last = value
+
+    random = int.from_bytes(os.urandom(8), "big") & (1 << 62) - 1
+
+    return uuid.UUID(
+        int=(value >> 12) << 80
+        | 7 << 76
+        | (value & 0xFFF) << 64
+        | 2 << 62
+        | random
+    )
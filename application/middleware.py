@@ -1,23 +1,59 @@
-from django.contrib.auth import get_user_model
-from django.utils import timezone
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from contextlib import ExitStack
 
-User = get_user_model()
+from django.db import connections
 
+from application.settings import DATABASE_REPLICAS, DEBUG
 
-class UserOnlineMiddleware:
+from .replicas import mark_sticky, request_state
+
+
+class QueryCounter:
+    def __init__(self, alias, counts):
+        self.alias = alias
+        self.counts = counts
+
+    def __call__(self, execute, sql, params, many, context):
+        self.counts[self.alias] = self.counts.get(self.alias, 0) + 1
+        return execute(sql, params, many, context)
+
+
+class ReplicaMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
 
     def __call__(self, request):
-        response = self.get_response(request)
-        return response
+        state = {"read_alias": None, "wrote": False}
+        token = request_state.set(state)
+        counts = {}
 
-    def process_view(self, request, view_func, view_args, view_kwargs):
         try:
-            request.user = JWTAuthentication().authenticate(request)[0]
-            request.user.is_online = True
-            request.user.last_online_at = timezone.now()
-            request.user.save()
-        except:
-            pass
+            with ExitStack() as stack:
+                # Counting every query is only worth it while debugging
+                if DEBUG:
+                    for alias in connections:
+                        stack.enter_context(
+                            connections[alias].execute_wrapper(
+                                QueryCounter(alias, counts)
+                            )
+                        )
+
+                response = self.get_response(request)
+        finally:
+            request_state.reset(token)
+
+        user = getattr(request, "user", None)
+
+        if (
+            DATABASE_REPLICAS
+            and state["wrote"]
+            and user is not None
+            and user.is_authenticated
+        ):
+            mark_sticky(user.id)
+
+        if DEBUG:
+            response["X-DB-Queries"] = ", ".join(
+                f"{alias}={count}" for alias, count in sorted(counts.items())
+            )
+
+        return response
@@ -1,7 +1,166 @@
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 class Pagination(PageNumberPagination):
     page_size = 10
     max_page_size = 100
     page_size_query_param = "page_size"
+
+
+class KeysetPagination(Pagination):
+    ordering = ("-created_at", "-id")
+    anchor_field = "id"
+
+    mode_query_param = "pagination"
+    before_query_param = "before"
+    after_query_param = "after"
+    around_query_param = "around"
+
+    def is_keyset(self, request):
+        params = request.query_params
+
+        return params.get(self.mode_query_param) == "cursor" or any(
+            param in params
+            for param in (
+                self.before_query_param,
+                self.after_query_param,
+                self.around_query_param,
+            )
+        )
+
+    def get_anchor(self, queryset, value):
+        fields = [field.lstrip("-") for field in self.ordering]
+
+        try:
+            anchor = (
+                queryset.filter(**{self.anchor_field: value})
+                .values(self.anchor_field, *fields)
+                .first()
+            )
+        except (ValidationError, ValueError):
+            anchor = None
+
+        if anchor is None:
+            raise NotFound("Anchor not found")
+
+        return anchor
+
+    def get_reversed_ordering(self):
+        return [
+            field[1:] if field.startswith("-") else f"-{field}"
+            for field in self.ordering
+        ]
+
+    def get_keyset_query(self, anchor, forward, inclusive=False):
+        query = Q()
+        equal = Q()
+
+        for field in self.ordering:
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") == forward else "gt"
+
+            query |= equal & Q(**{f"{name}__{lookup}": anchor[name]})
+            equal &= Q(**{name: anchor[name]})
+
+        if inclusive:
+            query |= equal
+
+        return query
+
+    def get_forward(self, queryset, anchor, size, inclusive=False):
+        if anchor:
+            queryset = queryset.filter(
+                self.get_keyset_query(anchor, True, inclusive)
+            )
+
+        items = list(queryset.order_by(*self.ordering)[: size + 1])
+        return items[:size], len(items) > size
+
+    def get_backward(self, queryset, anchor, size):
+        queryset = queryset.filter(self.get_keyset_query(anchor, False))
+        items = list(
+            queryset.order_by(*self.get_reversed_ordering())[: size + 1]
+        )
+        return items[:size][::-1], len(items) > size
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.is_keyset(request)
+
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        params = request.query_params
+        page_size = self.get_page_size(request)
+
+        if self.around_query_param in params:
+            anchor = self.get_anchor(queryset, params[self.around_query_param])
+            newer, has_previous = self.get_backward(
+                queryset, anchor, page_size // 2
+            )
+            older, has_next = self.get_forward(
+                queryset, anchor, page_size - len(newer), inclusive=True
+            )
+            page = newer + older
+        elif self.after_query_param in params:
+            anchor = self.get_anchor(queryset, params[self.after_query_param])
+            page, has_previous = self.get_backward(queryset, anchor, page_size)
+            has_next = True
+        elif self.before_query_param in params:
+            anchor = self.get_anchor(queryset, params[self.before_query_param])
+            page, has_next = self.get_forward(queryset, anchor, page_size)
+            has_previous = True
+        else:
+            page, has_next = self.get_forward(queryset, None, page_size)
+            has_previous = False
+
+        self.next_anchor = None
+        self.previous_anchor = None
+
+        if page and has_next:
+            self.next_anchor = self.get_anchor_value(page[-1])
+
+        if page and has_previous:
+            self.previous_anchor = self.get_anchor_value(page[0])
+
+        return page
+
+    def get_anchor_value(self, item):
+        return getattr(item, self.anchor_field)
+
+    def get_keyset_link(self, param, value):
+        if value is None:
+            return None
+
+        url = self.request.build_absolute_uri()
+
+        for name in (
+            self.mode_query_param,
+            self.before_query_param,
+            self.after_query_param,
+            self.around_query_param,
+        ):
+            url = remove_query_param(url, name)
+
+        return replace_query_param(url, param, value)
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+
+        return Response(
+            {
+                "next": self.get_keyset_link(
+                    self.before_query_param, self.next_anchor
+                ),
+                "previous": self.get_keyset_link(
+                    self.after_query_param, self.previous_anchor
+                ),
+                "results": data,
+            }
+        )
@@ -0,0 +1,97 @@
+import logging
+import random
+import threading
+import time
+from contextvars import ContextVar
+
+from django.core.cache import cache
+from django.db import DatabaseError
+from rest_framework.permissions import SAFE_METHODS
+
+from application.settings import (
+    DATABASE_REPLICAS,
+    REPLICA_RETRY_TIMEOUT,
+    REPLICA_STICKY_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+STICKY_KEY = "replicas:sticky:{}"
+
+request_state = ContextVar("replica_request_state", default=None)
+
+_unhealthy = {}
+_unhealthy_lock = threading.Lock()
+
+
+def get_healthy_replicas():
+    now = time.monotonic()
+
+    with _unhealthy_lock:
+        return [
+            alias
+            for alias in DATABASE_REPLICAS
+            if _unhealthy.get(alias, 0) <= now
+        ]
+
+
+def mark_unhealthy(alias):
+    logger.warning("Database replica %s failed, using primary", alias)
+
+    with _unhealthy_lock:
+        _unhealthy[alias] = time.monotonic() + REPLICA_RETRY_TIMEOUT
+
+
+def is_sticky(user_id):
+    return bool(cache.get(STICKY_KEY.format(user_id)))
+
+
+def mark_sticky(user_id):
+    cache.set(STICKY_KEY.format(user_id), 1, timeout=REPLICA_STICKY_TIMEOUT)
+
+
+def get_read_alias():
+    state = request_state.get()
+    return state and state["read_alias"]
+
+
+def record_write():
+    state = request_state.get()
+
+    if state is not None:
+        state["wrote"] = True
+
+
+def choose_replica(user):
+    if not DATABASE_REPLICAS:
+        return None
+
+    if user.is_authenticated and is_sticky(user.id):
+        return None
+
+    replicas = get_healthy_replicas()
+    return random.choice(replicas) if replicas else None
+
+
+class ReplicaReadMixin:
+    def initial(self, request, *args, **kwargs):
+        state = request_state.get()
+
+        if state is not None and request.method in SAFE_METHODS:
+            state["read_alias"] = choose_replica(request.user)
+
+        super().initial(request, *args, **kwargs)
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except DatabaseError:
+            alias = get_read_alias()
+
+            if alias is None:
+                raise
+
+            mark_unhealthy(alias)
+            request_state.get()["read_alias"] = None
+
+            return super().dispatch(request, *args, **kwargs)
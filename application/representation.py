@@ -0,0 +1,20 @@
+from rest_framework import serializers
+
+# Unbound field instances give the exact DRF output without its machinery
+DATETIME_FIELD = serializers.DateTimeField()
+
+
+def represent_datetime(value):
+    return DATETIME_FIELD.to_representation(value)
+
+
+def represent_file(value, context):
+    if not value:
+        return None
+
+    request = context.get("request")
+
+    if request is None:
+        return value.url
+
+    return request.build_absolute_uri(value.url)
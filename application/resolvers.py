@@ -0,0 +1,13 @@
+from rest_framework.generics import get_object_or_404
+
+
+def resolve_object(request, queryset, **lookup):
+    http_request = getattr(request, "_request", request)
+    resolved_objects = http_request.__dict__.setdefault("resolved_objects", {})
+
+    key = (queryset.model._meta.label, tuple(sorted(lookup.items())))
+
+    if key not in resolved_objects:
+        resolved_objects[key] = get_object_or_404(queryset, **lookup)
+
+    return resolved_objects[key]
@@ -0,0 +1,140 @@
+import logging
+import time
+
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q
+
+from application.settings import (
+    RETENTION_BATCH_PAUSE,
+    RETENTION_BATCH_SIZE,
+    RETENTION_DRY_RUN,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class RetentionPolicy:
+    name = None
+    ordering = None
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def get_files(self, ids):
+        return []
+
+    def get_deletable_ids(self, ids):
+        return ids
+
+    def before_delete(self, ids):
+        pass
+
+
+def get_file_size(name):
+    try:
+        return default_storage.size(name)
+    except (OSError, NotImplementedError):
+        return 0
+
+
+def delete_files(names):
+    for name in names:
+        try:
+            default_storage.delete(name)
+        except OSError:
+            logger.warning("Failed to delete retained file %s", name)
+
+
+def get_files(policy, ids):
+    return [name for name in policy.get_files(ids) if name]
+
+
+def get_batch(policy, after, batch_size):
+    queryset = policy.get_queryset().order_by(policy.ordering, "pk")
+
+    if after:
+        value, pk = after
+        queryset = queryset.filter(
+            Q(**{f"{policy.ordering}__gt": value})
+            | Q(**{policy.ordering: value, "pk__gt": pk})
+        )
+
+    return list(queryset.values_list(policy.ordering, "pk")[:batch_size])
+
+
+def run_policy(
+    policy,
+    batch_size=RETENTION_BATCH_SIZE,
+    pause=RETENTION_BATCH_PAUSE,
+    dry_run=RETENTION_DRY_RUN,
+):
+    metrics = {
+        "policy": policy.name,
+        "dry_run": dry_run,
+        "batches": 0,
+        "rows": 0,
+        "cascaded_rows": 0,
+        "files": 0,
+        "bytes": 0,
+    }
+
+    started_at = time.monotonic()
+    after = None
+
+    while True:
+        batch = get_batch(policy, after, batch_size)
+
+        if not batch:
+            break
+
+        ids = [pk for _, pk in batch]
+        metrics["batches"] += 1
+
+        if dry_run:
+            ids = policy.get_deletable_ids(ids)
+            files = get_files(policy, ids)
+            size = sum(get_file_size(name) for name in files)
+            metrics["rows"] += len(ids)
+        else:
+            model = policy.get_queryset().model
+
+            with transaction.atomic():
+                # Rows may have stopped matching the policy since the batch
+                # was read, only the ones still matching are deleted
+                ids = list(
+                    policy.get_queryset()
+                    .filter(pk__in=ids)
+                    .select_for_update(of=("self",))
+                    .values_list("pk", flat=True)
+                )
+                ids = policy.get_deletable_ids(ids)
+                files = get_files(policy, ids)
+                size = sum(get_file_size(name) for name in files)
+
+                policy.before_delete(ids)
+                deleted, counts = model.objects.filter(pk__in=ids).delete()
+
+                transaction.on_commit(lambda files=files: delete_files(files))
+
+            rows = counts.get(model._meta.label, 0)
+
+            metrics["rows"] += rows
+            metrics["cascaded_rows"] += deleted - rows
+
+        metrics["files"] += len(files)
+        metrics["bytes"] += size
+
+        # Rows kept back by the policy are not read again
+        after = batch[-1]
+
+        if len(batch) < batch_size:
+            break
+
+        if not dry_run:
+            time.sleep(pause)
+
+    metrics["duration"] = round(time.monotonic() - started_at, 3)
+    logger.info("Retention %s finished: %s", policy.name, metrics)
+
+    return metrics
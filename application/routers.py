@@ -0,0 +1,16 @@
+from .replicas import get_read_alias, record_write
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return get_read_alias() or "default"
+
+    def db_for_write(self, model, **hints):
+        record_write()
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == "default"
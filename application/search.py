@@ -0,0 +1,122 @@
+import re
+import unicodedata
+
+from django.db.models import Case, Count, IntegerField, Max, Q, When
+
+MAX_SEARCH_TERMS = 5
+MAX_SEARCH_RESULTS = 200
+MAX_TOKEN_LENGTH = 64
+
+CYRILLIC_TO_LATIN = {
+    "а": "a",
+    "б": "b",
+    "в": "v",
+    "г": "g",
+    "д": "d",
+    "е": "e",
+    "ё": "e",
+    "ж": "zh",
+    "з": "z",
+    "и": "i",
+    "й": "i",
+    "к": "k",
+    "л": "l",
+    "м": "m",
+    "н": "n",
+    "о": "o",
+    "п": "p",
+    "р": "r",
+    "с": "s",
+    "т": "t",
+    "у": "u",
+    "ф": "f",
+    "х": "kh",
+    "ц": "ts",
+    "ч": "ch",
+    "ш": "sh",
+    "щ": "shch",
+    "ъ": "",
+    "ы": "y",
+    "ь": "",
+    "э": "e",
+    "ю": "iu",
+    "я": "ia",
+}
+
+TRANSLITERATION = str.maketrans(CYRILLIC_TO_LATIN)
+
+
+def normalize(text):
+    text = (text or "").casefold().translate(TRANSLITERATION)
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in text if not unicodedata.combining(char))
+
+
+def get_tokens(*values):
+    tokens = []
+
+    for value in values:
+        for token in re.findall(r"\w+", normalize(value)):
+            token = token[:MAX_TOKEN_LENGTH]
+
+            if token not in tokens:
+                tokens.append(token)
+
+    return tokens
+
+
+def get_prefix_query(term):
+    upper = term[:-1] + chr(ord(term[-1]) + 1)
+    return Q(token__gte=term, token__lt=upper)
+
+
+def search_tokens(queryset, field, query, limit=MAX_SEARCH_RESULTS):
+    terms = get_tokens(query)[:MAX_SEARCH_TERMS]
+
+    if not terms:
+        return {}
+
+    condition = Q()
+    matches = {}
+
+    for index, term in enumerate(terms):
+        prefix = get_prefix_query(term)
+        condition |= prefix
+        matches[f"term_{index}"] = Max(
+            Case(When(prefix, then=1), default=0, output_field=IntegerField())
+        )
+
+    rows = (
+        queryset.filter(condition)
+        .values(field)
+        .annotate(
+            **matches,
+            exact=Count("token", filter=Q(token__in=terms)),
+        )
+        .filter(**{name: 1 for name in matches})
+        .order_by("-exact", field)[:limit]
+    )
+
+    return {row[field]: row["exact"] for row in rows}
+
+
+def get_rank(**ranks):
+    return Case(
+        *[
+            When(**{field: key}, then=rank)
+            for field, items in ranks.items()
+            for key, rank in items.items()
+        ],
+        default=0,
+        output_field=IntegerField(),
+    )
+
+
+def update_tokens(queryset, create, tokens):
+    existing = set(queryset.values_list("token", flat=True))
+
+    if existing == set(tokens):
+        return
+
+    queryset.exclude(token__in=tokens).delete()
+    create([token for token in tokens if token not in existing])
@@ -17,6 +17,8 @@ class Constants:
     MAX_CHAT_MESSSAGES_PER_USER = 250
 
     MAX_CHAT_TITLE_LENGTH = 20
+    MAX_GROUP_CHAT_MEMBERS = 1000
+    CHAT_MEMBERS_PREVIEW_SIZE = 5
     MAX_GROUP_CHATS_PER_USER = 25
     MAX_PRIVATE_CHATS_PER_USER = 25
 
@@ -31,6 +33,11 @@ SECRET_KEY = os.environ.get("DJANGO_SECRET_KEY")
 
 DEBUG = os.environ.get("DJANGO_DEBUG", "off") == "on"
 PRODUCTION = os.environ.get("PRODUCTION", "off") == "on"
+READ_BY_COMPATIBILITY = os.environ.get("READ_BY_COMPATIBILITY", "on") == "on"
+CHAT_ACTIVITY_BUFFER = os.environ.get("CHAT_ACTIVITY_BUFFER", "off") == "on"
+MESSAGE_SEARCH_BACKEND = os.environ.get(
+    "MESSAGE_SEARCH_BACKEND", "msges.search.FTS5SearchBackend"
+)
 
 AUTH_USER_MODEL = "users.User"
 
@@ -67,9 +74,14 @@ INSTALLED_APPS = [
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.PresenceJWTAuthentication",
+    ),
+    "DEFAULT_RENDERER_CLASSES": ("application.renderers.JSONRenderer",),
+    "DEFAULT_PARSER_CLASSES": (
+        "application.parsers.JSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
     ),
-    "DEFAULT_RENDERER_CLASSES": ("rest_framework.renderers.JSONRenderer",),
 }
 
 MIDDLEWARE = [
@@ -81,7 +93,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    "application.middleware.UserOnlineMiddleware",
+    "application.middleware.ReplicaMiddleware",
 ]
 
 ROOT_URLCONF = "application.urls"
@@ -109,9 +121,40 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "OPTIONS": {
+            "init_command": (
+                "PRAGMA journal_mode=WAL;"
+                "PRAGMA synchronous=NORMAL;"
+                "PRAGMA temp_store=MEMORY;"
+            ),
+            "transaction_mode": "IMMEDIATE",
+            "timeout": 20,
+        },
     }
 }
 
+DATABASE_REPLICAS = []
+
+for index, name in enumerate(
+    filter(None, os.environ.get("DATABASE_REPLICAS", "").split(","))
+):
+    alias = f"replica_{index}"
+    DATABASE_REPLICAS.append(alias)
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "NAME": BASE_DIR / name.strip(),
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["application.routers.ReplicaRouter"]
+REPLICA_STICKY_TIMEOUT = 5
+REPLICA_RETRY_TIMEOUT = 30
+
+MESSAGE_GROUP_COMMIT = os.environ.get("MESSAGE_GROUP_COMMIT", "off") == "on"
+MESSAGE_GROUP_COMMIT_BATCH_SIZE = 32
+MESSAGE_GROUP_COMMIT_WINDOW = 0.005
+MESSAGE_GROUP_COMMIT_TIMEOUT = 15
+
 # Cache
 CACHES = {
     "default": {
@@ -161,6 +204,31 @@ CENTRIFUGO_API_KEY = os.environ.get("CENTRIFUGO_API_KEY")
 CENTRIFUGO_TOKEN_HMAC_SECRET_KEY = os.environ.get(
     "CENTRIFUGO_TOKEN_HMAC_SECRET_KEY"
 )
+CENTRIFUGO_CHAT_CHANNELS = (
+    os.environ.get("CENTRIFUGO_CHAT_CHANNELS", "off") == "on"
+)
+CENTRIFUGO_API_URL = os.environ.get(
+    "CENTRIFUGO_API_URL", "http://centrifugo:9000/api"
+)
+CENTRIFUGO_API_TIMEOUT = (1, 3)
+CENTRIFUGO_API_RETRIES = 2
+CENTRIFUGO_API_BACKOFF = 0.2
+CENTRIFUGO_API_POOL_SIZE = 10
+CENTRIFUGO_BREAKER_THRESHOLD = 5
+CENTRIFUGO_BREAKER_TIMEOUT = 30
+
+# Outbox
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_LOCK_TIMEOUT = 60
+OUTBOX_LOCK_WAIT = 5
+OUTBOX_MAX_ATTEMPTS = 5
+READ_EVENT_DEBOUNCE = 1
+
+# Retention
+RETENTION_DRY_RUN = os.environ.get("RETENTION_DRY_RUN", "off") == "on"
+RETENTION_BATCH_SIZE = 500
+RETENTION_BATCH_PAUSE = 0.2
+MESSAGES_LIMITS_WINDOW = 10
 
 # Logging
 if PRODUCTION:
@@ -0,0 +1,32 @@
+from rest_framework.test import APIClient
+
+from chats.models import Chat
+from users.models import User
+
+
+def create_user(username, **kwargs):
+    return User.objects.create_user(
+        username=username,
+        first_name=kwargs.pop("first_name", "Test"),
+        last_name=kwargs.pop("last_name", "User"),
+        **kwargs,
+    )
+
+
+def create_chat(creator, members, is_private=False, **kwargs):
+    chat = Chat.objects.create(
+        creator=creator,
+        is_private=is_private,
+        title=kwargs.pop("title", None if is_private else "Test"),
+        **kwargs,
+    )
+    chat.members.add(creator, *members)
+
+    return chat
+
+
+def get_client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+
+    return client
@@ -0,0 +1,145 @@
+import threading
+import time
+import uuid
+from collections import defaultdict
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from application import decorators
+from application.celery import app
+from application.decorators import coalesce, debounce, once_per_window
+
+WINDOW = 0.2
+WORKERS = 8
+CALLS = 10
+
+runs = defaultdict(list)
+
+
+def get_run_key(run_id, value=None):
+    return run_id
+
+
+@once_per_window(WINDOW * 10, key=get_run_key)
+def run_once(run_id, value=None):
+    runs[run_id].append(value)
+
+
+@debounce(WINDOW, key=get_run_key, leading=True)
+def run_leading(run_id, value=None):
+    runs[run_id].append(value)
+
+
+@debounce(WINDOW, key=get_run_key)
+def run_trailing(run_id, value=None):
+    runs[run_id].append(value)
+
+
+@coalesce(WINDOW, key=get_run_key)
+def run_coalesced(run_id, value=None):
+    runs[run_id].append(value)
+
+
+@app.task
+@coalesce(WINDOW, key=get_run_key)
+def run_coalesced_task(run_id, value=None):
+    runs[run_id].append(value)
+
+
+class TaskDecoratorsTest(SimpleTestCase):
+    def setUp(self):
+        self.run_id = str(uuid.uuid4())
+        self.lock = threading.Lock()
+        self.scheduled = []
+
+        self.scheduler = self.enterContext(
+            mock.patch.object(
+                decorators.start_deferred_call,
+                "apply_async",
+                side_effect=self.apply_async,
+            )
+        )
+
+    def burst(self, func):
+        barrier = threading.Barrier(WORKERS)
+
+        def worker(index):
+            barrier.wait()
+
+            for call in range(CALLS):
+                func(self.run_id, value=f"{index}:{call}")
+
+        threads = [
+            threading.Thread(target=worker, args=(index,))
+            for index in range(WORKERS)
+        ]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+    def apply_async(self, kwargs, countdown):
+        with self.lock:
+            self.scheduled.append((time.monotonic() + countdown, kwargs))
+
+    def drain(self):
+        for _ in range(WORKERS * CALLS):
+            if not self.scheduled:
+                return
+
+            with self.lock:
+                item = min(self.scheduled, key=lambda item: item[0])
+                self.scheduled.remove(item)
+
+            time.sleep(max(item[0] - time.monotonic(), 0))
+            decorators.run_deferred_call(**item[1])
+
+        self.fail("Deferred calls keep rescheduling")
+
+    def assertRuns(self, expected):
+        self.assertEqual(runs.pop(self.run_id, []), expected)
+
+    def test_once_per_window(self):
+        other_run_id = str(uuid.uuid4())
+
+        self.burst(run_once)
+        first = runs[self.run_id][0]
+        run_once(self.run_id, value="same key")
+        run_once(other_run_id, value="other key")
+
+        self.assertRuns([first])
+        self.assertEqual(runs.pop(other_run_id), ["other key"])
+
+    def test_leading_debounce(self):
+        self.burst(run_leading)
+        first = runs[self.run_id][0]
+        time.sleep(WINDOW * 2)
+        run_leading(self.run_id, value="after window")
+
+        self.assertRuns([first, "after window"])
+
+    def test_trailing_debounce(self):
+        self.burst(run_trailing)
+        run_trailing(self.run_id, value="last")
+        self.drain()
+
+        self.assertRuns(["last"])
+
+    def test_coalesce(self):
+        self.burst(run_coalesced)
+        run_coalesced(self.run_id, value="last")
+        self.drain()
+
+        self.assertRuns(["last"])
+        self.assertEqual(self.scheduler.call_count, 1)
+
+    def test_coalesce_under_task(self):
+        self.burst(run_coalesced_task)
+        run_coalesced_task(self.run_id, value="last")
+        self.drain()
+
+        self.assertRuns(["last"])
+        self.assertEqual(self.scheduler.call_count, 1)
@@ -0,0 +1,97 @@
+import uuid
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.db import connections
+from django.test import SimpleTestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from application import decorators, replicas
+from application.replicas import choose_replica, mark_sticky, mark_unhealthy
+from application.testing import create_chat, create_user, get_client
+
+REPLICA = "replica_0"
+
+
+class ChooseReplicaTest(SimpleTestCase):
+    def setUp(self):
+        self.enterContext(
+            mock.patch.object(replicas, "DATABASE_REPLICAS", [REPLICA])
+        )
+        self.enterContext(mock.patch.dict(replicas._unhealthy, clear=True))
+        self.user = mock.Mock(is_authenticated=True, id=uuid.uuid4())
+
+    def test_reads_go_to_replica(self):
+        self.assertEqual(choose_replica(self.user), REPLICA)
+
+    def test_writer_sticks_to_primary(self):
+        mark_sticky(self.user.id)
+
+        self.assertIsNone(choose_replica(self.user))
+        self.assertEqual(
+            choose_replica(mock.Mock(is_authenticated=True, id=uuid.uuid4())),
+            REPLICA,
+        )
+
+    def test_failed_replica_is_skipped(self):
+        mark_unhealthy(REPLICA)
+
+        self.assertIsNone(choose_replica(self.user))
+
+
+# Run with a replica configured, e.g. DATABASE_REPLICAS=replica.sqlite3
+@skipUnless(REPLICA in settings.DATABASES, "No database replica configured")
+class ReplicaRoutingTest(TransactionTestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        self.alice = create_user("alice")
+        self.bob = create_user("bob")
+        self.chat = create_chat(self.alice, [self.bob])
+        self.client = get_client(self.alice)
+
+        self.enterContext(
+            mock.patch.object(decorators.start_deferred_call, "apply_async")
+        )
+        self.enterContext(mock.patch("centrifugo.outbox.schedule_drain"))
+
+    def request(self, method, data=None):
+        with (
+            CaptureQueriesContext(connections["default"]) as primary,
+            CaptureQueriesContext(connections[REPLICA]) as replica,
+        ):
+            response = getattr(self.client, method)(
+                "/api/messages/", data or {"chat": str(self.chat.id)}
+            )
+
+        self.assertLess(response.status_code, 300)
+
+        return response, primary, replica
+
+    def test_safe_request_reads_from_replica(self):
+        response, primary, replica = self.request("get")
+
+        self.assertTrue(replica.captured_queries)
+        # The membership cache is filled from the primary only
+        self.assertTrue(
+            all("chats_chat_members" in query["sql"] for query in primary)
+        )
+        self.assertEqual(len(primary), 1)
+        self.assertNotIn("X-DB-Queries", response)
+
+    def test_writer_reads_from_primary(self):
+        self.request("post", {"chat": str(self.chat.id), "text": "Hello"})
+
+        _, primary, replica = self.request("get")
+
+        self.assertFalse(replica.captured_queries)
+        self.assertTrue(primary.captured_queries)
+
+    def test_query_counts_header_in_debug(self):
+        with mock.patch("application.middleware.DEBUG", True):
+            response, primary, replica = self.request("get")
+
+        self.assertEqual(
+            response["X-DB-Queries"],
+            f"default={len(primary)}, {REPLICA}={len(replica)}",
+        )
@@ -0,0 +1,258 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+from django.core.serializers.json import DjangoJSONEncoder
+from django_redis import get_redis_connection
+from requests.adapters import HTTPAdapter
+
+from application.codec import dumps, loads
+from application.settings import (
+    CENTRIFUGO_API_BACKOFF,
+    CENTRIFUGO_API_KEY,
+    CENTRIFUGO_API_POOL_SIZE,
+    CENTRIFUGO_API_RETRIES,
+    CENTRIFUGO_API_TIMEOUT,
+    CENTRIFUGO_API_URL,
+    CENTRIFUGO_BREAKER_THRESHOLD,
+    CENTRIFUGO_BREAKER_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+STATS_KEY = "centrifugo:stats"
+
+
+class CentrifugoError(Exception):
+    pass
+
+
+class Batch:
+    def __init__(self):
+        self.commands = []
+        self.result = None
+        self.error = None
+
+
+class CircuitBreaker:
+    def __init__(self, threshold, reset_timeout):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.opened_at is None:
+                return True
+
+            return time.monotonic() - self.opened_at >= self.reset_timeout
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+class CentrifugoClient:
+    def __init__(
+        self,
+        url=CENTRIFUGO_API_URL,
+        api_key=CENTRIFUGO_API_KEY,
+        timeout=CENTRIFUGO_API_TIMEOUT,
+        retries=CENTRIFUGO_API_RETRIES,
+        backoff=CENTRIFUGO_API_BACKOFF,
+        pool_size=CENTRIFUGO_API_POOL_SIZE,
+        breaker=None,
+    ):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker(
+            CENTRIFUGO_BREAKER_THRESHOLD, CENTRIFUGO_BREAKER_TIMEOUT
+        )
+
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size,
+            max_retries=0,
+        )
+
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(
+            {
+                "Content-type": "application/json",
+                "X-API-Key": api_key or "",
+            }
+        )
+
+        self.local = threading.local()
+
+    def encode(self, payload):
+        return dumps(payload, DjangoJSONEncoder)
+
+    def record(self, result, latency=0):
+        try:
+            pipeline = get_redis_connection("default").pipeline()
+            pipeline.hincrby(STATS_KEY, result, 1)
+            pipeline.hincrbyfloat(STATS_KEY, "latency_ms", latency * 1000)
+            pipeline.execute()
+        except Exception:
+            logger.exception("Failed to record centrifugo stats")
+
+    def send(self, method, payload):
+        if not self.breaker.allow():
+            self.record("rejected")
+            logger.warning("Centrifugo circuit is open, %s dropped", method)
+            return None
+
+        data = self.encode(payload)
+
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+
+            started_at = time.monotonic()
+
+            try:
+                response = self.session.post(
+                    f"{self.url}/{method}",
+                    data=data,
+                    timeout=self.timeout,
+                )
+            except requests.RequestException as error:
+                logger.warning("Centrifugo %s failed: %s", method, error)
+                continue
+
+            latency = time.monotonic() - started_at
+
+            if response.status_code >= 500:
+                logger.warning(
+                    "Centrifugo %s failed with status %s",
+                    method,
+                    response.status_code,
+                )
+                continue
+
+            self.breaker.record_success()
+
+            try:
+                response.raise_for_status()
+                result = loads(response.content)
+
+                if "error" in result:
+                    raise CentrifugoError(result["error"])
+            except (ValueError, requests.HTTPError, CentrifugoError) as error:
+                self.record("failure", latency)
+                logger.error("Centrifugo %s rejected: %s", method, error)
+                raise CentrifugoError(str(error)) from error
+
+            self.record("success", latency)
+            return result
+
+        self.breaker.record_failure()
+        self.record("failure")
+
+        return None
+
+    def post(self, method, payload):
+        try:
+            return self.send(method, payload)
+        except CentrifugoError:
+            return None
+
+    def command(self, method, params):
+        batch = getattr(self.local, "batch", None)
+
+        if batch is not None:
+            batch.commands.append({method: params})
+            return None
+
+        return self.post(method, params)
+
+    def broadcast(self, data, channels):
+        return self.command("broadcast", {"channels": channels, "data": data})
+
+    def publish(self, data, channel):
+        return self.command("publish", {"channel": channel, "data": data})
+
+    def unsubscribe(self, user, channel):
+        return self.command(
+            "unsubscribe", {"user": str(user), "channel": channel}
+        )
+
+    def batch(self, commands):
+        if not commands:
+            return None
+
+        return self.post("batch", {"commands": commands})
+
+    @contextmanager
+    def batching(self):
+        batch = getattr(self.local, "batch", None)
+
+        if batch is not None:
+            yield batch
+            return
+
+        batch = self.local.batch = Batch()
+
+        try:
+            yield batch
+        finally:
+            self.local.batch = None
+
+            # Unlike an unavailable server, a rejection is kept on the batch
+            # so the caller can tell bad commands from an outage
+            if batch.commands:
+                try:
+                    batch.result = self.send(
+                        "batch", {"commands": batch.commands}
+                    )
+                except CentrifugoError as error:
+                    batch.error = error
+
+
+_client = None
+_client_pid = None
+
+
+def get_client():
+    global _client, _client_pid
+
+    if _client is None or _client_pid != os.getpid():
+        _client = CentrifugoClient()
+        _client_pid = os.getpid()
+
+    return _client
+
+
+def get_stats():
+    stats = get_redis_connection("default").hgetall(STATS_KEY)
+    stats = {key.decode(): float(value) for key, value in stats.items()}
+
+    requests_count = stats.get("success", 0) + stats.get("failure", 0)
+    latency = stats.pop("latency_ms", 0)
+
+    return {
+        "success": int(stats.get("success", 0)),
+        "failure": int(stats.get("failure", 0)),
+        "rejected": int(stats.get("rejected", 0)),
+        "average_latency_ms": (
+            round(latency / requests_count, 2) if requests_count else 0
+        ),
+    }
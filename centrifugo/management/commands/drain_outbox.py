@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from application.settings import OUTBOX_BATCH_SIZE
+from centrifugo.outbox import drain_outbox, get_stats
+
+
+class Command(BaseCommand):
+    help = "Publish pending outbox events to Centrifugo"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=OUTBOX_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--forever",
+            action="store_true",
+            help="Keep draining as a long-running worker",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0.2,
+            help="Seconds to wait when the outbox is empty",
+        )
+        parser.add_argument(
+            "--stats",
+            action="store_true",
+            help="Only print outbox lag and throughput",
+        )
+
+    def write_stats(self):
+        self.stdout.write(
+            ", ".join(f"{key}={value}" for key, value in get_stats().items())
+        )
+
+    def handle(self, *args, **options):
+        if options["stats"]:
+            self.write_stats()
+            return
+
+        while True:
+            delivered = drain_outbox(options["batch_size"])
+
+            if not options["forever"]:
+                break
+
+            if not delivered:
+                time.sleep(options["interval"])
+
+        self.stdout.write(f"{delivered} events delivered")
+        self.write_stats()
@@ -0,0 +1,32 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class OutboxEvent(models.Model):
+    chat_id = models.UUIDField()
+
+    event = models.CharField(max_length=20)
+
+    message = models.JSONField(encoder=DjangoJSONEncoder)
+
+    created_at = models.DateTimeField(default=timezone.now)
+
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    attempts = models.PositiveSmallIntegerField(default=0)
+
+    failed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.event}:{self.chat_id}"
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["id"],
+                condition=Q(delivered_at__isnull=True, failed_at__isnull=True),
+                name="centrifugo_outbox_pending",
+            )
+        ]
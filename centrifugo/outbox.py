@@ -0,0 +1,271 @@
+import logging
+import time
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django_redis import get_redis_connection
+from redis.exceptions import LockError
+
+from application.settings import (
+    CENTRIFUGO_CHAT_CHANNELS,
+    OUTBOX_BATCH_SIZE,
+    OUTBOX_LOCK_TIMEOUT,
+    OUTBOX_LOCK_WAIT,
+    OUTBOX_MAX_ATTEMPTS,
+)
+from chats.models import Chat
+
+from .client import CentrifugoError, get_client
+from .models import OutboxEvent
+from .utils import publish_chat_data, publish_data, unsubscribe_from_chat
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_LOCK_KEY = "centrifugo:outbox:lock"
+OUTBOX_SCHEDULED_KEY = "centrifugo:outbox:scheduled"
+OUTBOX_STATS_KEY = "centrifugo:outbox:stats"
+
+# Sent to the personal channels of the members who joined or left a chat
+MEMBERS_EVENTS = {"join", "leave"}
+
+
+def schedule_drain():
+    from .tasks import start_draining_outbox
+
+    connection = get_redis_connection("default")
+
+    if connection.set(
+        OUTBOX_SCHEDULED_KEY, 1, nx=True, ex=OUTBOX_LOCK_TIMEOUT
+    ):
+        start_draining_outbox.delay()
+
+
+def add_event(event, message, chat_id):
+    OutboxEvent.objects.create(event=event, message=message, chat_id=chat_id)
+    transaction.on_commit(schedule_drain, robust=True)
+
+
+def publish_members_event(event):
+    user_ids = event.message["users"]
+
+    publish_data(
+        data={"event": event.event, "message": {"chat": event.chat_id}},
+        channels=user_ids,
+    )
+
+    if event.event == "leave":
+        for user_id in user_ids:
+            unsubscribe_from_chat(user_id, event.chat_id)
+
+
+def publish_event(event):
+    if event.event in MEMBERS_EVENTS:
+        publish_members_event(event)
+        return
+
+    data = {
+        "event": event.event,
+        "message": event.message,
+    }
+
+    if CENTRIFUGO_CHAT_CHANNELS:
+        publish_chat_data(data=data, chat_id=event.chat_id)
+    else:
+        members = Chat(id=event.chat_id).get_members_ids_list()
+        publish_data(data=data, channels=members)
+
+
+def record(events, delivered_at, elapsed):
+    lag = sum(
+        (delivered_at - event.created_at).total_seconds() for event in events
+    )
+
+    pipeline = get_redis_connection("default").pipeline()
+    pipeline.hincrby(OUTBOX_STATS_KEY, "delivered", len(events))
+    pipeline.hincrby(OUTBOX_STATS_KEY, "batches", 1)
+    pipeline.hincrbyfloat(OUTBOX_STATS_KEY, "lag_ms", lag * 1000)
+    pipeline.hincrbyfloat(OUTBOX_STATS_KEY, "drain_ms", elapsed * 1000)
+    pipeline.execute()
+
+
+def publish_events(events):
+    counts = []
+
+    with get_client().batching() as batch:
+        for event in events:
+            count = len(batch.commands)
+            publish_event(event)
+            counts.append(len(batch.commands) - count)
+
+    if batch.error is not None:
+        raise batch.error
+
+    if not batch.commands:
+        return [True] * len(events)
+
+    if batch.result is None:
+        return None
+
+    # An event may take several commands, their replies come in order
+    replies = iter(batch.result.get("replies", []))
+
+    return [
+        not any("error" in reply for reply in islice(replies, count))
+        for count in counts
+    ]
+
+
+def publish_events_one_by_one(events):
+    results = []
+
+    for event in events:
+        try:
+            result = publish_events([event])
+        except CentrifugoError:
+            result = [False]
+
+        if result is None:
+            break
+
+        results.extend(result)
+
+    return results
+
+
+def reject(events, failed_at):
+    ids = [event.id for event in events]
+
+    OutboxEvent.objects.filter(id__in=ids).update(attempts=F("attempts") + 1)
+    failed = OutboxEvent.objects.filter(
+        id__in=ids, attempts__gte=OUTBOX_MAX_ATTEMPTS
+    ).update(failed_at=failed_at)
+
+    logger.error(
+        "Centrifugo rejected %s outbox events, %s of them failed for good",
+        len(ids),
+        failed,
+    )
+
+    get_redis_connection("default").hincrby(
+        OUTBOX_STATS_KEY, "rejected", len(ids)
+    )
+
+
+def drain_batch(batch_size):
+    events = list(
+        OutboxEvent.objects.filter(delivered_at=None, failed_at=None).order_by(
+            "id"
+        )[:batch_size]
+    )
+
+    if not events:
+        return 0, 0
+
+    started_at = time.monotonic()
+
+    # Commands of one batch are applied by Centrifugo in order, so events of
+    # a chat are published in the order they were committed
+    try:
+        results = publish_events(events)
+    except CentrifugoError:
+        # One bad event gets the whole batch rejected, so the events are
+        # published one by one to deliver the rest
+        results = publish_events_one_by_one(events)
+
+    if results is None:
+        results = []
+
+    now = timezone.now()
+    delivered = [event for event, ok in zip(events, results) if ok]
+    rejected = [event for event, ok in zip(events, results) if not ok]
+
+    if delivered:
+        OutboxEvent.objects.filter(
+            id__in=[event.id for event in delivered]
+        ).update(delivered_at=now)
+        record(delivered, now, time.monotonic() - started_at)
+
+    if rejected:
+        reject(rejected, now)
+
+    # The rest of the events wait for the next drain
+    if len(results) < len(events):
+        logger.warning("Outbox drain stopped, Centrifugo failed")
+        get_redis_connection("default").hincrby(
+            OUTBOX_STATS_KEY, "failures", 1
+        )
+
+    return len(results), len(delivered)
+
+
+def drain_outbox(batch_size=OUTBOX_BATCH_SIZE):
+    connection = get_redis_connection("default")
+    connection.delete(OUTBOX_SCHEDULED_KEY)
+
+    lock = connection.lock(OUTBOX_LOCK_KEY, timeout=OUTBOX_LOCK_TIMEOUT)
+
+    if not lock.acquire(blocking_timeout=OUTBOX_LOCK_WAIT):
+        return 0
+
+    delivered = 0
+
+    try:
+        while True:
+            count, delivered_count = drain_batch(batch_size)
+            delivered += delivered_count
+
+            if count < batch_size:
+                break
+
+            # Another worker may take the lock once it expires, so the drain
+            # stops instead of publishing the same events concurrently
+            try:
+                lock.extend(OUTBOX_LOCK_TIMEOUT, replace_ttl=True)
+            except LockError:
+                logger.warning("Outbox lock expired while draining")
+                schedule_drain()
+                return delivered
+    finally:
+        if lock.owned():
+            lock.release()
+
+    return delivered
+
+
+def get_stats():
+    stats = get_redis_connection("default").hgetall(OUTBOX_STATS_KEY)
+    stats = {key.decode(): float(value) for key, value in stats.items()}
+
+    delivered = int(stats.get("delivered", 0))
+    drain_ms = stats.get("drain_ms", 0)
+
+    oldest = (
+        OutboxEvent.objects.filter(delivered_at=None, failed_at=None)
+        .order_by("id")
+        .values_list("created_at", flat=True)
+        .first()
+    )
+
+    return {
+        "delivered": delivered,
+        "batches": int(stats.get("batches", 0)),
+        "failures": int(stats.get("failures", 0)),
+        "rejected": int(stats.get("rejected", 0)),
+        "failed": OutboxEvent.objects.exclude(failed_at=None).count(),
+        "pending": OutboxEvent.objects.filter(
+            delivered_at=None, failed_at=None
+        ).count(),
+        "oldest_pending_s": (
+            round((timezone.now() - oldest).total_seconds(), 3)
+            if oldest
+            else 0
+        ),
+        "average_lag_ms": (
+            round(stats.get("lag_ms", 0) / delivered, 2) if delivered else 0
+        ),
+        "events_per_second": (
+            round(delivered / drain_ms * 1000, 1) if drain_ms else 0
+        ),
+    }
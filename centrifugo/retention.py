@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from application.retention import RetentionPolicy
+
+from .models import OutboxEvent
+
+OUTBOX_RETENTION = timedelta(days=1)
+
+
+class OutboxRetentionPolicy(RetentionPolicy):
+    name = "outbox"
+    ordering = "id"
+
+    def get_queryset(self):
+        time_threshold = timezone.now() - OUTBOX_RETENTION
+
+        return OutboxEvent.objects.filter(
+            Q(delivered_at__lt=time_threshold)
+            | Q(failed_at__lt=time_threshold)
+        )
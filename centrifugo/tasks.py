@@ -0,0 +1,19 @@
+from application.celery import app
+from application.retention import run_policy
+
+from .outbox import drain_outbox
+from .retention import OutboxRetentionPolicy
+
+
+@app.task
+def start_draining_outbox():
+    drain_outbox()
+
+
+def remove_delivered_events(**kwargs):
+    return run_policy(OutboxRetentionPolicy(), **kwargs)
+
+
+@app.task
+def start_removing_delivered_events():
+    remove_delivered_events()
@@ -0,0 +1,141 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from centrifugo import client as client_module
+from centrifugo.client import CentrifugoClient, CentrifugoError, CircuitBreaker
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.requests.append(
+            (self.path, self.client_address, json.loads(body))
+        )
+
+        status, data = (
+            self.server.responses.pop(0)
+            if self.server.responses
+            else (200, {"result": {}})
+        )
+        content = json.dumps(data).encode()
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class CentrifugoClientTest(SimpleTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        self.server.requests = []
+        self.server.responses = []
+
+        thread = threading.Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.01}
+        )
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        self.sleeps = []
+        self.enterContext(
+            mock.patch.object(client_module.time, "sleep", self.sleeps.append)
+        )
+
+    def get_client(self, **kwargs):
+        host, port = self.server.server_address
+        client = CentrifugoClient(
+            url=f"http://{host}:{port}/api",
+            api_key="key",
+            retries=kwargs.pop("retries", 2),
+            backoff=0.1,
+            breaker=kwargs.pop("breaker", CircuitBreaker(5, 30)),
+            **kwargs,
+        )
+        self.addCleanup(client.session.close)
+
+        return client
+
+    def respond(self, *responses):
+        self.server.responses.extend(responses)
+
+    def test_pooled_session(self):
+        client = self.get_client()
+
+        for index in range(3):
+            self.assertEqual(
+                client.publish({"index": index}, "chat"), {"result": {}}
+            )
+
+        paths = [path for path, _, _ in self.server.requests]
+        addresses = {address for _, address, _ in self.server.requests}
+
+        self.assertEqual(paths, ["/api/publish"] * 3)
+        # Every request went through the same kept-alive connection
+        self.assertEqual(len(addresses), 1)
+
+    def test_retries_with_backoff(self):
+        client = self.get_client()
+        self.respond((502, {}), (503, {}))
+
+        self.assertEqual(client.publish({}, "chat"), {"result": {}})
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(self.sleeps, [0.1, 0.2])
+
+    def test_gives_up_after_retries(self):
+        client = self.get_client()
+        self.respond((500, {}), (500, {}), (500, {}))
+
+        self.assertIsNone(client.publish({}, "chat"))
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_rejection_is_not_retried(self):
+        client = self.get_client()
+        self.respond((200, {"error": {"code": 102}}))
+
+        with self.assertRaises(CentrifugoError):
+            client.send("publish", {"channel": "chat", "data": {}})
+
+        self.respond((200, {"error": {"code": 102}}))
+        self.assertIsNone(client.publish({}, "chat"))
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(self.sleeps, [])
+
+    def test_circuit_breaker(self):
+        breaker = CircuitBreaker(2, 30)
+        client = self.get_client(retries=0, breaker=breaker)
+        self.respond((500, {}), (500, {}))
+
+        self.assertIsNone(client.publish({}, "chat"))
+        self.assertIsNone(client.publish({}, "chat"))
+
+        # The circuit is open, nothing is sent
+        self.assertIsNone(client.publish({}, "chat"))
+        self.assertEqual(len(self.server.requests), 2)
+
+        # Half-open after the reset timeout, a failed probe opens it again
+        breaker.opened_at -= breaker.reset_timeout
+        self.respond((500, {}))
+
+        self.assertIsNone(client.publish({}, "chat"))
+        self.assertIsNone(client.publish({}, "chat"))
+        self.assertEqual(len(self.server.requests), 3)
+
+        # A successful probe closes it
+        breaker.opened_at -= breaker.reset_timeout
+
+        self.assertEqual(client.publish({}, "chat"), {"result": {}})
+        self.assertEqual(client.publish({}, "chat"), {"result": {}})
+        self.assertEqual(len(self.server.requests), 5)
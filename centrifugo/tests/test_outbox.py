@@ -0,0 +1,131 @@
+import uuid
+from unittest import mock
+
+from django.test import TestCase
+from django_redis import get_redis_connection
+
+from application.settings import OUTBOX_MAX_ATTEMPTS
+from centrifugo.client import CentrifugoClient, CentrifugoError
+from centrifugo.models import OutboxEvent
+from centrifugo.outbox import OUTBOX_LOCK_KEY, drain_outbox
+
+
+def is_bad(command):
+    return command["publish"]["data"]["message"].get("bad", False)
+
+
+class OutboxDrainTest(TestCase):
+    def setUp(self):
+        self.enterContext(
+            mock.patch("centrifugo.outbox.CENTRIFUGO_CHAT_CHANNELS", True)
+        )
+
+        self.chat_id = uuid.uuid4()
+        self.good = self.add_event({"text": "Hello"})
+        self.bad = self.add_event({"text": "Hello", "bad": True})
+        self.later = self.add_event({"text": "Later"})
+
+    def add_event(self, message):
+        return OutboxEvent.objects.create(
+            event="create", message=message, chat_id=self.chat_id
+        )
+
+    def drain(self, send):
+        with mock.patch.object(CentrifugoClient, "send", side_effect=send):
+            return drain_outbox()
+
+    def assertDelivered(self, *events):
+        delivered = OutboxEvent.objects.exclude(delivered_at=None)
+
+        self.assertQuerySetEqual(
+            delivered.order_by("id"), events, ordered=True
+        )
+
+    def test_command_errors(self):
+        def send(method, payload):
+            return {
+                "replies": [
+                    {"error": {"code": 102}} if is_bad(command) else {}
+                    for command in payload["commands"]
+                ]
+            }
+
+        self.assertEqual(self.drain(send), 2)
+        self.assertDelivered(self.good, self.later)
+
+        self.bad.refresh_from_db()
+        self.assertEqual(self.bad.attempts, 1)
+        self.assertIsNone(self.bad.failed_at)
+
+        for _ in range(OUTBOX_MAX_ATTEMPTS - 1):
+            self.drain(send)
+
+        self.bad.refresh_from_db()
+        self.assertEqual(self.bad.attempts, OUTBOX_MAX_ATTEMPTS)
+        self.assertIsNotNone(self.bad.failed_at)
+        self.assertIsNone(self.bad.delivered_at)
+
+        with mock.patch.object(CentrifugoClient, "send") as send:
+            self.assertEqual(drain_outbox(), 0)
+
+        send.assert_not_called()
+
+    def test_rejected_batch(self):
+        batches = []
+
+        def send(method, payload):
+            batches.append(len(payload["commands"]))
+
+            if any(is_bad(command) for command in payload["commands"]):
+                raise CentrifugoError("Request entity too large")
+
+            return {"replies": [{} for _ in payload["commands"]]}
+
+        self.assertEqual(self.drain(send), 2)
+        self.assertEqual(batches, [3, 1, 1, 1])
+        self.assertDelivered(self.good, self.later)
+
+        self.bad.refresh_from_db()
+        self.assertEqual(self.bad.attempts, 1)
+
+    def test_unavailable(self):
+        self.assertEqual(self.drain(lambda method, payload: None), 0)
+        self.assertDelivered()
+        self.assertFalse(OutboxEvent.objects.filter(attempts__gt=0).exists())
+
+    def test_unavailable_while_publishing_one_by_one(self):
+        def send(method, payload):
+            commands = payload["commands"]
+
+            if any(is_bad(command) for command in commands):
+                raise CentrifugoError("Request entity too large")
+
+            if commands[0]["publish"]["data"]["message"]["text"] == "Later":
+                return None
+
+            return {"replies": [{}]}
+
+        self.assertEqual(self.drain(send), 1)
+        self.assertDelivered(self.good)
+        self.assertEqual(
+            list(OutboxEvent.objects.filter(attempts=1)), [self.bad]
+        )
+
+    def test_lock_lost(self):
+        connection = get_redis_connection("default")
+        self.addCleanup(connection.delete, OUTBOX_LOCK_KEY)
+
+        def send(method, payload):
+            # Another worker takes the lock after it expired
+            connection.set(OUTBOX_LOCK_KEY, "other")
+            return {"replies": [{} for _ in payload["commands"]]}
+
+        with (
+            mock.patch.object(CentrifugoClient, "send", side_effect=send),
+            mock.patch("centrifugo.outbox.schedule_drain") as schedule_drain,
+        ):
+            self.assertEqual(drain_outbox(batch_size=1), 1)
+
+        self.assertDelivered(self.good)
+        schedule_drain.assert_called_once()
+        self.assertEqual(connection.get(OUTBOX_LOCK_KEY), b"other")
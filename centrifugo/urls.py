@@ -5,4 +5,5 @@ from . import views
 urlpatterns = [
     path("centrifugo/connect/", views.centrifugo_connect),
     path("centrifugo/subscribe/", views.centrifugo_subscribe),
+    path("centrifugo/stats/", views.centrifugo_stats),
 ]
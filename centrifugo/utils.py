@@ -1,16 +1,17 @@
-import json
 import time
+import uuid
 
 import jwt
-import requests
-from django.core.serializers.json import DjangoJSONEncoder
 
 from application.settings import (
-    CENTRIFUGO_API_KEY,
     CENTRIFUGO_TOKEN_HMAC_SECRET_KEY,
     CENTRIFUGO_TOKEN_TIME,
 )
 
+from .client import get_client
+
+CHAT_CHANNEL_PREFIX = "chat:"
+
 
 def generate_connection_token(client):
     claims = {
@@ -33,21 +34,27 @@ def generate_subscription_token(client, channel):
     )
 
 
-def publish_data(data, channels):
-    command = {"channels": channels, "data": data}
+def get_chat_channel(chat_id):
+    return f"{CHAT_CHANNEL_PREFIX}{chat_id}"
 
-    data = json.dumps(command, cls=DjangoJSONEncoder)
 
-    headers = {
-        "Content-type": "application/json",
-        "X-API-Key": CENTRIFUGO_API_KEY,
-    }
+def get_channel_chat_id(channel):
+    if not channel or not channel.startswith(CHAT_CHANNEL_PREFIX):
+        return None
 
     try:
-        requests.post(
-            f"http://centrifugo:9000/api/broadcast",
-            data=data,
-            headers=headers,
-        )
-    except:
-        pass
+        return uuid.UUID(channel.removeprefix(CHAT_CHANNEL_PREFIX))
+    except ValueError:
+        return None
+
+
+def publish_data(data, channels):
+    return get_client().broadcast(data, channels)
+
+
+def publish_chat_data(data, chat_id):
+    return get_client().publish(data, get_chat_channel(chat_id))
+
+
+def unsubscribe_from_chat(user_id, chat_id):
+    return get_client().unsubscribe(user_id, get_chat_channel(chat_id))
@@ -1,8 +1,16 @@
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 
-from .utils import generate_connection_token, generate_subscription_token
+from chats.membership import is_member
+
+from .client import get_stats
+from .utils import (
+    generate_connection_token,
+    generate_subscription_token,
+    get_channel_chat_id,
+)
 
 
 @api_view(["POST"])
@@ -14,6 +22,18 @@ def centrifugo_connect(request):
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def centrifugo_subscribe(request):
+    channel = request.data.get("channel")
+
+    if channel and channel != str(request.user.id):
+        chat_id = get_channel_chat_id(channel)
+
+        if not chat_id or not is_member(chat_id, request.user.id):
+            raise PermissionDenied()
+
+        return Response(
+            {"token": generate_subscription_token(request.user.id, channel)}
+        )
+
     return Response(
         {
             "token": generate_subscription_token(
@@ -21,3 +41,9 @@ def centrifugo_subscribe(request):
             )
         }
     )
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def centrifugo_stats(request):
+    return Response(get_stats())
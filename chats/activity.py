@@ -0,0 +1,108 @@
+from datetime import datetime
+from datetime import timezone as dt_timezone
+
+from django.db import transaction
+from django.db.models import Case, F, When
+from django.db.models.functions import Greatest
+from django_redis import get_redis_connection
+
+from application.settings import CHAT_ACTIVITY_BUFFER
+
+from .models import Chat
+
+ACTIVITY_KEY = "chats:activity"
+FLUSH_BATCH_SIZE = 500
+
+# Removes flushed chats unless a newer activity arrived during the flush
+REMOVE_FLUSHED_SCRIPT = """
+local removed = 0
+for index = 1, #ARGV, 2 do
+    local score = redis.call('ZSCORE', KEYS[1], ARGV[index])
+    if score and tonumber(score) <= tonumber(ARGV[index + 1]) then
+        removed = removed + redis.call('ZREM', KEYS[1], ARGV[index])
+    end
+end
+return removed
+"""
+
+
+def to_datetime(timestamp):
+    return datetime.fromtimestamp(timestamp, tz=dt_timezone.utc)
+
+
+def buffer_chat_activity(chat_id, updated_at):
+    get_redis_connection("default").zadd(
+        ACTIVITY_KEY, {str(chat_id): updated_at.timestamp()}, gt=True
+    )
+
+
+def touch_chat(chat_id, updated_at):
+    if CHAT_ACTIVITY_BUFFER:
+        transaction.on_commit(
+            lambda: buffer_chat_activity(chat_id, updated_at)
+        )
+    else:
+        Chat.objects.filter(id=chat_id, updated_at__lt=updated_at).update(
+            updated_at=updated_at
+        )
+
+
+def get_chat_activity(chat_ids):
+    chat_ids = list(chat_ids)
+
+    if not chat_ids:
+        return {}
+
+    scores = get_redis_connection("default").zmscore(
+        ACTIVITY_KEY, [str(chat_id) for chat_id in chat_ids]
+    )
+
+    return {
+        chat_id: to_datetime(score)
+        for chat_id, score in zip(chat_ids, scores)
+        if score is not None
+    }
+
+
+def get_updated_at(chat):
+    if not CHAT_ACTIVITY_BUFFER:
+        return chat.updated_at
+
+    activity = get_chat_activity([chat.id]).get(chat.id)
+
+    if activity and activity > chat.updated_at:
+        return activity
+
+    return chat.updated_at
+
+
+def flush_chat_activity():
+    connection = get_redis_connection("default")
+    items = connection.zrange(ACTIVITY_KEY, 0, -1, withscores=True)
+
+    for start in range(0, len(items), FLUSH_BATCH_SIZE):
+        batch = items[start : start + FLUSH_BATCH_SIZE]
+
+        Chat.objects.filter(
+            id__in=[chat_id.decode() for chat_id, _ in batch]
+        ).update(
+            updated_at=Greatest(
+                F("updated_at"),
+                Case(
+                    *[
+                        When(id=chat_id.decode(), then=to_datetime(score))
+                        for chat_id, score in batch
+                    ],
+                    default=F("updated_at"),
+                ),
+            )
+        )
+
+        connection.register_script(REMOVE_FLUSHED_SCRIPT)(
+            keys=[ACTIVITY_KEY],
+            args=[
+                value for chat_id, score in batch for value in (chat_id, score)
+            ],
+        )
+
+    return len(items)
@@ -0,0 +1,171 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Chat, ChatCounter
+
+COUNTER_FIELDS = ["private_chats_count", "group_chats_count", "messages_count"]
+
+
+def get_chats_count_field(is_private):
+    return "private_chats_count" if is_private else "group_chats_count"
+
+
+def increment(field, chat_id=None, user_id=None, amount=1):
+    counters = ChatCounter.objects.filter(chat_id=chat_id, user_id=user_id)
+
+    if counters.update(**{field: F(field) + amount}):
+        return
+
+    try:
+        with transaction.atomic():
+            ChatCounter.objects.create(
+                chat_id=chat_id, user_id=user_id, **{field: amount}
+            )
+    except IntegrityError:
+        counters.update(**{field: F(field) + amount})
+
+
+def decrement(field, chat_id=None, user_id=None, amount=1):
+    ChatCounter.objects.filter(
+        chat_id=chat_id,
+        user_id=user_id,
+        **{f"{field}__gte": amount},
+    ).update(**{field: F(field) - amount})
+
+
+def get_count(field, chat_id=None, user_id=None):
+    return (
+        ChatCounter.objects.filter(chat_id=chat_id, user_id=user_id)
+        .values_list(field, flat=True)
+        .first()
+        or 0
+    )
+
+
+def get_chats_count(user_id, is_private):
+    return get_count(get_chats_count_field(is_private), user_id=user_id)
+
+
+def get_messages_count(chat_id, user_id):
+    return get_count("messages_count", chat_id=chat_id, user_id=user_id)
+
+
+def add_members(chat_ids, amount=1):
+    Chat.objects.filter(id__in=chat_ids).update(
+        members_count=F("members_count") + amount
+    )
+
+
+def remove_members(chat_ids, amount=1):
+    Chat.objects.filter(id__in=chat_ids, members_count__gte=amount).update(
+        members_count=F("members_count") - amount
+    )
+
+
+def get_actual_members_count():
+    return Coalesce(
+        Subquery(
+            Chat.members.through.objects.filter(chat_id=OuterRef("id"))
+            .values("chat_id")
+            .annotate(count=Count("user_id"))
+            .values("count")
+        ),
+        0,
+    )
+
+
+def recount_members(chat_ids):
+    Chat.objects.filter(id__in=chat_ids).update(
+        members_count=get_actual_members_count()
+    )
+
+
+def get_actual_counters():
+    from msges.models import Message
+
+    counters = {}
+
+    chats = (
+        Chat.objects.filter(creator__isnull=False)
+        .values("creator_id")
+        .annotate(
+            private_chats_count=Count("id", filter=Q(is_private=True)),
+            group_chats_count=Count("id", filter=Q(is_private=False)),
+        )
+        .order_by()
+    )
+
+    for row in chats:
+        counters[(None, row["creator_id"])] = {
+            "private_chats_count": row["private_chats_count"],
+            "group_chats_count": row["group_chats_count"],
+            "messages_count": 0,
+        }
+
+    messages = (
+        Message.objects.filter(sender__isnull=False)
+        .values("chat_id", "sender_id")
+        .annotate(messages_count=Count("id"))
+        .order_by()
+    )
+
+    for row in messages:
+        counters[(row["chat_id"], row["sender_id"])] = {
+            "private_chats_count": 0,
+            "group_chats_count": 0,
+            "messages_count": row["messages_count"],
+        }
+
+    return counters
+
+
+def reconcile_counters(dry_run=False):
+    actual = get_actual_counters()
+    drift = []
+
+    for counter in ChatCounter.objects.all():
+        key = (counter.chat_id, counter.user_id)
+        values = actual.pop(key, None) or dict.fromkeys(COUNTER_FIELDS, 0)
+
+        if all(
+            getattr(counter, name) == value for name, value in values.items()
+        ):
+            continue
+
+        if not any(values.values()):
+            drift.append((key, "stale"))
+
+            if not dry_run:
+                counter.delete()
+        else:
+            drift.append((key, "changed"))
+
+            if not dry_run:
+                ChatCounter.objects.filter(id=counter.id).update(**values)
+
+    for key, values in actual.items():
+        if not any(values.values()):
+            continue
+
+        drift.append((key, "missing"))
+
+        if not dry_run:
+            ChatCounter.objects.create(
+                chat_id=key[0], user_id=key[1], **values
+            )
+
+    return drift
+
+
+def reconcile_members_count(dry_run=False):
+    chat_ids = list(
+        Chat.objects.annotate(actual=get_actual_members_count())
+        .exclude(members_count=F("actual"))
+        .values_list("id", flat=True)
+    )
+
+    if chat_ids and not dry_run:
+        recount_members(chat_ids)
+
+    return chat_ids
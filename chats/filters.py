@@ -1,9 +1,13 @@
-import re
 from urllib.parse import unquote
 
 from django.db.models import Q
 from rest_framework import filters
 
+from application.search import get_rank
+from users.search import search_users
+
+from .search import search_chats
+
 
 class SearchFilter(filters.SearchFilter):
     def filter_queryset(self, request, queryset, view):
@@ -17,27 +21,21 @@ class SearchFilter(filters.SearchFilter):
         except:
             return queryset
 
-        search = search.split()
-
-        is_private_query = Q()
-        is_group_query = Q()
-
-        for term in search:
-            regex = re.escape(term)
+        inbox = request.user.inbox.all()
 
-            is_private_query &= Q(members__last_name__iregex=regex) | Q(
-                members__first_name__iregex=regex
-            )
-
-            is_group_query &= Q(title__iregex=regex)
-
-        queryset = (
-            queryset.prefetch_related("members")
-            .filter(
-                (Q(is_private=True) & is_private_query)
-                | (Q(is_private=False) & is_group_query)
-            )
-            .distinct()
+        chat_ranks = search_chats(
+            search,
+            chat_ids=inbox.filter(chat__is_private=False).values("chat_id"),
+        )
+        user_ranks = search_users(
+            search,
+            user_ids=inbox.values("companion_id"),
         )
 
-        return queryset.order_by("-updated_at")
+        return queryset.filter(
+            Q(chat_id__in=chat_ranks, chat__is_private=False)
+            | Q(companion_id__in=user_ranks)
+        ).order_by(
+            get_rank(chat_id=chat_ranks, companion_id=user_ranks).desc(),
+            "-updated_at",
+        )
@@ -0,0 +1,211 @@
+from django.db import transaction
+from django.db.models import (
+    Case,
+    Count,
+    Exists,
+    F,
+    OuterRef,
+    Subquery,
+    When,
+)
+from django.db.models.functions import Coalesce, Greatest
+
+from msges.models import Message, ReadMark
+from msges.reading import get_unread_messages
+from msges.serializers import MessageSnapshotSerializer
+from users.anonymization import get_deleted_user_full_name
+
+from .models import InboxItem
+
+
+def get_last_message_snapshot(message):
+    if message:
+        return MessageSnapshotSerializer(message).data
+
+
+def get_display_data(chat, user_id, members):
+    if not chat.is_private:
+        return {
+            "companion": None,
+            "title": chat.title,
+            "avatar": chat.avatar.name or None,
+        }
+
+    companion = next(
+        (member for member in members if member.id != user_id), None
+    )
+
+    if companion is None:
+        return {
+            "companion": None,
+            "title": get_deleted_user_full_name(),
+            "avatar": None,
+        }
+
+    return {
+        "companion": companion,
+        "title": companion.get_full_name(),
+        "avatar": companion.avatar.name or None,
+    }
+
+
+def add_inbox_items(chat, user_ids):
+    members = list(chat.members.all()) if chat.is_private else []
+    message = chat.messages.first()
+    last_message = get_last_message_snapshot(message)
+
+    items = []
+
+    for user_id in user_ids:
+        if message:
+            unread_messages_count = get_unread_messages(chat, user_id).count()
+        else:
+            unread_messages_count = 0
+
+        items.append(
+            InboxItem(
+                user_id=user_id,
+                chat=chat,
+                last_message=last_message,
+                unread_messages_count=unread_messages_count,
+                updated_at=chat.updated_at,
+                **get_display_data(chat, user_id, members),
+            )
+        )
+
+    InboxItem.objects.bulk_create(items, ignore_conflicts=True)
+
+
+def remove_inbox_items(chat, user_ids):
+    InboxItem.objects.filter(chat=chat, user_id__in=user_ids).delete()
+
+
+def update_inbox_on_chat_update(chat):
+    InboxItem.objects.filter(chat=chat).update(
+        title=chat.title,
+        avatar=chat.avatar.name or None,
+        updated_at=chat.updated_at,
+    )
+
+
+def update_inbox_on_user_update(user):
+    InboxItem.objects.filter(companion=user).update(
+        title=user.get_full_name(),
+        avatar=user.avatar.name or None,
+    )
+
+
+def update_inbox_on_create(message):
+    items = InboxItem.objects.filter(chat_id=message.chat_id)
+
+    # A message committed out of order must not replace a newer last message
+    items.filter(updated_at__lte=message.created_at).update(
+        last_message=get_last_message_snapshot(message),
+        updated_at=message.created_at,
+    )
+    items.update(
+        unread_messages_count=Case(
+            When(
+                user_id=message.sender_id,
+                then=F("unread_messages_count"),
+            ),
+            default=F("unread_messages_count") + 1,
+        ),
+    )
+
+
+def update_inbox_on_edit(message):
+    InboxItem.objects.filter(
+        chat_id=message.chat_id,
+        last_message__id=str(message.id),
+    ).update(last_message=get_last_message_snapshot(message))
+
+
+def update_inbox_on_delete(chat, message_id, sender_id, created_at):
+    readers = ReadMark.objects.filter(
+        chat=chat,
+        last_read_at__gte=created_at,
+    ).values("user_id")
+
+    InboxItem.objects.filter(
+        chat=chat,
+        unread_messages_count__gt=0,
+    ).exclude(
+        user_id=sender_id
+    ).exclude(user_id__in=readers).update(
+        unread_messages_count=F("unread_messages_count") - 1
+    )
+
+    InboxItem.objects.filter(
+        chat=chat,
+        last_message__id=str(message_id),
+    ).update(last_message=get_last_message_snapshot(chat.messages.first()))
+
+
+def update_inbox_on_bulk_delete(messages):
+    messages = messages.order_by()
+    deleted = list(messages.values_list("id", "chat_id"))
+
+    if not deleted:
+        return
+
+    message_ids = [str(message_id) for message_id, _ in deleted]
+    chat_ids = {chat_id for _, chat_id in deleted}
+
+    # Runs before the delete, while the messages can still be counted
+    readers = ReadMark.objects.filter(
+        chat_id=OuterRef("chat_id"),
+        user_id=OuterRef(OuterRef("user_id")),
+        last_read_at__gte=OuterRef("created_at"),
+    )
+    unread = (
+        messages.filter(chat_id=OuterRef("chat_id"))
+        .exclude(sender_id=OuterRef("user_id"))
+        .exclude(Exists(readers))
+        .values("chat_id")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+
+    InboxItem.objects.filter(
+        chat_id__in=chat_ids,
+        unread_messages_count__gt=0,
+    ).update(
+        unread_messages_count=Greatest(
+            F("unread_messages_count") - Coalesce(Subquery(unread), 0), 0
+        )
+    )
+
+    for chat_id in (
+        InboxItem.objects.filter(
+            chat_id__in=chat_ids,
+            last_message__id__in=message_ids,
+        )
+        .values_list("chat_id", flat=True)
+        .distinct()
+    ):
+        message = (
+            Message.objects.filter(chat_id=chat_id)
+            .exclude(id__in=[message_id for message_id, _ in deleted])
+            .first()
+        )
+
+        InboxItem.objects.filter(
+            chat_id=chat_id,
+            last_message__id__in=message_ids,
+        ).update(last_message=get_last_message_snapshot(message))
+
+
+def update_inbox_on_read(chat, user_id):
+    InboxItem.objects.filter(chat=chat, user_id=user_id).update(
+        unread_messages_count=get_unread_messages(chat, user_id).count()
+    )
+
+
+def rebuild_inbox(chats):
+    for chat in chats:
+        with transaction.atomic():
+            InboxItem.objects.filter(chat=chat).delete()
+            add_inbox_items(
+                chat, list(chat.members.values_list("id", flat=True))
+            )
@@ -0,0 +1,115 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, transaction
+from django.utils import timezone
+
+from chats.activity import buffer_chat_activity, flush_chat_activity
+from chats.models import Chat
+from msges.models import Message
+from users.models import User
+
+
+def save_chat(chat_id, updated_at):
+    chat = Chat.objects.get(id=chat_id)
+    chat.updated_at = updated_at
+    chat.save()
+
+
+def update_chat(chat_id, updated_at):
+    Chat.objects.filter(id=chat_id, updated_at__lt=updated_at).update(
+        updated_at=updated_at
+    )
+
+
+def buffer_chat(chat_id, updated_at):
+    transaction.on_commit(lambda: buffer_chat_activity(chat_id, updated_at))
+
+
+MODES = {
+    "save": save_chat,
+    "update": update_chat,
+    "buffer": buffer_chat,
+}
+
+
+class Command(BaseCommand):
+    help = "Measure concurrent sends per second into one chat"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--count", type=int, default=50)
+        parser.add_argument(
+            "--mode", action="append", choices=list(MODES), default=None
+        )
+
+    def send(self, touch, chat_id, user_id, count, errors):
+        try:
+            for _ in range(count):
+                try:
+                    with transaction.atomic():
+                        message = Message.objects.create(
+                            chat_id=chat_id,
+                            sender_id=user_id,
+                            text="Benchmark message",
+                        )
+                        touch(chat_id, message.created_at)
+                except OperationalError:
+                    errors.append(1)
+        finally:
+            connection.close()
+
+    def run(self, mode, chat, user, threads_count, count):
+        errors = []
+        threads = [
+            threading.Thread(
+                target=self.send,
+                args=(MODES[mode], chat.id, user.id, count, errors),
+            )
+            for _ in range(threads_count)
+        ]
+
+        started_at = time.perf_counter()
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        elapsed = time.perf_counter() - started_at
+
+        if mode == "buffer":
+            flush_chat_activity()
+
+        sent = threads_count * count - len(errors)
+
+        self.stdout.write(
+            f"{mode}: {sent / elapsed:.1f} sends/s, {sent} sent, "
+            f"{len(errors)} failed, {elapsed:.2f} s"
+        )
+
+    def handle(self, *args, **options):
+        user, _ = User.objects.get_or_create(
+            username="benchmark_activity",
+            defaults={"first_name": "Benchmark", "last_name": "Activity"},
+        )
+
+        for mode in options["mode"] or MODES:
+            chat = Chat.objects.create(
+                is_private=False,
+                title="Benchmark",
+                creator=user,
+                updated_at=timezone.now(),
+            )
+            chat.members.add(user)
+
+            try:
+                self.run(
+                    mode, chat, user, options["threads"], options["count"]
+                )
+            finally:
+                chat.delete()
+
+        user.delete()
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django_redis import get_redis_connection
+
+from chats import membership
+
+
+class Command(BaseCommand):
+    help = "Compare cached chat members with the database"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Invalidate cached chats that differ from the database",
+        )
+
+    def handle(self, *args, **options):
+        connection = get_redis_connection("default")
+        checked = 0
+        stale = []
+
+        for chat_id in membership.get_cached_chat_ids():
+            cached = connection.smembers(
+                membership.MEMBERS_KEY.format(chat_id)
+            )
+            cached = {user_id.decode() for user_id in cached}
+            cached.discard(membership.EMPTY_MEMBER)
+
+            checked += 1
+
+            if cached != set(membership.load_members(chat_id)):
+                stale.append(chat_id)
+                self.stdout.write(f"Stale members cache for chat {chat_id}")
+
+        if options["fix"]:
+            membership.invalidate(stale)
+
+        self.stdout.write(
+            f"Checked {checked} chats, {len(stale)} stale, "
+            f"stats: {membership.get_stats()}"
+        )
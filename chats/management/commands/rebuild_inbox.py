@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Exists, OuterRef
+
+from chats.inbox import rebuild_inbox
+from chats.models import Chat, InboxItem
+
+
+class Command(BaseCommand):
+    help = "Rebuild users inbox items from chats, messages and read marks"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--missing",
+            action="store_true",
+            help="Only rebuild chats with members missing inbox items",
+        )
+
+    def handle(self, *args, **options):
+        chats = Chat.objects.all()
+
+        if options["missing"]:
+            inbox_items = InboxItem.objects.filter(
+                chat_id=OuterRef("chat_id"),
+                user_id=OuterRef("user_id"),
+            )
+            missing = Chat.members.through.objects.filter(
+                chat_id=OuterRef("pk")
+            ).exclude(Exists(inbox_items))
+            chats = chats.filter(Exists(missing))
+
+        count = 0
+
+        for chat in chats.iterator():
+            rebuild_inbox([chat])
+            count += 1
+
+        self.stdout.write(f"Rebuilt inbox for {count} chats")
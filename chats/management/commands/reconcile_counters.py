@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from chats.counters import reconcile_counters, reconcile_members_count
+
+
+class Command(BaseCommand):
+    help = "Repair quota and members counters from the database"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report counters that drifted",
+        )
+
+    def handle(self, *args, **options):
+        drift = reconcile_counters(dry_run=options["dry_run"])
+
+        for (chat_id, user_id), reason in drift:
+            self.stdout.write(f"{reason}: chat={chat_id} user={user_id}")
+
+        self.stdout.write(f"{len(drift)} counters drifted")
+
+        chat_ids = reconcile_members_count(dry_run=options["dry_run"])
+
+        for chat_id in chat_ids:
+            self.stdout.write(f"members_count: chat={chat_id}")
+
+        self.stdout.write(f"{len(chat_ids)} members counts drifted")
@@ -0,0 +1,125 @@
+import uuid
+
+from django_redis import get_redis_connection
+from redis.exceptions import WatchError
+
+from .models import Chat
+
+MEMBERS_KEY = "chats:members:{}"
+MEMBERS_VERSION_KEY = "chats:members:version:{}"
+MEMBERS_STATS_KEY = "chats:members:stats"
+MEMBERS_TIMEOUT = 60 * 60
+
+# Stored in every cached set so that chats without members are cached too
+EMPTY_MEMBER = ""
+
+MEMBERS_SCRIPT = """
+local members = redis.call('SMEMBERS', KEYS[1])
+if #members > 0 then
+    redis.call('HINCRBY', KEYS[2], 'hits', 1)
+end
+return members
+"""
+
+IS_MEMBER_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return -1
+end
+redis.call('HINCRBY', KEYS[2], 'hits', 1)
+return redis.call('SISMEMBER', KEYS[1], ARGV[1])
+"""
+
+
+def load_members(chat_id):
+    # The shared cache is trusted by writes too, so it is never filled from
+    # a replica that may lag behind
+    return [
+        str(user_id)
+        for user_id in Chat.members.through.objects.using("default")
+        .filter(chat_id=chat_id)
+        .values_list("user_id", flat=True)
+    ]
+
+
+def fill_members(connection, chat_id):
+    key = MEMBERS_KEY.format(chat_id)
+
+    with connection.pipeline() as pipeline:
+        pipeline.watch(MEMBERS_VERSION_KEY.format(chat_id))
+        members = load_members(chat_id)
+
+        pipeline.multi()
+        pipeline.delete(key)
+        pipeline.sadd(key, EMPTY_MEMBER, *members)
+        pipeline.expire(key, MEMBERS_TIMEOUT)
+        pipeline.hincrby(MEMBERS_STATS_KEY, "misses", 1)
+
+        try:
+            pipeline.execute()
+        except WatchError:
+            pass
+
+    return members
+
+
+def members(chat_id):
+    connection = get_redis_connection("default")
+
+    cached = connection.register_script(MEMBERS_SCRIPT)(
+        keys=[MEMBERS_KEY.format(chat_id), MEMBERS_STATS_KEY]
+    )
+
+    if cached:
+        user_ids = [user_id.decode() for user_id in cached]
+    else:
+        user_ids = fill_members(connection, chat_id)
+
+    return [uuid.UUID(user_id) for user_id in user_ids if user_id]
+
+
+def is_member(chat_id, user_id):
+    connection = get_redis_connection("default")
+
+    result = connection.register_script(IS_MEMBER_SCRIPT)(
+        keys=[MEMBERS_KEY.format(chat_id), MEMBERS_STATS_KEY],
+        args=[str(user_id)],
+    )
+
+    if result >= 0:
+        return bool(result)
+
+    return str(user_id) in fill_members(connection, chat_id)
+
+
+def invalidate(chat_ids):
+    chat_ids = list(chat_ids)
+
+    if not chat_ids:
+        return
+
+    pipeline = get_redis_connection("default").pipeline()
+
+    for chat_id in chat_ids:
+        pipeline.incr(MEMBERS_VERSION_KEY.format(chat_id))
+        pipeline.expire(MEMBERS_VERSION_KEY.format(chat_id), MEMBERS_TIMEOUT)
+        pipeline.delete(MEMBERS_KEY.format(chat_id))
+
+    pipeline.execute()
+
+
+def get_cached_chat_ids():
+    connection = get_redis_connection("default")
+    prefix = MEMBERS_KEY.format("")
+
+    for key in connection.scan_iter(match=f"{prefix}*"):
+        chat_id = key.decode().removeprefix(prefix)
+
+        try:
+            yield uuid.UUID(chat_id)
+        except ValueError:
+            continue
+
+
+def get_stats():
+    stats = get_redis_connection("default").hgetall(MEMBERS_STATS_KEY)
+    return {key.decode(): int(value) for key, value in stats.items()}
@@ -0,0 +1,41 @@
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+from application.search import get_tokens
+
+
+def fill_search_tokens(apps, schema_editor):
+    Chat = apps.get_model('chats', 'Chat')
+    ChatSearchToken = apps.get_model('chats', 'ChatSearchToken')
+
+    tokens = [
+        ChatSearchToken(chat_id=chat.id, token=token)
+        for chat in Chat.objects.only('title').iterator()
+        for token in get_tokens(chat.title)
+    ]
+
+    ChatSearchToken.objects.bulk_create(tokens, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chats', '0003_inboxitem'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChatSearchToken',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('token', models.CharField(max_length=64)),
+                ('chat', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='chats.chat')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['token', 'chat'], name='chats_chats_token_1e5eda_idx')],
+                'unique_together': {('chat', 'token')},
+            },
+        ),
+        migrations.RunPython(fill_search_tokens, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,102 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def clear_counters(apps, schema_editor):
+    ChatCounter = apps.get_model('chats', 'ChatCounter')
+    ChatCounter.objects.all().delete()
+
+
+def fill_counters(apps, schema_editor):
+    Chat = apps.get_model('chats', 'Chat')
+    ChatCounter = apps.get_model('chats', 'ChatCounter')
+    Message = apps.get_model('msges', 'Message')
+
+    chats = (
+        Chat.objects.filter(creator__isnull=False)
+        .values('creator_id')
+        .annotate(
+            private_chats_count=Count('id', filter=Q(is_private=True)),
+            group_chats_count=Count('id', filter=Q(is_private=False)),
+        )
+        .order_by()
+    )
+
+    ChatCounter.objects.bulk_create(
+        [
+            ChatCounter(
+                user_id=row['creator_id'],
+                private_chats_count=row['private_chats_count'],
+                group_chats_count=row['group_chats_count'],
+            )
+            for row in chats.iterator()
+        ],
+        batch_size=1000,
+    )
+
+    messages = (
+        Message.objects.filter(sender__isnull=False)
+        .values('chat_id', 'sender_id')
+        .annotate(messages_count=Count('id'))
+        .order_by()
+    )
+
+    ChatCounter.objects.bulk_create(
+        [
+            ChatCounter(
+                chat_id=row['chat_id'],
+                user_id=row['sender_id'],
+                messages_count=row['messages_count'],
+            )
+            for row in messages.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chats', '0004_search_tokens'),
+        ('msges', '0004_message_fts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_counters, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='chatcounter',
+            name='chats_count',
+        ),
+        migrations.RemoveField(
+            model_name='chatcounter',
+            name='unread_messages_count',
+        ),
+        migrations.AddField(
+            model_name='chatcounter',
+            name='group_chats_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='chatcounter',
+            name='private_chats_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='chatcounter',
+            name='chat',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='counters', to='chats.chat'),
+        ),
+        migrations.AlterField(
+            model_name='chatcounter',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='counters', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='chatcounter',
+            constraint=models.UniqueConstraint(condition=models.Q(('chat__isnull', True)), fields=('user',), name='chats_chatcounter_unique_user'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
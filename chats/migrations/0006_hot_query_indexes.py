@@ -0,0 +1,43 @@
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chats', '0005_chatcounter_quotas'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='inboxitem',
+            name='chats_inbox_user_id_c08fbc_idx',
+        ),
+        # Dropping the index directly avoids rebuilding the table on SQLite
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    'DROP INDEX IF EXISTS "chats_chat_updated_at_0f571f9e"',
+                    'CREATE INDEX "chats_chat_updated_at_0f571f9e" '
+                    'ON "chats_chat" ("updated_at")',
+                ),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='chat',
+                    name='updated_at',
+                    field=models.DateTimeField(default=django.utils.timezone.now),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='chat',
+            index=models.Index(fields=['updated_at', 'id'], name='chats_chat_updated_5d3e6b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inboxitem',
+            index=models.Index(fields=['user', '-updated_at', '-chat'], name='chats_inbox_user_id_06c85d_idx'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def fill_pair_keys(apps, schema_editor):
+    Chat = apps.get_model('chats', 'Chat')
+
+    members = defaultdict(list)
+
+    for chat_id, user_id in Chat.members.through.objects.filter(
+        chat__is_private=True
+    ).values_list('chat_id', 'user_id').iterator():
+        members[chat_id].append(user_id)
+
+    keys = set()
+    chats = []
+
+    # Older duplicates of a pair keep an empty key and stay readable
+    for chat in Chat.objects.filter(is_private=True).order_by('-updated_at'):
+        user_ids = members.get(chat.id, [])
+
+        if len(user_ids) != 2:
+            continue
+
+        pair_key = ':'.join(sorted(user_id.hex for user_id in user_ids))
+
+        if pair_key in keys:
+            continue
+
+        keys.add(pair_key)
+        chat.pair_key = pair_key
+        chats.append(chat)
+
+    Chat.objects.bulk_update(chats, ['pair_key'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chats', '0007_alter_chat_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chat',
+            name='pair_key',
+            field=models.CharField(blank=True, editable=False, max_length=65, null=True),
+        ),
+        migrations.RunPython(fill_pair_keys, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='chat',
+            name='pair_key',
+            field=models.CharField(blank=True, editable=False, max_length=65, null=True, unique=True),
+        ),
+    ]
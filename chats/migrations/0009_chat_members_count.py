@@ -0,0 +1,35 @@
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_members_count(apps, schema_editor):
+    Chat = apps.get_model('chats', 'Chat')
+
+    Chat.objects.update(
+        members_count=Coalesce(
+            Subquery(
+                Chat.members.through.objects.filter(chat_id=OuterRef('id'))
+                .values('chat_id')
+                .annotate(count=Count('user_id'))
+                .values('count')
+            ),
+            0,
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chats', '0008_chat_pair_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chat',
+            name='members_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_members_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations
+
+
+def store_sender_ids(apps, schema_editor):
+    InboxItem = apps.get_model('chats', 'InboxItem')
+
+    items = []
+
+    for item in InboxItem.objects.exclude(last_message=None).iterator():
+        sender = item.last_message.get('sender')
+
+        if not isinstance(sender, dict):
+            continue
+
+        sender_id = sender.get('id')
+        item.last_message['sender'] = (
+            None if sender_id == 'deleted' else sender_id
+        )
+        items.append(item)
+
+    InboxItem.objects.bulk_update(items, ['last_message'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chats', '0009_chat_members_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(store_sender_ids, migrations.RunPython.noop),
+    ]
@@ -1,20 +1,26 @@
 import uuid
 
 from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import FileExtensionValidator
 from django.db import models
 from django.utils import timezone
 
+from application.ids import uuid7
 from application.settings import Constants
 
 User = get_user_model()
 
 
+def get_pair_key(user_ids):
+    return ":".join(sorted(user_id.hex for user_id in user_ids))
+
+
 class Chat(models.Model):
     id = models.UUIDField(
         editable=False,
         primary_key=True,
-        default=uuid.uuid4,
+        default=uuid7,
     )
 
     title = models.CharField(
@@ -45,21 +51,56 @@ class Chat(models.Model):
         related_name="chats",
     )
 
+    members_count = models.PositiveIntegerField(default=0)
+
     is_private = models.BooleanField()
 
+    pair_key = models.CharField(
+        null=True,
+        blank=True,
+        unique=True,
+        editable=False,
+        max_length=65,
+    )
+
     created_at = models.DateTimeField(db_index=True, default=timezone.now)
 
-    updated_at = models.DateTimeField(db_index=True, default=timezone.now)
+    updated_at = models.DateTimeField(default=timezone.now)
 
     def __str__(self):
         return f"{self.id}"
 
     def get_members_ids_list(self):
-        queryset = self.members.all().values_list("id", flat=True)
-        return list(queryset)
+        from .membership import members
+
+        return members(self.id)
 
     class Meta:
         ordering = ["-updated_at"]
+        indexes = [models.Index(fields=["updated_at", "id"])]
+
+
+class ChatSearchToken(models.Model):
+    id = models.UUIDField(
+        editable=False,
+        primary_key=True,
+        default=uuid.uuid4,
+    )
+
+    chat = models.ForeignKey(
+        Chat,
+        related_name="search_tokens",
+        on_delete=models.CASCADE,
+    )
+
+    token = models.CharField(max_length=64)
+
+    def __str__(self):
+        return f"{self.chat}:{self.token}"
+
+    class Meta:
+        unique_together = ["chat", "token"]
+        indexes = [models.Index(fields=["token", "chat"])]
 
 
 class ChatCounter(models.Model):
@@ -74,23 +115,85 @@ class ChatCounter(models.Model):
         null=True,
         blank=True,
         related_name="counters",
-        on_delete=models.SET_NULL,
+        on_delete=models.CASCADE,
     )
 
     user = models.ForeignKey(
         User,
-        null=True,
-        blank=True,
         related_name="counters",
-        on_delete=models.SET_NULL,
+        on_delete=models.CASCADE,
     )
 
-    chats_count = models.PositiveIntegerField(default=0)
+    private_chats_count = models.PositiveIntegerField(default=0)
+    group_chats_count = models.PositiveIntegerField(default=0)
     messages_count = models.PositiveIntegerField(default=0)
-    unread_messages_count = models.PositiveIntegerField(default=0)
 
     class Meta:
         unique_together = ["chat", "user"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user"],
+                condition=models.Q(chat__isnull=True),
+                name="chats_chatcounter_unique_user",
+            )
+        ]
 
     def __str__(self):
         return f"{self.chat}:{self.user}"
+
+
+class InboxItem(models.Model):
+    id = models.UUIDField(
+        editable=False,
+        primary_key=True,
+        default=uuid.uuid4,
+    )
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="inbox",
+    )
+
+    chat = models.ForeignKey(
+        Chat,
+        on_delete=models.CASCADE,
+        related_name="inbox_items",
+    )
+
+    companion = models.ForeignKey(
+        User,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+    )
+
+    title = models.CharField(
+        null=True,
+        blank=True,
+        max_length=150,
+    )
+
+    avatar = models.ImageField(
+        null=True,
+        blank=True,
+    )
+
+    last_message = models.JSONField(
+        null=True,
+        blank=True,
+        encoder=DjangoJSONEncoder,
+    )
+
+    unread_messages_count = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["-updated_at"]
+        unique_together = ["user", "chat"]
+        indexes = [models.Index(fields=["user", "-updated_at", "-chat"])]
+
+    def __str__(self):
+        return f"{self.user}:{self.chat}"
@@ -0,0 +1,13 @@
+from application.pagination import KeysetPagination
+
+
+class InboxPagination(KeysetPagination):
+    ordering = ("-updated_at", "-chat_id")
+    anchor_field = "chat_id"
+
+
+class MembersPagination(KeysetPagination):
+    ordering = ("id",)
+
+    def is_keyset(self, request):
+        return True
@@ -1,20 +1,46 @@
-from rest_framework.generics import get_object_or_404
+import uuid
+
+from django.db.models import Exists, OuterRef
 from rest_framework.permissions import BasePermission
 
+from application.resolvers import resolve_object
+
+from . import membership
 from .models import Chat
 
 
+def get_request_chat(request, chat_id):
+    queryset = Chat.objects.select_related("creator").annotate(
+        is_member=Exists(
+            Chat.members.through.objects.filter(
+                chat_id=OuterRef("id"),
+                user_id=request.user.id,
+            )
+        )
+    )
+
+    return resolve_object(request, queryset, id=chat_id)
+
+
+def is_request_chat_member(request, chat_id):
+    try:
+        if membership.is_member(uuid.UUID(str(chat_id)), request.user.id):
+            return True
+    except ValueError:
+        pass
+
+    return get_request_chat(request, chat_id).is_member
+
+
 class IsChatMember(BasePermission):
     def has_permission(self, request, view):
-        chat_id = view.kwargs.get("id")
-        chat = get_object_or_404(Chat, id=chat_id)
-        return chat.members.filter(id=request.user.id).exists()
+        chat = get_request_chat(request, view.kwargs.get("id"))
+        return chat.is_member
 
 
 class IsChatCreator(BasePermission):
     def has_permission(self, request, view):
-        chat_id = view.kwargs.get("id")
-        chat = get_object_or_404(Chat, id=chat_id)
+        chat = get_request_chat(request, view.kwargs.get("id"))
 
         if chat.is_private:
             return chat.is_private
@@ -0,0 +1,53 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from application.retention import RetentionPolicy
+from application.settings import CHAT_ACTIVITY_BUFFER
+from msges.models import Message
+from msges.retention import get_messages_files
+from users.anonymization import get_bot_username
+
+from .activity import get_chat_activity
+from .models import Chat
+
+CHATS_RETENTION = timedelta(weeks=2)
+
+
+class ChatRetentionPolicy(RetentionPolicy):
+    name = "chats"
+    ordering = "updated_at"
+
+    def get_time_threshold(self):
+        return timezone.now() - CHATS_RETENTION
+
+    def get_queryset(self):
+        return Chat.objects.exclude(
+            creator__username=get_bot_username()
+        ).filter(updated_at__lt=self.get_time_threshold())
+
+    def get_deletable_ids(self, ids):
+        if not CHAT_ACTIVITY_BUFFER:
+            return ids
+
+        # Messages sent since the last flush only bumped the buffer
+        time_threshold = self.get_time_threshold()
+        activity = get_chat_activity(ids)
+
+        return [
+            chat_id
+            for chat_id in ids
+            if chat_id not in activity or activity[chat_id] < time_threshold
+        ]
+
+    def get_files(self, ids):
+        avatars = (
+            Chat.objects.filter(id__in=ids)
+            .exclude(avatar="")
+            .values_list("avatar", flat=True)
+        )
+
+        return [
+            *avatars,
+            *get_messages_files(Message.objects.filter(chat_id__in=ids)),
+        ]
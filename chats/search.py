@@ -0,0 +1,25 @@
+from application.search import get_tokens, search_tokens, update_tokens
+
+from .models import ChatSearchToken
+
+INDEXED_FIELDS = {"title"}
+
+
+def update_chat_search_tokens(chat):
+    update_tokens(
+        ChatSearchToken.objects.filter(chat=chat),
+        lambda tokens: ChatSearchToken.objects.bulk_create(
+            [ChatSearchToken(chat=chat, token=token) for token in tokens],
+            ignore_conflicts=True,
+        ),
+        get_tokens(chat.title),
+    )
+
+
+def search_chats(query, chat_ids=None):
+    queryset = ChatSearchToken.objects.all()
+
+    if chat_ids is not None:
+        queryset = queryset.filter(chat_id__in=chat_ids)
+
+    return search_tokens(queryset, "chat_id", query)
@@ -1,11 +1,23 @@
-from django.db.models import Count
+import uuid
+
+from django.db import IntegrityError, models, transaction
+from django.utils.dateparse import parse_datetime
 from rest_framework import serializers
 
-from msges.serializers import MessageSerializer
+from application.representation import represent_datetime
+from application.settings import Constants
+from msges.reading import get_unread_messages
+from msges.serializers import MessageSerializer, get_was_read_by
 from users.anonymization import get_deleted_user, get_deleted_user_full_name
-from users.serializers import UserSerializer
+from users.models import User
+from users.serializers import UserSerializer, load_presence, represent_user
+
+from .activity import get_updated_at
+from .models import Chat, InboxItem, get_pair_key
 
-from .models import Chat
+
+def get_members_preview(chat):
+    return chat.members.order_by("id")[: Constants.CHAT_MEMBERS_PREVIEW_SIZE]
 
 
 def get_default_fields(*args):
@@ -13,6 +25,7 @@ def get_default_fields(*args):
         "id",
         "title",
         "members",
+        "members_count",
         "creator",
         "avatar",
         "created_at",
@@ -28,6 +41,7 @@ def get_default_readonly_fields(*args):
     return [
         "id",
         "creator",
+        "members_count",
         "created_at",
         "updated_at",
         "last_message",
@@ -80,7 +94,7 @@ class ChatSerializer(serializers.ModelSerializer):
 
     def get_unread_messages_count(self, instance):
         user = self.context.get("request").user
-        return instance.messages.exclude(was_read_by=user).count()
+        return get_unread_messages(instance, user.id).count()
 
     def to_representation(self, instance):
         representation = super().to_representation(instance)
@@ -95,11 +109,15 @@ class ChatSerializer(serializers.ModelSerializer):
             representation["creator"] = get_deleted_user()
 
         representation["members"] = UserSerializer(
-            instance.members,
+            get_members_preview(instance),
             context=self.context,
             many=True,
         ).data
 
+        representation["updated_at"] = self.fields[
+            "updated_at"
+        ].to_representation(get_updated_at(instance))
+
         representation["last_message"] = representation.get(
             "last_message", None
         )
@@ -116,6 +134,127 @@ class ChatSerializer(serializers.ModelSerializer):
         read_only_fields = get_default_readonly_fields()
 
 
+def get_sender_id(message):
+    if message and message["sender"]:
+        return uuid.UUID(str(message["sender"]))
+
+
+def load_senders(sender_ids, context):
+    senders = context.setdefault("senders", {})
+    sender_ids = {
+        sender_id
+        for sender_id in sender_ids
+        if sender_id and sender_id not in senders
+    }
+
+    # Deleted senders are stored too, so they are not looked up again
+    senders.update(dict.fromkeys(sender_ids))
+    senders.update(User.objects.in_bulk(sender_ids))
+
+    return senders
+
+
+class InboxItemListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        if isinstance(data, models.manager.BaseManager):
+            data = data.all()
+
+        senders = load_senders(
+            (get_sender_id(item.last_message) for item in data),
+            self.context,
+        )
+        users = [sender for sender in senders.values() if sender]
+
+        for item in data:
+            users.extend(item.chat.members_preview)
+
+            if item.chat.creator:
+                users.append(item.chat.creator)
+
+        load_presence(users, self.context)
+
+        return [self.represent(item) for item in data]
+
+    def represent(self, item):
+        return {
+            "id": str(item.chat.id),
+            "title": self.child.get_title(item),
+            "members": [
+                represent_user(user, self.context)
+                for user in item.chat.members_preview
+            ],
+            "members_count": item.chat.members_count,
+            "creator": represent_user(item.chat.creator, self.context),
+            "avatar": self.child.get_avatar(item),
+            "created_at": represent_datetime(item.chat.created_at),
+            "updated_at": represent_datetime(item.updated_at),
+            "is_private": item.chat.is_private,
+            "last_message": self.child.get_last_message(item),
+            "unread_messages_count": item.unread_messages_count,
+        }
+
+
+class InboxItemSerializer(serializers.ModelSerializer):
+    id = serializers.UUIDField(source="chat.id")
+    title = serializers.SerializerMethodField()
+    members = UserSerializer(source="chat.members_preview", many=True)
+    members_count = serializers.IntegerField(source="chat.members_count")
+    creator = UserSerializer(source="chat.creator")
+    avatar = serializers.SerializerMethodField()
+    created_at = serializers.DateTimeField(source="chat.created_at")
+    is_private = serializers.BooleanField(source="chat.is_private")
+    last_message = serializers.SerializerMethodField()
+
+    def is_companion_deleted(self, instance):
+        return instance.chat.is_private and instance.companion_id is None
+
+    def get_title(self, instance):
+        if self.is_companion_deleted(instance):
+            return get_deleted_user_full_name()
+
+        return instance.title
+
+    def get_avatar(self, instance):
+        if instance.avatar and not self.is_companion_deleted(instance):
+            return self.context.get("request").build_absolute_uri(
+                instance.avatar.url
+            )
+
+    def get_last_message(self, instance):
+        message = instance.last_message
+
+        if message is None:
+            return None
+
+        sender_id = get_sender_id(message)
+        sender = load_senders([sender_id], self.context).get(sender_id)
+
+        return {
+            **message,
+            "sender": represent_user(sender, self.context),
+            "was_read_by": get_was_read_by(
+                self.context,
+                instance.chat_id,
+                sender_id,
+                parse_datetime(message["created_at"]),
+            ),
+        }
+
+    def to_representation(self, instance):
+        representation = super().to_representation(instance)
+
+        if representation.get("creator") is None:
+            representation["creator"] = get_deleted_user()
+
+        return representation
+
+    class Meta:
+        model = InboxItem
+        fields = get_default_fields()
+        read_only_fields = fields
+        list_serializer_class = InboxItemListSerializer
+
+
 class PrivateChatSerializer(ChatSerializer):
     creator = serializers.HiddenField(default=serializers.CurrentUserDefault())
 
@@ -135,30 +274,37 @@ class PrivateChatSerializer(ChatSerializer):
 
         return value
 
+    def get_existing(self, pair_key):
+        chat = Chat.objects.filter(pair_key=pair_key).first()
+
+        if chat and not self.context.get("is_fallback"):
+            raise serializers.ValidationError(
+                "Private chat with these members already exists"
+            )
+
+        return chat
+
     def create(self, validated_data):
-        request = self.context.get("request")
-        is_fallback = self.context.get("is_fallback")
-
-        members = validated_data["members"]
-
-        chat = (
-            request.user.chats.filter(is_private=True)
-            .annotate(members_count=Count("members"))
-            .filter(members__in=members)
-            .distinct()
-            .filter(members_count=len(members))
-            .first()
+        pair_key = get_pair_key(
+            member.id for member in validated_data["members"]
         )
 
-        if is_fallback and chat:
+        chat = self.get_existing(pair_key)
+
+        if chat:
             return chat
 
-        if not is_fallback and chat:
-            raise serializers.ValidationError(
-                "Private chat with these members already exists"
-            )
+        try:
+            with transaction.atomic():
+                return super().create({**validated_data, "pair_key": pair_key})
+        except IntegrityError:
+            # A concurrent request created the chat after the lookup
+            chat = self.get_existing(pair_key)
+
+            if chat is None:
+                raise
 
-        return super().create(validated_data)
+            return chat
 
     class Meta:
         model = Chat
@@ -184,9 +330,10 @@ class GroupChatSerializer(ChatSerializer):
                 "Chat must contain other members than current user"
             )
 
-        if len(value) > 100:
+        if len(value) > Constants.MAX_GROUP_CHAT_MEMBERS:
             raise serializers.ValidationError(
-                "Chat must not contain more than 100 members"
+                "Chat must not contain more than "
+                f"{Constants.MAX_GROUP_CHAT_MEMBERS} members"
             )
 
         if user not in value:
@@ -0,0 +1,164 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+
+from application.settings import CENTRIFUGO_CHAT_CHANNELS
+from centrifugo.outbox import add_event
+
+from . import membership
+from .counters import (
+    add_members,
+    decrement,
+    get_chats_count_field,
+    increment,
+    recount_members,
+    remove_members,
+)
+from .inbox import add_inbox_items, remove_inbox_items
+from .models import Chat, InboxItem
+from .search import INDEXED_FIELDS, update_chat_search_tokens
+
+User = get_user_model()
+
+
+def invalidate_members_on_commit(chat_ids):
+    chat_ids = list(chat_ids)
+    transaction.on_commit(lambda: membership.invalidate(chat_ids))
+
+
+@receiver(m2m_changed, sender=Chat.members.through)
+def invalidate_members_on_members_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if action not in {"post_add", "post_remove", "pre_clear"}:
+        return
+
+    if not reverse:
+        invalidate_members_on_commit([instance.id])
+    elif action == "pre_clear":
+        invalidate_members_on_commit(
+            instance.chats.values_list("id", flat=True)
+        )
+    else:
+        invalidate_members_on_commit(pk_set)
+
+
+@receiver(post_delete, sender=Chat)
+def invalidate_members_on_chat_delete(sender, instance, **kwargs):
+    invalidate_members_on_commit([instance.id])
+
+
+@receiver(pre_delete, sender=User)
+def invalidate_members_on_user_delete(sender, instance, **kwargs):
+    invalidate_members_on_commit(instance.chats.values_list("id", flat=True))
+
+
+@receiver(post_save, sender=Chat)
+def update_search_tokens_on_save(sender, instance, update_fields, **kwargs):
+    if update_fields and not INDEXED_FIELDS.intersection(update_fields):
+        return
+
+    update_chat_search_tokens(instance)
+
+
+@receiver(post_save, sender=Chat)
+def increment_chats_count_on_create(sender, instance, created, **kwargs):
+    if created and instance.creator_id:
+        increment(
+            get_chats_count_field(instance.is_private),
+            user_id=instance.creator_id,
+        )
+
+
+@receiver(post_delete, sender=Chat)
+def decrement_chats_count_on_delete(sender, instance, **kwargs):
+    if instance.creator_id:
+        decrement(
+            get_chats_count_field(instance.is_private),
+            user_id=instance.creator_id,
+        )
+
+
+@receiver(m2m_changed, sender=Chat.members.through)
+def update_members_count_on_members_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if action == "post_add" and pk_set:
+        if reverse:
+            add_members(pk_set)
+        else:
+            add_members([instance.id], len(pk_set))
+    elif action == "post_remove" and pk_set:
+        # The removed ids are not checked against the table, so recount
+        recount_members(pk_set if reverse else [instance.id])
+    elif action == "pre_clear" and reverse:
+        remove_members(instance.chats.values_list("id", flat=True))
+    elif action == "post_clear" and not reverse:
+        recount_members([instance.id])
+    else:
+        return
+
+    if not reverse:
+        instance.refresh_from_db(fields=["members_count"])
+
+
+@receiver(pre_delete, sender=User)
+def update_members_count_on_user_delete(sender, instance, **kwargs):
+    remove_members(instance.chats.values_list("id", flat=True))
+
+
+@receiver(m2m_changed, sender=Chat.members.through)
+def update_inbox_on_members_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if action == "post_clear":
+        if reverse:
+            InboxItem.objects.filter(user=instance).delete()
+        else:
+            InboxItem.objects.filter(chat=instance).delete()
+
+        return
+
+    if action not in {"post_add", "post_remove"}:
+        return
+
+    if reverse:
+        changes = [
+            (chat, [instance.id])
+            for chat in Chat.objects.filter(id__in=pk_set)
+        ]
+    else:
+        changes = [(instance, pk_set)]
+
+    for chat, user_ids in changes:
+        if action == "post_add":
+            add_inbox_items(chat, user_ids)
+        else:
+            remove_inbox_items(chat, user_ids)
+
+
+@receiver(m2m_changed, sender=Chat.members.through)
+def publish_members_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if not CENTRIFUGO_CHAT_CHANNELS or not pk_set:
+        return
+
+    if action not in {"post_add", "post_remove"}:
+        return
+
+    if reverse:
+        changes = [(chat_id, [instance.id]) for chat_id in pk_set]
+    else:
+        changes = [(instance.id, pk_set)]
+
+    event = "join" if action == "post_add" else "leave"
+
+    for chat_id, user_ids in changes:
+        add_event(event, {"users": sorted(user_ids)}, chat_id)
@@ -1,23 +1,20 @@
-from datetime import timedelta
-
-from django.db import transaction
-from django.utils import timezone
-
 from application.celery import app
-from users.anonymization import get_bot_username
-
-from .models import Chat
+from application.retention import run_policy
 
+from .activity import flush_chat_activity
+from .retention import ChatRetentionPolicy
 
-def remove_old_chats():
-    with transaction.atomic():
-        time_threshold = timezone.now() - timedelta(weeks=2)
 
-        Chat.objects.exclude(creator__username=get_bot_username()).filter(
-            updated_at__lt=time_threshold
-        ).delete()
+def remove_old_chats(**kwargs):
+    flush_chat_activity()
+    return run_policy(ChatRetentionPolicy(), **kwargs)
 
 
 @app.task
 def start_removing_old_chats():
     remove_old_chats()
+
+
+@app.task
+def start_flushing_chat_activity():
+    flush_chat_activity()
@@ -0,0 +1,87 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from application.testing import create_chat, create_user, get_client
+from chats.inbox import update_inbox_on_create
+from chats.models import InboxItem
+from msges.models import Message
+from users.anonymization import get_deleted_user
+from users.presence import touch
+
+
+class InboxLastMessageSenderTest(TestCase):
+    def setUp(self):
+        self.alice = create_user("alice", first_name="Alice")
+        self.bob = create_user("bob")
+        self.chat = create_chat(self.alice, [self.bob])
+
+        response = get_client(self.alice).post(
+            "/api/messages/", {"chat": str(self.chat.id), "text": "Hello"}
+        )
+        self.assertEqual(response.status_code, 201)
+
+    def get_last_message(self):
+        response = get_client(self.bob).get("/api/chats/")
+        self.assertEqual(response.status_code, 200)
+
+        return response.json()["results"][0]["last_message"]
+
+    def test_sender_is_rendered_live(self):
+        response = get_client(self.alice).patch(
+            f"/api/user/{self.alice.id}/", {"first_name": "Alicia"}
+        )
+        self.assertEqual(response.status_code, 200)
+        touch(self.alice.id)
+
+        sender = self.get_last_message()["sender"]
+
+        self.assertEqual(sender["first_name"], "Alicia")
+        self.assertTrue(sender["is_online"])
+
+    def test_deleted_sender(self):
+        self.alice.delete()
+
+        self.assertEqual(self.get_last_message()["sender"], get_deleted_user())
+
+
+class InboxUpdateTest(TestCase):
+    def setUp(self):
+        self.alice = create_user("alice")
+        self.bob = create_user("bob")
+        self.chat = create_chat(self.alice, [self.bob])
+
+    def test_older_message_keeps_last_message(self):
+        newer = Message.objects.create(
+            chat=self.chat, sender=self.alice, text="Newer"
+        )
+        update_inbox_on_create(newer)
+
+        older = Message.objects.create(
+            chat=self.chat,
+            sender=self.alice,
+            text="Older",
+            created_at=newer.created_at - timedelta(seconds=1),
+        )
+        update_inbox_on_create(older)
+
+        item = InboxItem.objects.get(chat=self.chat, user=self.bob)
+
+        self.assertEqual(item.last_message["id"], str(newer.id))
+        self.assertEqual(item.updated_at, newer.created_at)
+        self.assertEqual(item.unread_messages_count, 2)
+
+    def test_rebuild_missing(self):
+        other_chat = create_chat(self.bob, [self.alice])
+        InboxItem.objects.filter(chat=self.chat, user=self.bob).delete()
+
+        output = StringIO()
+        call_command("rebuild_inbox", "--missing", stdout=output)
+
+        self.assertIn("Rebuilt inbox for 1 chats", output.getvalue())
+        self.assertTrue(
+            InboxItem.objects.filter(chat=self.chat, user=self.bob).exists()
+        )
+        self.assertEqual(InboxItem.objects.filter(chat=other_chat).count(), 2)
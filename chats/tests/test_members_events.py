@@ -0,0 +1,82 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from application.testing import create_chat, create_user, get_client
+from centrifugo.client import CentrifugoClient
+from centrifugo.outbox import drain_outbox
+
+
+class MembersEventsTest(TestCase):
+    def setUp(self):
+        self.alice = create_user("alice")
+        self.bob = create_user("bob")
+        self.carol = create_user("carol")
+        self.chat = create_chat(self.alice, [self.bob])
+
+        self.enterContext(
+            mock.patch("chats.signals.CENTRIFUGO_CHAT_CHANNELS", True)
+        )
+
+    def drain(self):
+        commands = []
+
+        def send(method, payload):
+            commands.extend(payload["commands"])
+            return {"replies": [{"result": {}} for _ in payload["commands"]]}
+
+        with mock.patch.object(CentrifugoClient, "send", side_effect=send):
+            drain_outbox()
+
+        return commands
+
+    def get_broadcast(self, event):
+        return {
+            "broadcast": {
+                "channels": [str(self.bob.id)],
+                "data": {"event": event, "message": {"chat": self.chat.id}},
+            }
+        }
+
+    def test_leaving_member_is_unsubscribed(self):
+        response = get_client(self.bob).post(
+            f"/api/chat/{self.chat.id}/leave/"
+        )
+        self.assertEqual(response.status_code, 200)
+
+        commands = self.drain()
+
+        self.assertIn(self.get_broadcast("leave"), commands)
+        self.assertIn(
+            {
+                "unsubscribe": {
+                    "user": str(self.bob.id),
+                    "channel": f"chat:{self.chat.id}",
+                }
+            },
+            commands,
+        )
+
+    def test_added_member_is_notified(self):
+        response = get_client(self.alice).patch(
+            f"/api/chat/{self.chat.id}/",
+            {"members": [str(self.carol.id), str(self.bob.id)]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+
+        commands = self.drain()
+
+        self.assertIn(
+            {
+                "broadcast": {
+                    "channels": [str(self.carol.id)],
+                    "data": {
+                        "event": "join",
+                        "message": {"chat": self.chat.id},
+                    },
+                }
+            },
+            commands,
+        )
+        self.assertNotIn(self.get_broadcast("join"), commands)
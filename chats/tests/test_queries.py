@@ -0,0 +1,47 @@
+from django.test import TestCase
+
+from application.testing import create_chat, create_user, get_client
+from chats.membership import is_member
+from msges.models import Message
+from msges.reading import advance_read_mark
+
+
+class ChatQueriesTest(TestCase):
+    def setUp(self):
+        self.alice = create_user("alice")
+        self.bob = create_user("bob")
+        self.chat = create_chat(self.alice, [self.bob])
+        self.message = Message.objects.create(
+            chat=self.chat, sender=self.alice, text="Hello"
+        )
+
+        is_member(self.chat.id, self.alice.id)
+
+    def test_get(self):
+        client = get_client(self.alice)
+        url = f"/api/chat/{self.chat.id}/"
+
+        with self.assertNumQueries(9):
+            self.assertEqual(client.get(url).status_code, 200)
+
+        others = [create_user(f"user{index}") for index in range(10)]
+        self.chat.members.add(*others)
+
+        for user in others:
+            advance_read_mark(self.chat.id, user.id, self.message)
+
+        with self.assertNumQueries(9):
+            response = client.get(url)
+
+        self.assertEqual(response.json()["members_count"], 12)
+
+    def test_patch(self):
+        with self.assertNumQueries(17):
+            response = get_client(self.alice).patch(
+                f"/api/chat/{self.chat.id}/",
+                {"title": "Renamed"},
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["title"], "Renamed")
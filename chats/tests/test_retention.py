@@ -0,0 +1,70 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+from django_redis import get_redis_connection
+
+from application import retention
+from application.testing import create_chat, create_user
+from chats.activity import ACTIVITY_KEY, buffer_chat_activity
+from chats.models import Chat
+from chats.retention import ChatRetentionPolicy
+from msges.models import Message
+
+
+class ChatRetentionTest(TestCase):
+    def setUp(self):
+        self.alice = create_user("alice")
+        self.stale = create_chat(self.alice, [], avatar="chats/stale.png")
+        self.revived = create_chat(self.alice, [], avatar="chats/revived.png")
+        Message.objects.create(
+            chat=self.revived, sender=self.alice, voice="msges/revived.ogg"
+        )
+
+        Chat.objects.update(updated_at=timezone.now() - timedelta(weeks=3))
+
+        self.deleted_files = []
+        self.enterContext(
+            mock.patch.object(
+                retention, "delete_files", self.deleted_files.extend
+            )
+        )
+
+    def test_only_still_matching_rows_are_deleted(self):
+        get_batch = retention.get_batch
+
+        def revive_after_batch(*args):
+            batch = get_batch(*args)
+            Chat.objects.filter(id=self.revived.id).update(
+                updated_at=timezone.now()
+            )
+            return batch
+
+        with (
+            mock.patch.object(retention, "get_batch", revive_after_batch),
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            metrics = retention.run_policy(
+                ChatRetentionPolicy(), pause=0, dry_run=False
+            )
+
+        self.assertEqual(metrics["rows"], 1)
+        self.assertEqual(list(Chat.objects.all()), [self.revived])
+        self.assertEqual(self.deleted_files, ["chats/stale.png"])
+
+    def test_chats_with_buffered_activity_are_kept(self):
+        self.enterContext(
+            mock.patch("chats.retention.CHAT_ACTIVITY_BUFFER", True)
+        )
+        self.addCleanup(get_redis_connection("default").delete, ACTIVITY_KEY)
+        buffer_chat_activity(self.revived.id, timezone.now())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            metrics = retention.run_policy(
+                ChatRetentionPolicy(), batch_size=1, pause=0, dry_run=False
+            )
+
+        self.assertEqual(metrics["rows"], 1)
+        self.assertEqual(list(Chat.objects.all()), [self.revived])
+        self.assertEqual(self.deleted_files, ["chats/stale.png"])
@@ -1,4 +1,5 @@
 from django.db import transaction
+from django.db.models import Prefetch
 from django.utils import timezone
 from rest_framework import generics, status
 from rest_framework.decorators import api_view, permission_classes
@@ -6,30 +7,58 @@ from rest_framework.exceptions import MethodNotAllowed, PermissionDenied
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from application.pagination import Pagination
+from application.replicas import ReplicaReadMixin
 from application.settings import PRODUCTION, Constants
+from msges.reading import get_read_marks
 from users.anonymization import get_bot_username
+from users.models import User
+from users.search import search_users
+from users.serializers import UserSerializer
 
+from .counters import get_chats_count
 from .filters import SearchFilter
+from .inbox import update_inbox_on_chat_update
 from .models import Chat
-from .permissions import IsChatCreator, IsChatMember
+from .pagination import InboxPagination, MembersPagination
+from .permissions import IsChatCreator, IsChatMember, get_request_chat
 from .serializers import (
     ChatSerializer,
     GroupChatPatchSerializer,
     GroupChatSerializer,
+    InboxItemSerializer,
     IsPrivateSerializer,
     PrivateChatSerializer,
 )
 
 
-class ChatListCreateView(generics.ListCreateAPIView):
-    pagination_class = Pagination
-    serializer_class = ChatSerializer
+class ChatListCreateView(ReplicaReadMixin, generics.ListCreateAPIView):
+    pagination_class = InboxPagination
+    serializer_class = InboxItemSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [SearchFilter]
 
     def get_queryset(self):
-        return self.request.user.chats.all()
+        return self.request.user.inbox.select_related(
+            "chat__creator"
+        ).prefetch_related(
+            Prefetch(
+                "chat__members",
+                queryset=User.objects.order_by("id")[
+                    : Constants.CHAT_MEMBERS_PREVIEW_SIZE
+                ],
+                to_attr="members_preview",
+            )
+        )
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+
+        context = self.get_serializer_context()
+        context["read_marks"] = get_read_marks([item.chat_id for item in page])
+
+        serializer = self.get_serializer(page, many=True, context=context)
+        return self.get_paginated_response(serializer.data)
 
     def post(self, request, *args, **kwargs):
         is_private = IsPrivateSerializer(data=request.data)
@@ -39,7 +68,7 @@ class ChatListCreateView(generics.ListCreateAPIView):
         if (
             is_private
             and PRODUCTION
-            and request.user.creator.filter(is_private=True).count()
+            and get_chats_count(request.user.id, is_private=True)
             >= Constants.MAX_PRIVATE_CHATS_PER_USER
         ):
             return Response(
@@ -52,7 +81,7 @@ class ChatListCreateView(generics.ListCreateAPIView):
         if (
             not is_private
             and PRODUCTION
-            and request.user.creator.filter(is_private=False).count()
+            and get_chats_count(request.user.id, is_private=False)
             >= Constants.MAX_GROUP_CHATS_PER_USER
         ):
             return Response(
@@ -78,14 +107,14 @@ class ChatListCreateView(generics.ListCreateAPIView):
             with transaction.atomic():
                 chat = serializer.save()
                 chat.updated_at = chat.created_at
-                chat.save()
+                chat.save(update_fields=["updated_at"])
 
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class ChatDetail(generics.RetrieveUpdateDestroyAPIView):
+class ChatDetail(ReplicaReadMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Chat.objects.all()
     http_method_names = ["get", "patch", "delete"]
 
@@ -94,7 +123,7 @@ class ChatDetail(generics.RetrieveUpdateDestroyAPIView):
 
     def get_object(self):
         chat_id = self.kwargs["id"]
-        return generics.get_object_or_404(Chat, id=chat_id)
+        return get_request_chat(self.request, chat_id)
 
     def get_permissions(self):
         if self.request.method == "GET":
@@ -117,16 +146,36 @@ class ChatDetail(generics.RetrieveUpdateDestroyAPIView):
         with transaction.atomic():
             chat = serializer.save()
             chat.updated_at = timezone.now()
-            chat.save()
+            chat.save(update_fields=["updated_at"])
+
+            update_inbox_on_chat_update(chat)
 
     def put(self, request, *args, **kwargs):
         raise MethodNotAllowed()
 
 
+class ChatMembersView(ReplicaReadMixin, generics.ListAPIView):
+    serializer_class = UserSerializer
+    pagination_class = MembersPagination
+    permission_classes = [IsAuthenticated, IsChatMember]
+
+    def get_queryset(self):
+        user_ids = Chat.members.through.objects.filter(
+            chat_id=self.kwargs["id"]
+        ).values("user_id")
+
+        search = self.request.query_params.get("search")
+
+        if search:
+            user_ids = list(search_users(search, user_ids))
+
+        return User.objects.filter(id__in=user_ids)
+
+
 @api_view(["POST"])
 @permission_classes([IsAuthenticated, IsChatMember])
 def leave_chat(request, id):
-    chat = generics.get_object_or_404(Chat, id=id)
+    chat = get_request_chat(request, id)
 
     if chat.is_private:
         return Response(
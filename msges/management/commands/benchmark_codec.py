@@ -0,0 +1,170 @@
+import io
+import json
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from rest_framework import parsers, renderers
+
+from application import codec
+from application.parsers import JSONParser
+from application.renderers import JSONRenderer
+from application.representation import represent_datetime
+
+
+def get_user(index):
+    return {
+        "id": str(uuid.uuid4()),
+        "username": f"user{index}",
+        "first_name": "Иван",
+        "last_name": f"Petrov {index}",
+        "bio": "Bio" if index % 2 else None,
+        "avatar": (
+            f"https://example.com/media/users/avatars/{index}.png"
+            if index % 3
+            else None
+        ),
+        "is_online": bool(index % 2),
+        "last_online_at": represent_datetime(timezone.now()),
+    }
+
+
+def get_message(index, readers):
+    created_at = timezone.now() - timedelta(seconds=index)
+
+    return {
+        "id": str(uuid.uuid4()),
+        "text": f"Сообщение {index} with some text, emoji 🙂 and more",
+        "voice": None,
+        "sender": get_user(index),
+        "chat": uuid.uuid4(),
+        "files": [
+            {"item": f"https://example.com/media/msges/files/{index}.png"}
+        ],
+        "updated_at": represent_datetime(created_at),
+        "created_at": represent_datetime(created_at),
+        "was_read_by": readers,
+    }
+
+
+def get_payloads(count, readers_count):
+    readers = [get_user(index) for index in range(readers_count)]
+    messages = [get_message(index, readers) for index in range(count)]
+    channels = [str(uuid.uuid4()) for _ in range(readers_count)]
+
+    return {
+        "messages page": (
+            {"next": None, "previous": None, "results": messages},
+            False,
+        ),
+        "broadcast batch": (
+            {
+                "commands": [
+                    {
+                        "broadcast": {
+                            "channels": channels,
+                            "data": {"event": "create", "message": message},
+                        }
+                    }
+                    for message in messages
+                ]
+            },
+            True,
+        ),
+        "read events": (
+            [
+                {
+                    "event": "read_up_to",
+                    "message": {
+                        "chat": uuid.uuid4(),
+                        "user": uuid.uuid4(),
+                        "last_read_message": uuid.uuid4(),
+                        "last_read_at": timezone.now(),
+                    },
+                }
+                for _ in range(count)
+            ],
+            True,
+        ),
+    }
+
+
+class Command(BaseCommand):
+    help = "Compare the JSON codec with the stdlib json encoding"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=100)
+        parser.add_argument("--readers", type=int, default=10)
+        parser.add_argument("--repeat", type=int, default=200)
+
+    def measure(self, func, repeat):
+        started_at = time.perf_counter()
+
+        for _ in range(repeat):
+            func()
+
+        return (time.perf_counter() - started_at) / repeat * 1000
+
+    def report(self, name, legacy, fast, size):
+        self.stdout.write(
+            f"{name}: {size} bytes, {legacy:.3f} ms json, "
+            f"{fast:.3f} ms {codec.get_backend()} ({legacy / fast:.1f}x)"
+        )
+
+    def handle(self, *args, **options):
+        repeat = options["repeat"]
+
+        for name, (payload, publisher) in get_payloads(
+            options["count"], options["readers"]
+        ).items():
+            if publisher:
+
+                def encode_legacy():
+                    return json.dumps(payload, cls=DjangoJSONEncoder).encode()
+
+                def encode():
+                    return codec.dumps(payload, DjangoJSONEncoder)
+
+                if json.loads(encode_legacy()) != json.loads(encode()):
+                    raise CommandError(f"{name}: decoded payloads differ")
+            else:
+
+                def encode_legacy():
+                    return renderers.JSONRenderer().render(payload)
+
+                def encode():
+                    return JSONRenderer().render(payload)
+
+                if encode_legacy() != encode():
+                    raise CommandError(f"{name}: rendered bytes differ")
+
+            data = encode()
+
+            self.report(
+                f"{name} encode",
+                self.measure(encode_legacy, repeat),
+                self.measure(encode, repeat),
+                len(data),
+            )
+
+            if publisher:
+                continue
+
+            def parse_legacy():
+                return parsers.JSONParser().parse(io.BytesIO(data))
+
+            def parse():
+                return JSONParser().parse(io.BytesIO(data))
+
+            if parse_legacy() != parse():
+                raise CommandError(f"{name}: parsed data differs")
+
+            self.report(
+                f"{name} parse",
+                self.measure(parse_legacy, repeat),
+                self.measure(parse, repeat),
+                len(data),
+            )
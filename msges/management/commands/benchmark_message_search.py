@@ -0,0 +1,87 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from chats.models import Chat
+from msges.models import Message
+from msges.search import FTS5SearchBackend, RegexSearchBackend
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = "Compare full-text message search with the regex search"
+
+    def add_arguments(self, parser):
+        parser.add_argument("query")
+        parser.add_argument("--user", help="Search the chats of this user")
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--limit", type=int, default=10)
+
+    def get_queryset(self, username):
+        queryset = Message.objects.select_related("sender")
+
+        if username:
+            user = User.objects.get(username=username)
+            queryset = queryset.filter(
+                chat_id__in=Chat.members.through.objects.filter(
+                    user_id=user.id
+                ).values("chat_id")
+            )
+
+        return queryset
+
+    def search_regex_fields(self, queryset, query):
+        condition = Q()
+
+        for field in (
+            "text",
+            "sender__username",
+            "sender__first_name",
+            "sender__last_name",
+        ):
+            condition |= Q(**{f"{field}__iregex": query})
+
+        return queryset.filter(condition).order_by("-created_at", "-id")
+
+    def measure(self, label, search, repeat, limit):
+        started_at = time.perf_counter()
+
+        for _ in range(repeat):
+            page = list(search()[:limit])
+            count = search().count()
+
+        elapsed = (time.perf_counter() - started_at) / repeat * 1000
+        self.stdout.write(
+            f"{label}: {elapsed:.2f} ms per page, {count} matches, "
+            f"{len(page)} on first page"
+        )
+
+    def handle(self, *args, **options):
+        query = options["query"]
+        repeat = options["repeat"]
+        limit = options["limit"]
+        queryset = self.get_queryset(options["user"])
+
+        self.measure(
+            "search_fields regex",
+            lambda: self.search_regex_fields(queryset, query),
+            repeat,
+            limit,
+        )
+        self.measure(
+            "regex backend",
+            lambda: RegexSearchBackend().search(queryset, query),
+            repeat,
+            limit,
+        )
+
+        backend = FTS5SearchBackend()
+
+        if backend.is_available():
+            self.measure(
+                "fts5 backend",
+                lambda: backend.search(queryset, query),
+                repeat,
+                limit,
+            )
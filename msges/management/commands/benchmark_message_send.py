@@ -0,0 +1,169 @@
+import statistics
+import time
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from centrifugo import outbox
+from centrifugo.outbox import add_event
+from chats.inbox import update_inbox_on_create
+from chats.models import Chat
+from chats.permissions import get_request_chat
+from msges.models import Message, MessageFile
+from msges.serializers import MessageCreateSerializer, MessageSerializer
+from msges.views import MessageListCreateView
+from users.models import User
+
+
+class Rollback(Exception):
+    pass
+
+
+class LegacyMessageCreateSerializer(MessageCreateSerializer):
+    def create(self, validated_data):
+        request = self.context.get("request")
+
+        validated_data.pop("files", [])
+        message = Message.objects.create(**validated_data)
+
+        for file_data in request.FILES.getlist("files"):
+            MessageFile.objects.create(message=message, item=file_data)
+
+        return message
+
+
+class LegacyMessageCreateView(MessageListCreateView):
+    # The send path before it was cut down: the message and the chat are
+    # saved twice and the message is serialized once more for the event
+    def post(self, request, *args, **kwargs):
+        chat = get_request_chat(request, request.data.get("chat"))
+
+        if not chat.is_member:
+            raise PermissionDenied()
+
+        serializer = LegacyMessageCreateSerializer(
+            data=request.data, context=self.get_serializer_context()
+        )
+        serializer.is_valid(raise_exception=True)
+
+        with transaction.atomic():
+            message = serializer.save(chat=chat)
+
+            message.updated_at = message.created_at
+            message.save()
+
+            chat.updated_at = message.created_at
+            chat.save()
+
+            update_inbox_on_create(message)
+            add_event(
+                "create",
+                MessageSerializer(message, context={"request": request}).data,
+                chat.id,
+            )
+
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class Command(BaseCommand):
+    help = "Measure queries and latency of POST /api/messages/"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=50)
+        parser.add_argument("--members", type=int, default=10)
+        parser.add_argument("--files", type=int, default=0)
+
+    def create_chat(self, members_count):
+        users = [
+            User.objects.create_user(
+                username=f"benchmark_{index}",
+                first_name="Benchmark",
+                last_name=str(index),
+            )
+            for index in range(members_count)
+        ]
+
+        chat = Chat.objects.create(
+            is_private=False, title="Benchmark", creator=users[0]
+        )
+        chat.members.add(*users)
+
+        return users[0], chat
+
+    def send(self, view, user, chat, files_count):
+        data = {"chat": str(chat.id), "text": "Benchmark message"}
+
+        if files_count:
+            data["files"] = [
+                SimpleUploadedFile(f"benchmark_{index}.txt", b"benchmark")
+                for index in range(files_count)
+            ]
+
+        request = APIRequestFactory().post("/api/messages/", data)
+        force_authenticate(request, user)
+
+        with CaptureQueriesContext(connection) as queries:
+            started_at = time.perf_counter()
+            response = view(request)
+            elapsed = time.perf_counter() - started_at
+
+        if response.status_code != 201:
+            raise RuntimeError(response.data)
+
+        return len(queries), elapsed * 1000
+
+    def measure(self, view, user, chat, options):
+        results = [
+            self.send(view, user, chat, options["files"])
+            for _ in range(options["count"])
+        ]
+
+        queries = [count for count, _ in results]
+        latency = sorted(elapsed for _, elapsed in results)
+
+        return (
+            statistics.median(queries),
+            statistics.median(latency),
+            latency[int(len(latency) * 0.95) - 1],
+        )
+
+    def handle(self, *args, **options):
+        results = {}
+
+        try:
+            with transaction.atomic():
+                user, chat = self.create_chat(options["members"])
+
+                with mock.patch.object(outbox, "schedule_drain"):
+                    for name, view in (
+                        ("baseline", LegacyMessageCreateView.as_view()),
+                        ("new", MessageListCreateView.as_view()),
+                    ):
+                        results[name] = self.measure(view, user, chat, options)
+
+                raise Rollback()
+        except Rollback:
+            pass
+
+        self.stdout.write(
+            f"{options['count']} sends, {options['files']} files each"
+        )
+
+        for name, (queries, median, p95) in results.items():
+            self.stdout.write(
+                f"{name}: {queries:g} queries, "
+                f"median {median:.2f} ms, p95 {p95:.2f} ms"
+            )
+
+        baseline, new = results["baseline"], results["new"]
+        self.stdout.write(
+            f"new vs baseline: {baseline[0] - new[0]:g} fewer queries, "
+            f"median {baseline[1] / new[1]:.1f}x faster"
+        )
@@ -0,0 +1,105 @@
+import os
+import random
+import sqlite3
+import tempfile
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+
+from application.ids import uuid7
+
+# Mirrors msges_message and its indexes without the text columns
+SCHEMA = [
+    'CREATE TABLE "message" ("id" char(32) NOT NULL PRIMARY KEY, '
+    '"chat_id" char(32) NOT NULL, "sender_id" char(32) NULL, '
+    '"created_at" datetime NOT NULL)',
+    'CREATE INDEX "message_chat" ON "message" '
+    '("chat_id", "created_at" DESC, "id" DESC)',
+    'CREATE INDEX "message_created_at" ON "message" ("created_at", "id")',
+]
+
+PK_INDEX = "sqlite_autoindex_message_1"
+
+
+class Command(BaseCommand):
+    help = "Compare insert speed and index size of uuid4 and uuid7 ids"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=200_000)
+        parser.add_argument("--rows", type=int, default=50_000)
+        parser.add_argument("--batch", type=int, default=100)
+        parser.add_argument("--chats", type=int, default=1_000)
+        parser.add_argument("--cache-pages", type=int, default=500)
+
+    def insert(self, connection, generate, chats, count, batch):
+        for offset in range(0, count, batch):
+            rows = [
+                (
+                    generate().hex,
+                    random.choice(chats),
+                    random.choice(chats),
+                    time.time(),
+                )
+                for _ in range(min(batch, count - offset))
+            ]
+
+            with connection:
+                connection.executemany(
+                    'INSERT INTO "message" VALUES (?, ?, ?, ?)', rows
+                )
+
+    def get_index_size(self, connection, name):
+        try:
+            return connection.execute(
+                "SELECT SUM(pgsize), COUNT(*) FROM dbstat WHERE name = ?",
+                [name],
+            ).fetchone()
+        except sqlite3.OperationalError:
+            return None, None
+
+    def measure(self, label, generate, options):
+        chats = [uuid.uuid4().hex for _ in range(options["chats"])]
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "benchmark.sqlite3")
+            connection = sqlite3.connect(path, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(f"PRAGMA cache_size={options['cache_pages']}")
+
+            for statement in SCHEMA:
+                connection.execute(statement)
+
+            connection.isolation_level = ""
+
+            self.insert(connection, generate, chats, options["seed"], 10_000)
+
+            started_at = time.perf_counter()
+            self.insert(
+                connection,
+                generate,
+                chats,
+                options["rows"],
+                options["batch"],
+            )
+            elapsed = time.perf_counter() - started_at
+
+            size, pages = self.get_index_size(connection, PK_INDEX)
+            page_count = connection.execute("PRAGMA page_count").fetchone()
+            connection.close()
+
+        self.stdout.write(
+            f"{label}: {options['rows'] / elapsed:.0f} inserts/s, "
+            f"{page_count[0]} database pages"
+        )
+
+        if size is not None:
+            self.stdout.write(
+                f"    primary key index: {size / 1024:.0f} KiB "
+                f"in {pages} pages"
+            )
+
+    def handle(self, *args, **options):
+        self.measure("uuid4", uuid.uuid4, options)
+        self.measure("uuid7", uuid7, options)
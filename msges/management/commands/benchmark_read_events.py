@@ -0,0 +1,145 @@
+import json
+import time
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from rest_framework.test import APIClient
+
+from application import decorators
+from application.settings import READ_EVENT_DEBOUNCE
+from centrifugo import outbox
+from centrifugo.models import OutboxEvent
+from chats.models import Chat
+from msges.models import Message
+from msges.reading import get_read_marks
+from msges.serializers import MessageSerializer
+from users.models import User
+
+
+class Rollback(Exception):
+    pass
+
+
+def get_size(data):
+    return len(json.dumps(data, cls=DjangoJSONEncoder))
+
+
+class Command(BaseCommand):
+    help = "Compare read receipts per message with debounced read events"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=50)
+        parser.add_argument("--members", type=int, default=10)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0.05,
+            help="Seconds between two reads of the scrolling user",
+        )
+
+    def create_chat(self, members_count):
+        users = [
+            User.objects.create_user(
+                username=f"benchmark_{index}",
+                first_name="Benchmark",
+                last_name=str(index),
+            )
+            for index in range(members_count)
+        ]
+
+        chat = Chat.objects.create(
+            is_private=False, title="Benchmark", creator=users[0]
+        )
+        chat.members.add(*users)
+
+        messages = Message.objects.bulk_create(
+            [
+                Message(chat=chat, sender=users[0], text=f"Benchmark {index}")
+                for index in range(self.count)
+            ]
+        )
+
+        return users[1], chat, messages
+
+    def read(self, client, messages, interval):
+        scheduled = []
+
+        def apply_async(kwargs, countdown):
+            scheduled.append((time.monotonic() + countdown, kwargs))
+
+        def run_due(now):
+            for item in [item for item in scheduled if item[0] <= now]:
+                scheduled.remove(item)
+                decorators.run_deferred_call(**item[1])
+
+        with mock.patch.object(
+            decorators.start_deferred_call,
+            "apply_async",
+            side_effect=apply_async,
+        ) as scheduler:
+            for message in messages:
+                run_due(time.monotonic())
+                response = client.post(f"/api/message/{message.id}/read/")
+
+                if response.status_code != 200:
+                    raise RuntimeError(response.content)
+
+                time.sleep(interval)
+
+            run_due(float("inf"))
+
+        return scheduler.call_count
+
+    def get_legacy_size(self, chat, messages):
+        context = {"read_marks": get_read_marks([chat.id])}
+
+        return sum(
+            get_size(MessageSerializer(message, context=context).data)
+            for message in messages
+        )
+
+    def handle(self, *args, **options):
+        self.count = options["count"]
+
+        try:
+            with transaction.atomic():
+                reader, chat, messages = self.create_chat(options["members"])
+
+                client = APIClient()
+                client.force_authenticate(reader)
+
+                first_event = OutboxEvent.objects.order_by("-id").first()
+                after = first_event.id if first_event else 0
+
+                with mock.patch.object(outbox, "schedule_drain"):
+                    task_count = self.read(
+                        client, messages, options["interval"]
+                    )
+
+                events = list(
+                    OutboxEvent.objects.filter(
+                        id__gt=after, chat_id=chat.id
+                    ).values_list("message", flat=True)
+                )
+
+                legacy_size = self.get_legacy_size(chat, messages)
+                size = sum(get_size(event) for event in events)
+
+                raise Rollback()
+        except Rollback:
+            pass
+
+        self.stdout.write(
+            f"{self.count} reads, {options['interval'] * 1000:.0f} ms apart, "
+            f"{READ_EVENT_DEBOUNCE} s window, {options['members']} members"
+        )
+        self.stdout.write(
+            f"per message: {self.count} tasks, {self.count} broadcasts, "
+            f"{legacy_size} payload bytes"
+        )
+        self.stdout.write(
+            f"debounced: {task_count} tasks, {len(events)} broadcasts, "
+            f"{size} payload bytes"
+        )
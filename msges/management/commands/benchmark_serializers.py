@@ -0,0 +1,201 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from application.settings import Constants
+from chats.inbox import rebuild_inbox
+from chats.models import Chat
+from chats.serializers import InboxItemSerializer
+from msges.models import Message, MessageFile, ReadMark
+from msges.search import get_backend
+from msges.serializers import MessageSearchSerializer, MessageSerializer
+from users.models import User
+from users.serializers import UserSerializer
+
+
+class Rollback(Exception):
+    pass
+
+
+def get_legacy_serializer(serializer_class):
+    class LegacyListSerializer(serializer_class.Meta.list_serializer_class):
+        def represent(self, item):
+            return self.child.to_representation(item)
+
+    return LegacyListSerializer
+
+
+class Command(BaseCommand):
+    help = "Time the list serializers against the ModelSerializers"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=100)
+        parser.add_argument("--members", type=int, default=20)
+        parser.add_argument("--chats", type=int, default=20)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def create_data(self, options):
+        now = timezone.now()
+        users = [
+            User.objects.create_user(
+                username=f"benchmark_{index}",
+                first_name="Benchmark",
+                last_name=str(index),
+                bio="Benchmark" if index % 2 else None,
+                avatar=f"users/avatars/{index}.png" if index % 3 else None,
+            )
+            for index in range(options["members"])
+        ]
+        reader = users[0]
+
+        chats = [
+            Chat.objects.create(
+                is_private=False, title=f"Benchmark {index}", creator=reader
+            )
+            for index in range(options["chats"])
+        ]
+
+        for chat in chats:
+            chat.members.add(*users)
+
+        chat = chats[0]
+        messages = Message.objects.bulk_create(
+            [
+                Message(
+                    chat=chat,
+                    sender=users[index % len(users)] if index % 7 else None,
+                    text=f"Benchmark message {index}",
+                    voice=f"msges/voices/{index}.ogg" if index % 5 else "",
+                    created_at=now - timedelta(seconds=index),
+                    updated_at=now - timedelta(seconds=index),
+                )
+                for index in range(options["count"])
+            ]
+        )
+
+        MessageFile.objects.bulk_create(
+            [
+                MessageFile(message=message, item=f"msges/files/{index}.png")
+                for index, message in enumerate(messages)
+                if index % 4 == 0
+            ]
+        )
+
+        ReadMark.objects.bulk_create(
+            [
+                ReadMark(
+                    chat=chat,
+                    user=user,
+                    last_read_message=messages[index],
+                    last_read_at=messages[index].created_at,
+                )
+                for index, user in enumerate(users)
+            ]
+        )
+
+        rebuild_inbox(chats)
+
+        return reader, chat
+
+    def get_pages(self, reader, chat):
+        messages = (
+            Message.objects.filter(chat=chat)
+            .select_related("sender")
+            .prefetch_related("files")
+            .order_by("-created_at", "-id")
+        )
+        inbox = reader.inbox.select_related("chat__creator").prefetch_related(
+            Prefetch(
+                "chat__members",
+                queryset=User.objects.order_by("id")[
+                    : Constants.CHAT_MEMBERS_PREVIEW_SIZE
+                ],
+                to_attr="members_preview",
+            )
+        )
+
+        return {
+            "messages": (MessageSerializer, list(messages)),
+            "message search": (
+                MessageSearchSerializer,
+                list(get_backend().search(messages, "benchmark")),
+            ),
+            "inbox": (InboxItemSerializer, list(inbox)),
+            "members": (UserSerializer, list(chat.members.order_by("id"))),
+        }
+
+    def render(self, serializer):
+        return JSONRenderer().render(serializer.data)
+
+    def serialize(self, serializer_class, page, request, legacy):
+        context = {"request": request}
+
+        if legacy:
+            return get_legacy_serializer(serializer_class)(
+                page, child=serializer_class(), context=context
+            )
+
+        return serializer_class(page, many=True, context=context)
+
+    def measure(self, serializer_class, page, request, legacy, repeat):
+        started_at = time.perf_counter()
+
+        for _ in range(repeat):
+            self.render(
+                self.serialize(serializer_class, page, request, legacy)
+            )
+
+        elapsed = time.perf_counter() - started_at
+        return len(page) * repeat / elapsed if elapsed else 0
+
+    def handle(self, *args, **options):
+        results = []
+
+        try:
+            with transaction.atomic():
+                reader, chat = self.create_data(options)
+
+                request = Request(APIRequestFactory().get("/api/messages/"))
+                request.user = reader
+
+                for name, (serializer_class, page) in self.get_pages(
+                    reader, chat
+                ).items():
+                    results.append(
+                        (
+                            name,
+                            len(page),
+                            self.measure(
+                                serializer_class,
+                                page,
+                                request,
+                                True,
+                                options["repeat"],
+                            ),
+                            self.measure(
+                                serializer_class,
+                                page,
+                                request,
+                                False,
+                                options["repeat"],
+                            ),
+                        )
+                    )
+
+                raise Rollback()
+        except Rollback:
+            pass
+
+        for name, count, legacy, fast in results:
+            self.stdout.write(
+                f"{name}: {count} rows, "
+                f"{legacy:.0f} rows/s serializer, {fast:.0f} rows/s fast "
+                f"({fast / legacy:.1f}x)"
+            )
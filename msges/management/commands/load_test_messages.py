@@ -0,0 +1,148 @@
+import multiprocessing
+import statistics
+import threading
+import time
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from rest_framework.test import APIClient
+
+from centrifugo import outbox
+from centrifugo.models import OutboxEvent
+from chats.models import Chat
+from msges import writer
+from users.models import User
+
+
+def send_messages(user_id, chat_id, count, results):
+    client = APIClient()
+    client.force_authenticate(User.objects.get(id=user_id))
+
+    for _ in range(count):
+        started_at = time.perf_counter()
+
+        try:
+            response = client.post(
+                "/api/messages/",
+                {"chat": str(chat_id), "text": "Load test message"},
+            )
+            status_code = response.status_code
+        except Exception:
+            status_code = 500
+
+        results.append((status_code, time.perf_counter() - started_at))
+
+    connections.close_all()
+
+
+def run_process(group_commit, user_ids, chat_id, threads_count, count, queue):
+    writer.MESSAGE_GROUP_COMMIT = group_commit
+    results = []
+
+    with mock.patch.object(outbox, "schedule_drain"):
+        threads = [
+            threading.Thread(
+                target=send_messages,
+                args=(
+                    user_ids[index % len(user_ids)],
+                    chat_id,
+                    count,
+                    results,
+                ),
+            )
+            for index in range(threads_count)
+        ]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+    queue.put(results)
+
+
+class Command(BaseCommand):
+    help = "Compare message write throughput with and without group commit"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=4)
+        parser.add_argument("--threads", type=int, default=4)
+        parser.add_argument("--count", type=int, default=25)
+
+    def create_chat(self, members_count):
+        users = [
+            User.objects.create_user(
+                username=f"load_test_{index}",
+                first_name="Load",
+                last_name=str(index),
+            )
+            for index in range(members_count)
+        ]
+
+        chat = Chat.objects.create(
+            is_private=False, title="Load test", creator=users[0]
+        )
+        chat.members.add(*users)
+
+        return users, chat
+
+    def run(self, group_commit, user_ids, chat_id, options):
+        connections.close_all()
+
+        context = multiprocessing.get_context("fork")
+        queue = context.Queue()
+        processes = [
+            context.Process(
+                target=run_process,
+                args=(
+                    group_commit,
+                    user_ids,
+                    chat_id,
+                    options["threads"],
+                    options["count"],
+                    queue,
+                ),
+            )
+            for _ in range(options["processes"])
+        ]
+
+        started_at = time.perf_counter()
+
+        for process in processes:
+            process.start()
+
+        results = [row for _ in processes for row in queue.get()]
+
+        for process in processes:
+            process.join()
+
+        elapsed = time.perf_counter() - started_at
+
+        latency = sorted(
+            elapsed * 1000 for status, elapsed in results if status == 201
+        )
+        failed = sum(1 for status, _ in results if status != 201)
+
+        self.stdout.write(
+            f"group commit {'on' if group_commit else 'off'}: "
+            f"{len(latency) / elapsed:.1f} writes/s, {failed} failed, "
+            f"median {statistics.median(latency or [0]):.1f} ms, "
+            f"p95 {latency[int(len(latency) * 0.95) - 1] if latency else 0:.1f} ms"
+        )
+
+    def handle(self, *args, **options):
+        users, chat = self.create_chat(
+            options["processes"] * options["threads"]
+        )
+        user_ids = [user.id for user in users]
+
+        try:
+            for group_commit in (False, True):
+                self.run(group_commit, user_ids, chat.id, options)
+        finally:
+            # The events were never meant to be published
+            OutboxEvent.objects.filter(chat_id=chat.id).delete()
+            chat.delete()
+            User.objects.filter(id__in=user_ids).delete()
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from msges.search import get_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the message full-text search index"
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        count = backend.reindex()
+
+        self.stdout.write(
+            f"Indexed {count} messages with {type(backend).__name__}"
+        )
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+
+from application.retention import run_policy
+from application.settings import RETENTION_BATCH_PAUSE, RETENTION_BATCH_SIZE
+from centrifugo.retention import OutboxRetentionPolicy
+from chats.retention import ChatRetentionPolicy
+from msges.retention import MessageRetentionPolicy
+
+POLICIES = {
+    "messages": MessageRetentionPolicy,
+    "chats": ChatRetentionPolicy,
+    "outbox": OutboxRetentionPolicy,
+}
+
+
+class Command(BaseCommand):
+    help = "Delete old messages and chats in batches with their files"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--policy",
+            action="append",
+            choices=list(POLICIES),
+            help="Policy to run, all by default",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count rows and files that would be deleted",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=RETENTION_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--pause", type=float, default=RETENTION_BATCH_PAUSE
+        )
+
+    def handle(self, *args, **options):
+        for name in options["policy"] or POLICIES:
+            metrics = run_policy(
+                POLICIES[name](),
+                batch_size=options["batch_size"],
+                pause=options["pause"],
+                dry_run=options["dry_run"],
+            )
+
+            self.stdout.write(
+                ", ".join(f"{key}={value}" for key, value in metrics.items())
+            )
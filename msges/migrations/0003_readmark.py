@@ -0,0 +1,92 @@
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def fill_read_marks(apps, schema_editor):
+    Message = apps.get_model('msges', 'Message')
+    ReadMark = apps.get_model('msges', 'ReadMark')
+    WasReadBy = Message._meta.get_field('was_read_by').remote_field.through
+
+    rows = (
+        WasReadBy.objects.values('user_id', 'message__chat_id')
+        .annotate(last_read_at=Max('message__created_at'))
+        .order_by()
+    )
+
+    marks = []
+
+    for row in rows.iterator():
+        message = Message.objects.filter(
+            chat_id=row['message__chat_id'],
+            created_at=row['last_read_at'],
+        ).first()
+
+        marks.append(
+            ReadMark(
+                chat_id=row['message__chat_id'],
+                user_id=row['user_id'],
+                last_read_at=row['last_read_at'],
+                last_read_message=message,
+            )
+        )
+
+    ReadMark.objects.bulk_create(marks, batch_size=500)
+
+
+def fill_was_read_by(apps, schema_editor):
+    Message = apps.get_model('msges', 'Message')
+    ReadMark = apps.get_model('msges', 'ReadMark')
+    WasReadBy = Message._meta.get_field('was_read_by').remote_field.through
+
+    for mark in ReadMark.objects.iterator():
+        messages = (
+            Message.objects.filter(
+                chat_id=mark.chat_id,
+                created_at__lte=mark.last_read_at,
+            )
+            .exclude(sender_id=mark.user_id)
+            .values_list('id', flat=True)
+        )
+
+        WasReadBy.objects.bulk_create(
+            [
+                WasReadBy(message_id=message_id, user_id=mark.user_id)
+                for message_id in messages.iterator()
+            ],
+            batch_size=500,
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chats', '0002_initial'),
+        ('msges', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReadMark',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('last_read_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('chat', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='read_marks', to='chats.chat')),
+                ('last_read_message', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='msges.message')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='read_marks', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('chat', 'user')},
+            },
+        ),
+        migrations.RunPython(fill_read_marks, fill_was_read_by),
+        migrations.RemoveField(
+            model_name='message',
+            name='was_read_by',
+        ),
+    ]
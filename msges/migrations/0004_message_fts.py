@@ -0,0 +1,71 @@
+from django.db import migrations
+
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS msges_message_fts USING fts5(
+        text,
+        message_id UNINDEXED,
+        chat_id UNINDEXED,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS msges_message_fts_insert
+    AFTER INSERT ON msges_message WHEN new.text IS NOT NULL
+    BEGIN
+        INSERT INTO msges_message_fts (rowid, text, message_id, chat_id)
+        VALUES (new.rowid, new.text, new.id, new.chat_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS msges_message_fts_update
+    AFTER UPDATE OF text ON msges_message
+    BEGIN
+        DELETE FROM msges_message_fts WHERE rowid = old.rowid;
+        INSERT INTO msges_message_fts (rowid, text, message_id, chat_id)
+        SELECT new.rowid, new.text, new.id, new.chat_id
+        WHERE new.text IS NOT NULL;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS msges_message_fts_delete
+    AFTER DELETE ON msges_message
+    BEGIN
+        DELETE FROM msges_message_fts WHERE rowid = old.rowid;
+    END
+    """,
+    """
+    INSERT INTO msges_message_fts (rowid, text, message_id, chat_id)
+    SELECT rowid, text, id, chat_id FROM msges_message
+    WHERE text IS NOT NULL
+    """,
+]
+
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS msges_message_fts_insert',
+    'DROP TRIGGER IF EXISTS msges_message_fts_update',
+    'DROP TRIGGER IF EXISTS msges_message_fts_delete',
+    'DROP TABLE IF EXISTS msges_message_fts',
+]
+
+
+def run_sql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('msges', '0003_readmark'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_sql(CREATE_SQL), run_sql(DROP_SQL)),
+    ]
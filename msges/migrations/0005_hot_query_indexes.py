@@ -0,0 +1,54 @@
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chats', '0006_hot_query_indexes'),
+        ('msges', '0004_message_fts'),
+    ]
+
+    operations = [
+        # Altering the fields would rebuild the table on SQLite and drop the
+        # full-text search triggers, so only the single column indexes go
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    'DROP INDEX IF EXISTS "msges_message_chat_id_5977af1a"',
+                    'CREATE INDEX "msges_message_chat_id_5977af1a" '
+                    'ON "msges_message" ("chat_id")',
+                ),
+                migrations.RunSQL(
+                    'DROP INDEX IF EXISTS "msges_message_created_at_2dc249c6"',
+                    'CREATE INDEX "msges_message_created_at_2dc249c6" '
+                    'ON "msges_message" ("created_at")',
+                ),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='message',
+                    name='chat',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='messages', to='chats.chat'),
+                ),
+                migrations.AlterField(
+                    model_name='message',
+                    name='created_at',
+                    field=models.DateTimeField(default=django.utils.timezone.now),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['chat', '-created_at', '-id'], name='msges_messa_chat_id_55c5da_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['chat', 'sender', 'created_at'], name='msges_messa_chat_id_0f5605_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['created_at', 'id'], name='msges_messa_created_ecdb82_idx'),
+        ),
+    ]
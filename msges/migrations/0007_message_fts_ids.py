@@ -0,0 +1,123 @@
+from django.db import migrations
+
+# The implicit rowid of msges_message is not stable (VACUUM may renumber it),
+# so the index rows are mapped to the message ids instead
+CREATE_SQL = [
+    'DROP TRIGGER IF EXISTS msges_message_fts_insert',
+    'DROP TRIGGER IF EXISTS msges_message_fts_update',
+    'DROP TRIGGER IF EXISTS msges_message_fts_delete',
+    """
+    CREATE TABLE IF NOT EXISTS msges_message_fts_ids (
+        message_id char(32) NOT NULL PRIMARY KEY,
+        fts_rowid integer NOT NULL
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS msges_message_fts_insert
+    AFTER INSERT ON msges_message WHEN new.text IS NOT NULL
+    BEGIN
+        INSERT INTO msges_message_fts (text, message_id, chat_id)
+        VALUES (new.text, new.id, new.chat_id);
+        INSERT INTO msges_message_fts_ids (message_id, fts_rowid)
+        VALUES (new.id, last_insert_rowid());
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS msges_message_fts_update
+    AFTER UPDATE OF text ON msges_message
+    BEGIN
+        DELETE FROM msges_message_fts WHERE rowid = (
+            SELECT fts_rowid FROM msges_message_fts_ids
+            WHERE message_id = old.id
+        );
+        DELETE FROM msges_message_fts_ids WHERE message_id = old.id;
+        INSERT INTO msges_message_fts (text, message_id, chat_id)
+        SELECT new.text, new.id, new.chat_id
+        WHERE new.text IS NOT NULL;
+        INSERT INTO msges_message_fts_ids (message_id, fts_rowid)
+        SELECT new.id, last_insert_rowid()
+        WHERE new.text IS NOT NULL;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS msges_message_fts_delete
+    AFTER DELETE ON msges_message
+    BEGIN
+        DELETE FROM msges_message_fts WHERE rowid = (
+            SELECT fts_rowid FROM msges_message_fts_ids
+            WHERE message_id = old.id
+        );
+        DELETE FROM msges_message_fts_ids WHERE message_id = old.id;
+    END
+    """,
+    'DELETE FROM msges_message_fts',
+    """
+    INSERT INTO msges_message_fts (text, message_id, chat_id)
+    SELECT text, id, chat_id FROM msges_message
+    WHERE text IS NOT NULL
+    """,
+    """
+    INSERT INTO msges_message_fts_ids (message_id, fts_rowid)
+    SELECT message_id, rowid FROM msges_message_fts
+    """,
+]
+
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS msges_message_fts_insert',
+    'DROP TRIGGER IF EXISTS msges_message_fts_update',
+    'DROP TRIGGER IF EXISTS msges_message_fts_delete',
+    'DROP TABLE IF EXISTS msges_message_fts_ids',
+    """
+    CREATE TRIGGER IF NOT EXISTS msges_message_fts_insert
+    AFTER INSERT ON msges_message WHEN new.text IS NOT NULL
+    BEGIN
+        INSERT INTO msges_message_fts (rowid, text, message_id, chat_id)
+        VALUES (new.rowid, new.text, new.id, new.chat_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS msges_message_fts_update
+    AFTER UPDATE OF text ON msges_message
+    BEGIN
+        DELETE FROM msges_message_fts WHERE rowid = old.rowid;
+        INSERT INTO msges_message_fts (rowid, text, message_id, chat_id)
+        SELECT new.rowid, new.text, new.id, new.chat_id
+        WHERE new.text IS NOT NULL;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS msges_message_fts_delete
+    AFTER DELETE ON msges_message
+    BEGIN
+        DELETE FROM msges_message_fts WHERE rowid = old.rowid;
+    END
+    """,
+    'DELETE FROM msges_message_fts',
+    """
+    INSERT INTO msges_message_fts (rowid, text, message_id, chat_id)
+    SELECT rowid, text, id, chat_id FROM msges_message
+    WHERE text IS NOT NULL
+    """,
+]
+
+
+def run_sql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('msges', '0006_alter_message_id'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_sql(CREATE_SQL), run_sql(DROP_SQL)),
+    ]
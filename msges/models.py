@@ -5,6 +5,7 @@ from django.core.validators import FileExtensionValidator
 from django.db import models
 from django.utils import timezone
 
+from application.ids import uuid7
 from application.settings import Constants
 from chats.models import Chat
 
@@ -15,7 +16,7 @@ class Message(models.Model):
     id = models.UUIDField(
         editable=False,
         primary_key=True,
-        default=uuid.uuid4,
+        default=uuid7,
     )
 
     text = models.TextField(
@@ -33,10 +34,7 @@ class Message(models.Model):
         ],
     )
 
-    created_at = models.DateTimeField(
-        default=timezone.now,
-        db_index=True,
-    )
+    created_at = models.DateTimeField(default=timezone.now)
 
     updated_at = models.DateTimeField(
         null=True,
@@ -56,12 +54,7 @@ class Message(models.Model):
         Chat,
         on_delete=models.CASCADE,
         related_name="messages",
-    )
-
-    was_read_by = models.ManyToManyField(
-        User,
-        blank=True,
-        related_name="reader",
+        db_index=False,
     )
 
     def __str__(self):
@@ -69,6 +62,11 @@ class Message(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["chat", "-created_at", "-id"]),
+            models.Index(fields=["chat", "sender", "created_at"]),
+            models.Index(fields=["created_at", "id"]),
+        ]
 
 
 class MessageFile(models.Model):
@@ -94,3 +92,42 @@ class MessageFile(models.Model):
 
     def __str__(self):
         return f"{self.message}:{self.id}"
+
+
+class ReadMark(models.Model):
+    id = models.UUIDField(
+        editable=False,
+        primary_key=True,
+        default=uuid.uuid4,
+    )
+
+    chat = models.ForeignKey(
+        Chat,
+        on_delete=models.CASCADE,
+        related_name="read_marks",
+    )
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="read_marks",
+    )
+
+    last_read_at = models.DateTimeField(
+        default=timezone.now,
+        db_index=True,
+    )
+
+    last_read_message = models.ForeignKey(
+        Message,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+    )
+
+    class Meta:
+        unique_together = ["chat", "user"]
+
+    def __str__(self):
+        return f"{self.chat}:{self.user}"
@@ -1,11 +1,27 @@
-from rest_framework import generics, serializers
+from django.db.models import Exists, OuterRef
+from rest_framework import serializers
 from rest_framework.permissions import BasePermission
 
+from application.resolvers import resolve_object
 from chats.models import Chat
+from chats.permissions import is_request_chat_member
 
 from .models import Message
 
 
+def get_request_message(request, message_id):
+    queryset = Message.objects.select_related("chat", "sender").annotate(
+        is_member=Exists(
+            Chat.members.through.objects.filter(
+                chat_id=OuterRef("chat_id"),
+                user_id=request.user.id,
+            )
+        )
+    )
+
+    return resolve_object(request, queryset, id=message_id)
+
+
 class IsChatMember(BasePermission):
     def has_permission(self, request, view):
         if request.method == "GET":
@@ -16,26 +32,22 @@ class IsChatMember(BasePermission):
                     "Chat UUID is required in url"
                 )
 
-        chat = generics.get_object_or_404(Chat, id=chat_id)
-        return chat.members.filter(id=request.user.id).exists()
+        return is_request_chat_member(request, chat_id)
 
 
 class IsMessageChatMember(BasePermission):
     def has_permission(self, request, view):
-        message_id = view.kwargs.get("id")
-        message = generics.get_object_or_404(Message, id=message_id)
-        return message.chat.members.filter(id=request.user.id).exists()
+        message = get_request_message(request, view.kwargs.get("id"))
+        return message.is_member
 
 
 class IsMessageSender(BasePermission):
     def has_permission(self, request, view):
-        message_id = view.kwargs.get("id")
-        message = generics.get_object_or_404(Message, id=message_id)
-        return message.sender and message.sender.id == request.user.id
+        message = get_request_message(request, view.kwargs.get("id"))
+        return message.sender_id and message.sender_id == request.user.id
 
 
 class IsNotMessageSender(BasePermission):
     def has_permission(self, request, view):
-        message_id = view.kwargs.get("id")
-        message = generics.get_object_or_404(Message, id=message_id)
-        return message.sender and message.sender.id != request.user.id
+        message = get_request_message(request, view.kwargs.get("id"))
+        return message.sender_id and message.sender_id != request.user.id
@@ -0,0 +1,65 @@
+from .models import ReadMark
+
+
+def get_last_read_at(chat_id, user_id):
+    return (
+        ReadMark.objects.filter(chat_id=chat_id, user_id=user_id)
+        .values_list("last_read_at", flat=True)
+        .first()
+    )
+
+
+def advance_read_mark(chat_id, user_id, message):
+    updated = ReadMark.objects.filter(
+        chat_id=chat_id,
+        user_id=user_id,
+        last_read_at__lt=message.created_at,
+    ).update(
+        last_read_at=message.created_at,
+        last_read_message=message,
+    )
+
+    if updated:
+        return True
+
+    _, created = ReadMark.objects.get_or_create(
+        chat_id=chat_id,
+        user_id=user_id,
+        defaults={
+            "last_read_at": message.created_at,
+            "last_read_message": message,
+        },
+    )
+
+    return created
+
+
+def get_read_marks(chat_ids):
+    read_marks = {chat_id: [] for chat_id in chat_ids}
+
+    queryset = ReadMark.objects.filter(chat_id__in=chat_ids).select_related(
+        "user"
+    )
+
+    for mark in queryset:
+        read_marks[mark.chat_id].append(mark)
+
+    return read_marks
+
+
+def get_readers(read_marks, sender_id, created_at):
+    return [
+        mark.user
+        for mark in read_marks
+        if mark.user_id != sender_id and mark.last_read_at >= created_at
+    ]
+
+
+def get_unread_messages(chat, user_id):
+    messages = chat.messages.exclude(sender__id=user_id)
+    last_read_at = get_last_read_at(chat.id, user_id)
+
+    if last_read_at:
+        messages = messages.filter(created_at__gt=last_read_at)
+
+    return messages
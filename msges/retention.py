@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from application.retention import RetentionPolicy
+from chats.inbox import update_inbox_on_bulk_delete
+from users.anonymization import get_bot_username
+
+from .models import Message, MessageFile
+
+MESSAGES_RETENTION = timedelta(weeks=1)
+
+
+def get_messages_files(messages):
+    voices = messages.exclude(voice="").values_list("voice", flat=True)
+    items = MessageFile.objects.filter(
+        message__in=messages.values("id")
+    ).values_list("item", flat=True)
+
+    return [*voices, *items]
+
+
+class MessageRetentionPolicy(RetentionPolicy):
+    name = "messages"
+    ordering = "created_at"
+
+    def get_queryset(self):
+        time_threshold = timezone.now() - MESSAGES_RETENTION
+
+        return Message.objects.exclude(
+            sender__username=get_bot_username()
+        ).filter(created_at__lt=time_threshold)
+
+    def get_files(self, ids):
+        return get_messages_files(Message.objects.filter(id__in=ids))
+
+    def before_delete(self, ids):
+        update_inbox_on_bulk_delete(Message.objects.filter(id__in=ids))
+
+
+class SenderMessagesTrimPolicy(RetentionPolicy):
+    name = "sender_messages"
+    ordering = "created_at"
+
+    def __init__(self, chat_id, user_id, created_at):
+        self.chat_id = chat_id
+        self.user_id = user_id
+        self.created_at = created_at
+
+    def get_queryset(self):
+        return Message.objects.filter(
+            chat_id=self.chat_id,
+            sender_id=self.user_id,
+            created_at__lte=self.created_at,
+        )
+
+    def get_files(self, ids):
+        return get_messages_files(Message.objects.filter(id__in=ids))
+
+    def before_delete(self, ids):
+        update_inbox_on_bulk_delete(Message.objects.filter(id__in=ids))
@@ -0,0 +1,119 @@
+import html
+import re
+
+from django.db import connection
+from django.db.models import F, FloatField, Value
+from django.utils.module_loading import import_string
+
+from application.settings import MESSAGE_SEARCH_BACKEND
+
+FTS_TABLE = "msges_message_fts"
+FTS_IDS_TABLE = "msges_message_fts_ids"
+
+SNIPPET_START = "<mark>"
+SNIPPET_END = "</mark>"
+# The message text is escaped, so SQLite marks the matches with control
+# characters that are swapped for the tags afterwards
+SNIPPET_START_MARKER = "\x02"
+SNIPPET_END_MARKER = "\x03"
+SNIPPET_ELLIPSIS = "…"
+SNIPPET_TOKENS = 16
+
+
+def get_search_terms(query):
+    return re.findall(r"\w+", query or "")
+
+
+def render_snippet(snippet):
+    if snippet is None:
+        return None
+
+    return (
+        html.escape(snippet)
+        .replace(SNIPPET_START_MARKER, SNIPPET_START)
+        .replace(SNIPPET_END_MARKER, SNIPPET_END)
+    )
+
+
+class RegexSearchBackend:
+    def is_available(self):
+        return True
+
+    def search(self, queryset, query):
+        terms = get_search_terms(query)
+
+        if not terms:
+            return queryset.none()
+
+        for term in terms:
+            queryset = queryset.filter(text__iregex=re.escape(term))
+
+        return queryset.annotate(
+            rank=Value(0.0, output_field=FloatField()),
+            snippet=F("text"),
+        ).order_by("-created_at", "-id")
+
+    def reindex(self):
+        return 0
+
+
+class FTS5SearchBackend:
+    def is_available(self):
+        return connection.vendor == "sqlite"
+
+    def get_match_query(self, query):
+        return " ".join(f'"{term}"*' for term in get_search_terms(query))
+
+    def search(self, queryset, query):
+        match = self.get_match_query(query)
+
+        if not match:
+            return queryset.none()
+
+        return queryset.extra(
+            select={
+                "rank": f"bm25({FTS_TABLE})",
+                "snippet": f"snippet({FTS_TABLE}, 0, %s, %s, %s, %s)",
+            },
+            select_params=(
+                SNIPPET_START_MARKER,
+                SNIPPET_END_MARKER,
+                SNIPPET_ELLIPSIS,
+                SNIPPET_TOKENS,
+            ),
+            tables=[FTS_TABLE],
+            where=[
+                f"{FTS_TABLE}.message_id = msges_message.id",
+                f"{FTS_TABLE} MATCH %s",
+            ],
+            params=[match],
+        ).order_by("rank", "-created_at")
+
+    def reindex(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            cursor.execute(f"DELETE FROM {FTS_IDS_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (text, message_id, chat_id) "
+                "SELECT text, id, chat_id FROM msges_message "
+                "WHERE text IS NOT NULL"
+            )
+            count = cursor.rowcount
+            cursor.execute(
+                f"INSERT INTO {FTS_IDS_TABLE} (message_id, fts_rowid) "
+                f"SELECT message_id, rowid FROM {FTS_TABLE}"
+            )
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')"
+            )
+
+        return count
+
+
+def get_backend():
+    backend = import_string(MESSAGE_SEARCH_BACKEND)()
+
+    if not backend.is_available():
+        return RegexSearchBackend()
+
+    return backend
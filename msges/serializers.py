@@ -1,10 +1,15 @@
+from django.db import models
+from django.db.models import prefetch_related_objects
 from rest_framework import serializers
 
-from application.settings import PRODUCTION, Constants
+from application.representation import represent_datetime, represent_file
+from application.settings import PRODUCTION, READ_BY_COMPATIBILITY, Constants
 from users.anonymization import get_deleted_user
-from users.serializers import UserSerializer
+from users.serializers import UserSerializer, load_presence, represent_user
 
 from .models import Message, MessageFile
+from .reading import get_read_marks, get_readers
+from .search import render_snippet
 
 
 def get_default_fields(*args):
@@ -39,9 +44,117 @@ class MessageFileSerializer(serializers.ModelSerializer):
         fields = ["item"]
 
 
+def get_was_read_by(context, chat_id, sender_id, created_at):
+    read_marks = context.setdefault("read_marks", {})
+
+    if chat_id not in read_marks:
+        read_marks.update(get_read_marks([chat_id]))
+
+    readers = get_readers(read_marks[chat_id], sender_id, created_at)
+
+    if READ_BY_COMPATIBILITY:
+        load_presence(readers, context)
+        return [represent_user(reader, context) for reader in readers]
+
+    return [reader.id for reader in readers]
+
+
+def load_read_marks(messages, context):
+    read_marks = context.setdefault("read_marks", {})
+    read_marks.update(
+        get_read_marks(
+            {
+                message.chat_id
+                for message in messages
+                if message.chat_id not in read_marks
+            }
+        )
+    )
+
+    return read_marks
+
+
+class MessageListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        if isinstance(data, models.manager.BaseManager):
+            data = data.all()
+
+        self.read_marks = load_read_marks(data, self.context)
+        self.users = {}
+
+        users = [message.sender for message in data if message.sender]
+
+        if READ_BY_COMPATIBILITY:
+            users.extend(
+                mark.user
+                for marks in self.read_marks.values()
+                for mark in marks
+            )
+
+        load_presence(users, self.context)
+
+        return [self.represent(message) for message in data]
+
+    def get_user(self, user):
+        if user is None:
+            return get_deleted_user()
+
+        # Readers repeat on every message of the page
+        if user.id not in self.users:
+            self.users[user.id] = represent_user(user, self.context)
+
+        return dict(self.users[user.id])
+
+    def get_was_read_by(self, message):
+        readers = get_readers(
+            self.read_marks[message.chat_id],
+            message.sender_id,
+            message.created_at,
+        )
+
+        if READ_BY_COMPATIBILITY:
+            return [self.get_user(reader) for reader in readers]
+
+        return [reader.id for reader in readers]
+
+    def represent(self, message):
+        return {
+            "id": str(message.id),
+            "text": message.text,
+            "voice": represent_file(message.voice, self.context),
+            "sender": self.get_user(message.sender),
+            "chat": message.chat_id,
+            "files": [
+                {"item": represent_file(file.item, self.context)}
+                for file in message.files.all()
+            ],
+            "updated_at": represent_datetime(message.updated_at),
+            "created_at": represent_datetime(message.created_at),
+            "was_read_by": self.get_was_read_by(message),
+        }
+
+
+class MessageSearchListSerializer(MessageListSerializer):
+    def represent(self, message):
+        return {
+            **super().represent(message),
+            "rank": None if message.rank is None else float(message.rank),
+            "snippet": render_snippet(message.snippet),
+        }
+
+
 class MessageSerializer(serializers.ModelSerializer):
     sender = UserSerializer()
     files = MessageFileSerializer(many=True)
+    was_read_by = serializers.SerializerMethodField()
+
+    def get_was_read_by(self, instance):
+        return get_was_read_by(
+            self.context,
+            instance.chat_id,
+            instance.sender_id,
+            instance.created_at,
+        )
 
     def to_representation(self, instance):
         representation = super().to_representation(instance)
@@ -55,12 +168,6 @@ class MessageSerializer(serializers.ModelSerializer):
         if representation.get("sender") is None:
             representation["sender"] = get_deleted_user()
 
-        representation["was_read_by"] = UserSerializer(
-            instance.was_read_by,
-            context=self.context,
-            many=True,
-        ).data
-
         return representation
 
     class Meta:
@@ -69,6 +176,30 @@ class MessageSerializer(serializers.ModelSerializer):
         read_only_fields = get_default_readonly_fields(
             "chat", "voice", "files"
         )
+        list_serializer_class = MessageListSerializer
+
+
+class MessageSnapshotSerializer(serializers.ModelSerializer):
+    files = MessageFileSerializer(many=True)
+
+    class Meta:
+        model = Message
+        fields = [
+            field for field in get_default_fields() if field != "was_read_by"
+        ]
+
+
+class MessageSearchSerializer(MessageSerializer):
+    rank = serializers.FloatField(read_only=True)
+    snippet = serializers.SerializerMethodField()
+
+    def get_snippet(self, instance):
+        return render_snippet(instance.snippet)
+
+    class Meta:
+        model = Message
+        fields = get_default_fields("rank", "snippet")
+        list_serializer_class = MessageSearchListSerializer
 
 
 class MessageCreateSerializer(MessageSerializer):
@@ -93,6 +224,11 @@ class MessageCreateSerializer(MessageSerializer):
                     "If voice is provided, text and files must not be present"
                 )
 
+        if PRODUCTION and len(files) > Constants.MAX_MESSAGE_FILES_COUNT:
+            raise serializers.ValidationError(
+                f"Max files count is {Constants.MAX_MESSAGE_FILES_COUNT}"
+            )
+
         return attrs
 
     def create(self, validated_data):
@@ -102,21 +238,17 @@ class MessageCreateSerializer(MessageSerializer):
         validated_data.pop("files", [])
         message = Message.objects.create(**validated_data)
 
-        if files_data:
-            if (
-                PRODUCTION
-                and len(files_data) > Constants.MAX_MESSAGE_FILES_COUNT
-            ):
-                raise serializers.ValidationError(
-                    f"Max files count is {Constants.MAX_MESSAGE_FILES_COUNT}"
-                )
-
-            for file_data in files_data:
-                MessageFile.objects.create(message=message, item=file_data)
+        MessageFile.objects.bulk_create(
+            [
+                MessageFile(message=message, item=file_data)
+                for file_data in files_data
+            ]
+        )
+        prefetch_related_objects([message], "files")
 
         return message
 
     class Meta:
         model = Message
         fields = get_default_fields()
-        read_only_fields = get_default_readonly_fields()
+        read_only_fields = get_default_readonly_fields("chat")
@@ -0,0 +1,26 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from chats.counters import decrement, increment
+
+from .models import Message
+
+
+@receiver(post_save, sender=Message)
+def increment_messages_count_on_create(sender, instance, created, **kwargs):
+    if created and instance.sender_id:
+        increment(
+            "messages_count",
+            chat_id=instance.chat_id,
+            user_id=instance.sender_id,
+        )
+
+
+@receiver(post_delete, sender=Message)
+def decrement_messages_count_on_delete(sender, instance, **kwargs):
+    if instance.sender_id:
+        decrement(
+            "messages_count",
+            chat_id=instance.chat_id,
+            user_id=instance.sender_id,
+        )
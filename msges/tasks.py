@@ -1,41 +1,27 @@
-from datetime import timedelta
-
-from django.contrib.auth import get_user_model
 from django.db import transaction
-from django.utils import timezone
 
 from application.celery import app
-from application.decorators import throttle
-from application.settings import Constants
-from centrifugo.utils import publish_data
+from application.decorators import coalesce, once_per_window
+from application.retention import run_policy
+from application.settings import (
+    MESSAGES_LIMITS_WINDOW,
+    READ_EVENT_DEBOUNCE,
+    Constants,
+)
+from centrifugo.outbox import add_event
+from chats.counters import get_messages_count
+from chats.inbox import update_inbox_on_read
+from chats.membership import is_member
 from chats.models import Chat
 from users.anonymization import get_bot_username
 
-from .models import Message
-
-User = get_user_model()
-
-
-def publish_message(message, members, event):
-    data = {
-        "event": event,
-        "message": message,
-    }
-    publish_data(data=data, channels=members)
-
-
-@app.task
-def start_publishing_message(message, members, event):
-    publish_message(message, members, event)
-
+from .models import Message, ReadMark
+from .reading import advance_read_mark, get_unread_messages
+from .retention import MessageRetentionPolicy, SenderMessagesTrimPolicy
 
-def remove_old_messages():
-    with transaction.atomic():
-        time_threshold = timezone.now() - timedelta(weeks=1)
 
-        Message.objects.exclude(sender__username=get_bot_username()).filter(
-            created_at__lt=time_threshold
-        ).delete()
+def remove_old_messages(**kwargs):
+    return run_policy(MessageRetentionPolicy(), **kwargs)
 
 
 @app.task
@@ -44,66 +30,81 @@ def start_removing_old_messages():
 
 
 def update_messages_limits_for_user(user_id, chat_id):
-    with transaction.atomic():
-        chat = Chat.objects.get(id=chat_id)
-
-        messages = chat.messages.exclude(
-            sender__username=get_bot_username()
-        ).filter(sender__id=user_id)
-
-        messages_count = messages.count()
-
-        if messages_count < Constants.MAX_CHAT_MESSSAGES_PER_USER:
-            return
-
-        limit = (
-            messages_count
-            - Constants.MAX_CHAT_MESSSAGES_PER_USER
-            + Constants.MESSAGES_AMOUNT_TO_DELETE_ON_LIMIT
+    messages_count = get_messages_count(chat_id, user_id)
+
+    if messages_count < Constants.MAX_CHAT_MESSSAGES_PER_USER:
+        return
+
+    limit = (
+        messages_count
+        - Constants.MAX_CHAT_MESSSAGES_PER_USER
+        + Constants.MESSAGES_AMOUNT_TO_DELETE_ON_LIMIT
+    )
+
+    created_at = (
+        Message.objects.exclude(sender__username=get_bot_username())
+        .filter(chat_id=chat_id, sender_id=user_id)
+        .order_by("created_at")
+        .values_list("created_at", flat=True)[limit - 1 : limit]
+        .first()
+    )
+
+    if created_at:
+        run_policy(
+            SenderMessagesTrimPolicy(chat_id, user_id, created_at),
+            pause=0,
+            dry_run=False,
         )
 
-        messages.order_by("created_at")[:limit].delete()
-
 
 @app.task
-@throttle(interval=10, timeout=20)
+@once_per_window(MESSAGES_LIMITS_WINDOW)
 def start_updating_messages_limits_for_user(user_id, chat_id):
     update_messages_limits_for_user(user_id, chat_id)
 
 
 def read_chat_messages(user_id, chat_id):
     with transaction.atomic():
-        chat = Chat.objects.get(id=chat_id)
-        user = User.objects.get(id=user_id)
+        if not is_member(chat_id, user_id):
+            return False
 
-        if not chat.members.filter(id=user_id).exists():
-            return
-
-        messages = chat.messages.exclude(was_read_by=user)
+        chat = Chat.objects.get(id=chat_id)
 
-        def worker(message):
-            message.was_read_by.add(user)
-            return message.id
+        if not get_unread_messages(chat, user_id).exists():
+            return False
 
-        result = [worker(message) for message in messages]
+        advance_read_mark(chat.id, user_id, chat.messages.first())
+        update_inbox_on_read(chat, user_id)
 
-        if not result:
-            return
+    publish_read_event(chat.id, user_id)
 
-        return [
-            {
-                "user": user.id,
-                "chat": chat.id,
-                "messages": result,
-            },
-            chat.get_members_ids_list(),
-        ]
+    return True
 
 
 @app.task
 def start_reading_chat_messages(user_id, chat_id):
-    result = read_chat_messages(user_id, chat_id)
+    read_chat_messages(user_id, chat_id)
+
+
+@coalesce(READ_EVENT_DEBOUNCE)
+def publish_read_event(chat_id, user_id):
+    mark = (
+        ReadMark.objects.filter(chat_id=chat_id, user_id=user_id)
+        .values("last_read_message_id", "last_read_at")
+        .first()
+    )
+
+    if mark is None:
+        return None
+
+    message = {
+        "chat": chat_id,
+        "user": user_id,
+        "last_read_message": mark["last_read_message_id"],
+        "last_read_at": mark["last_read_at"],
+    }
+
+    with transaction.atomic():
+        add_event("read_up_to", message, chat_id)
 
-    if result:
-        message, members = result
-        publish_message(message, members, "read_all")
+    return message
@@ -0,0 +1,77 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from application import decorators
+from application.testing import create_chat, create_user, get_client
+from chats.membership import is_member
+from msges.models import Message
+from msges.reading import advance_read_mark
+
+
+class MessageQueriesTest(TestCase):
+    def setUp(self):
+        self.alice = create_user("alice")
+        self.bob = create_user("bob")
+        self.others = [create_user(f"user{index}") for index in range(5)]
+        self.chat = create_chat(self.alice, [self.bob, *self.others])
+        self.message = Message.objects.create(
+            chat=self.chat, sender=self.alice, text="Hello"
+        )
+
+        # Membership is cached in Redis after the first lookup
+        for user in (self.alice, self.bob):
+            is_member(self.chat.id, user.id)
+
+        self.enterContext(
+            mock.patch.object(decorators.start_deferred_call, "apply_async")
+        )
+
+    def read_by_others(self):
+        for user in self.others:
+            advance_read_mark(self.chat.id, user.id, self.message)
+
+    def test_get(self):
+        client = get_client(self.alice)
+        url = f"/api/message/{self.message.id}/"
+
+        with self.assertNumQueries(3):
+            self.assertEqual(client.get(url).status_code, 200)
+
+        self.read_by_others()
+
+        with self.assertNumQueries(3):
+            response = client.get(url)
+
+        self.assertEqual(len(response.json()["was_read_by"]), 5)
+
+    def test_patch(self):
+        with self.assertNumQueries(10):
+            response = get_client(self.alice).patch(
+                f"/api/message/{self.message.id}/",
+                {"text": "Edited"},
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_delete(self):
+        self.read_by_others()
+
+        with self.assertNumQueries(13):
+            response = get_client(self.alice).delete(
+                f"/api/message/{self.message.id}/"
+            )
+
+        self.assertEqual(response.status_code, 204)
+
+    def test_read(self):
+        self.read_by_others()
+
+        with self.assertNumQueries(13):
+            response = get_client(self.bob).post(
+                f"/api/message/{self.message.id}/read/"
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["was_read_by"]), 6)
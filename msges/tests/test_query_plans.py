@@ -0,0 +1,151 @@
+import re
+from unittest import mock, skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from application import decorators
+from application.retention import run_policy
+from application.testing import create_chat, create_user, get_client
+from centrifugo.client import CentrifugoClient
+from centrifugo.outbox import drain_outbox
+from chats.retention import ChatRetentionPolicy
+from msges.models import Message
+from msges.retention import MessageRetentionPolicy
+from msges.tasks import update_messages_limits_for_user
+
+SCAN = re.compile(
+    r"^SCAN (\w+)\b(?! VIRTUAL TABLE)(?: USING (?:COVERING )?INDEX (\w+))?"
+)
+TEMP_SORT = re.compile(r"USE TEMP B-TREE FOR (?!DISTINCT)")
+
+# The partial index holds only events that are not delivered yet
+ALLOWED_SCAN_INDEXES = {"centrifugo_outbox_pending"}
+
+# Sorts of rows already narrowed down by an index: full-text matches ranked
+# by bm25, the members of one chat and the users matching a search prefix
+ALLOWED_SORT_TABLES = {
+    "msges_message_fts",
+    "chats_chat_members",
+    "users_usersearchtoken",
+}
+
+
+def get_query_plan(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def get_problems(sql, tables):
+    problems = []
+
+    for line in get_query_plan(sql):
+        scan = SCAN.search(line)
+
+        if scan and scan[1] in tables and scan[2] not in ALLOWED_SCAN_INDEXES:
+            problems.append(line)
+        elif TEMP_SORT.search(line) and not any(
+            table in sql for table in ALLOWED_SORT_TABLES
+        ):
+            problems.append(line)
+
+    return problems
+
+
+@skipUnless(connection.vendor == "sqlite", "Plans are checked on SQLite")
+class QueryPlansTest(TestCase):
+    def setUp(self):
+        self.alice = create_user("alice", first_name="Ivan")
+        self.bob = create_user("bob")
+        self.chat = create_chat(self.alice, [self.bob])
+        self.other_chat = create_chat(self.bob, [self.alice])
+        self.messages = [
+            Message.objects.create(
+                chat=self.chat,
+                sender=self.bob if index % 2 else self.alice,
+                text=f"Hello {index}",
+            )
+            for index in range(5)
+        ]
+
+        self.enterContext(
+            mock.patch.object(decorators.start_deferred_call, "apply_async")
+        )
+
+    def assertUsesIndexes(self, name, func):
+        tables = set(connection.introspection.table_names())
+
+        with CaptureQueriesContext(connection) as queries:
+            func()
+
+        failures = []
+
+        for query in queries:
+            sql = query["sql"]
+
+            if not sql.startswith(("SELECT", "UPDATE", "DELETE")):
+                continue
+
+            problems = get_problems(sql, tables)
+
+            if problems:
+                failures.append("\n".join([sql, *problems]))
+
+        self.assertEqual(failures, [], f"{name}:\n" + "\n\n".join(failures))
+
+    def test_requests(self):
+        client = get_client(self.alice)
+        chat = str(self.chat.id)
+        message = self.messages[1]
+        own = self.messages[2]
+
+        requests = [
+            ("get", "/api/chats/", {}),
+            ("get", "/api/chats/", {"after": str(self.other_chat.id)}),
+            ("get", f"/api/chat/{chat}/", {}),
+            ("get", f"/api/chat/{chat}/members/", {}),
+            ("get", "/api/messages/", {"chat": chat}),
+            ("get", "/api/messages/", {"chat": chat, "before": message.id}),
+            ("get", "/api/messages/", {"chat": chat, "after": message.id}),
+            ("get", "/api/messages/search/", {"chat": chat, "q": "hello"}),
+            ("get", f"/api/message/{message.id}/", {}),
+            ("post", f"/api/message/{message.id}/read/", {}),
+            ("get", "/api/users/", {"search": "iva"}),
+            ("post", "/api/messages/", {"chat": chat, "text": "Hi"}),
+            ("patch", f"/api/message/{own.id}/", {"text": "Edited"}),
+            ("delete", f"/api/message/{own.id}/", {}),
+        ]
+
+        for method, url, data in requests:
+
+            def request():
+                response = getattr(client, method)(url, data)
+                self.assertLess(response.status_code, 300, url)
+
+            self.assertUsesIndexes(f"{method.upper()} {url}", request)
+
+    def test_background_tasks(self):
+        def send(method, payload):
+            return {"replies": [{"result": {}} for _ in payload["commands"]]}
+
+        self.enterContext(
+            mock.patch.object(CentrifugoClient, "send", side_effect=send)
+        )
+
+        tasks = {
+            "messages retention": lambda: run_policy(
+                MessageRetentionPolicy(), dry_run=True
+            ),
+            "chats retention": lambda: run_policy(
+                ChatRetentionPolicy(), dry_run=True
+            ),
+            "messages limits": lambda: update_messages_limits_for_user(
+                self.bob.id, self.chat.id
+            ),
+            "outbox drain": drain_outbox,
+        }
+
+        for name, task in tasks.items():
+            self.assertUsesIndexes(name, task)
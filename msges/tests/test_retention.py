@@ -0,0 +1,100 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from application.retention import run_policy
+from application.testing import create_chat, create_user
+from chats.inbox import rebuild_inbox
+from chats.models import Chat, InboxItem
+from msges.models import Message
+from msges.reading import advance_read_mark
+from msges.retention import MessageRetentionPolicy, SenderMessagesTrimPolicy
+
+
+class MessageRetentionInboxTest(TestCase):
+    def setUp(self):
+        self.alice = create_user("alice")
+        self.bob = create_user("bob")
+        self.carol = create_user("carol")
+        self.chat = create_chat(self.alice, [self.bob, self.carol])
+        self.stale_chat = create_chat(self.bob, [self.alice])
+
+        old = timezone.now() - timedelta(weeks=2)
+
+        self.old_messages = old_messages = [
+            self.create_message(self.chat, self.alice, old),
+            self.create_message(self.chat, self.bob, old),
+            self.create_message(self.chat, None, old),
+            self.create_message(self.chat, self.alice, old),
+            self.create_message(self.stale_chat, self.bob, old),
+            self.create_message(self.stale_chat, self.alice, old),
+        ]
+        self.create_message(self.chat, self.carol, timezone.now())
+
+        advance_read_mark(self.chat.id, self.bob.id, old_messages[1])
+        advance_read_mark(self.chat.id, self.carol.id, old_messages[3])
+
+        rebuild_inbox(Chat.objects.all())
+
+    def create_message(self, chat, sender, created_at):
+        index = Message.objects.count()
+
+        return Message.objects.create(
+            chat=chat,
+            sender=sender,
+            text=f"Message {index}",
+            created_at=created_at + timedelta(seconds=index),
+        )
+
+    def get_inbox(self):
+        return {
+            (item.user_id, item.chat_id): (
+                item.id,
+                item.unread_messages_count,
+                item.last_message and item.last_message["id"],
+            )
+            for item in InboxItem.objects.all()
+        }
+
+    def run_policy(self, policy, rows):
+        inbox = self.get_inbox()
+
+        metrics = run_policy(policy, batch_size=4, pause=0, dry_run=False)
+        self.assertEqual(metrics["rows"], rows)
+
+        updated = self.get_inbox()
+        rebuild_inbox(Chat.objects.all())
+        rebuilt = self.get_inbox()
+
+        self.assertEqual(
+            {key: item[0] for key, item in updated.items()},
+            {key: item[0] for key, item in inbox.items()},
+        )
+        self.assertEqual(
+            {key: item[1:] for key, item in updated.items()},
+            {key: item[1:] for key, item in rebuilt.items()},
+        )
+
+        return updated
+
+    def test_retention(self):
+        updated = self.run_policy(MessageRetentionPolicy(), 6)
+
+        self.assertIsNone(updated[(self.bob.id, self.stale_chat.id)][2])
+        self.assertEqual(updated[(self.alice.id, self.chat.id)][1], 1)
+
+    def test_sender_messages_trim(self):
+        updated = self.run_policy(
+            SenderMessagesTrimPolicy(
+                self.stale_chat.id,
+                self.alice.id,
+                self.old_messages[5].created_at,
+            ),
+            1,
+        )
+
+        self.assertEqual(
+            updated[(self.bob.id, self.stale_chat.id)][1:],
+            (0, str(self.old_messages[4].id)),
+        )
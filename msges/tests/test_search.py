@@ -0,0 +1,78 @@
+from django.db import connection
+from django.test import TestCase
+
+from application.testing import create_chat, create_user, get_client
+from msges.models import Message
+from msges.search import FTS5SearchBackend
+
+
+class FTS5SearchTest(TestCase):
+    def setUp(self):
+        self.backend = FTS5SearchBackend()
+        self.alice = create_user("alice")
+        self.chat = create_chat(self.alice, [])
+        self.apple = Message.objects.create(
+            chat=self.chat, sender=self.alice, text="Apple pie"
+        )
+        self.banana = Message.objects.create(
+            chat=self.chat, sender=self.alice, text="Banana split"
+        )
+
+    def search(self, query):
+        return list(
+            self.backend.search(Message.objects.all(), query).values_list(
+                "id", flat=True
+            )
+        )
+
+    def renumber(self):
+        # VACUUM may renumber the implicit rowids of msges_message
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE msges_message SET rowid = rowid + 1000")
+
+    def test_search(self):
+        self.assertEqual(self.search("appl"), [self.apple.id])
+        self.assertEqual(self.search("split banana"), [self.banana.id])
+        self.assertEqual(self.search("cherry"), [])
+
+    def test_update_and_delete_after_renumbering(self):
+        self.renumber()
+
+        self.apple.text = "Cherry pie"
+        self.apple.save(update_fields=["text"])
+        self.banana.delete()
+
+        self.assertEqual(self.search("apple"), [])
+        self.assertEqual(self.search("cherry"), [self.apple.id])
+        self.assertEqual(self.search("banana"), [])
+
+    def test_reindex(self):
+        self.renumber()
+
+        self.assertEqual(self.backend.reindex(), 2)
+
+        self.apple.delete()
+
+        self.assertEqual(self.search("pie"), [])
+        self.assertEqual(self.search("banana"), [self.banana.id])
+
+    def test_snippet_is_escaped(self):
+        Message.objects.create(
+            chat=self.chat,
+            sender=self.alice,
+            text='<script>alert("pie")</script> & pie',
+        )
+
+        response = get_client(self.alice).get(
+            "/api/messages/search/", {"chat": str(self.chat.id), "q": "pie"}
+        )
+        self.assertEqual(response.status_code, 200)
+
+        snippets = {result["snippet"] for result in response.json()["results"]}
+
+        self.assertIn(
+            "&lt;script&gt;alert(&quot;<mark>pie</mark>&quot;)"
+            "&lt;/script&gt; &amp; <mark>pie</mark>",
+            snippets,
+        )
+        self.assertIn("Apple <mark>pie</mark>", snippets)
@@ -0,0 +1,141 @@
+from datetime import timedelta
+
+from django.db.models import Prefetch
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from application.renderers import JSONRenderer
+from application.settings import Constants
+from application.testing import create_chat, create_user
+from chats.inbox import rebuild_inbox
+from chats.models import Chat
+from chats.serializers import InboxItemSerializer
+from msges.models import Message, MessageFile, ReadMark
+from msges.search import get_backend
+from msges.serializers import MessageSearchSerializer, MessageSerializer
+from users.models import User
+from users.presence import touch
+from users.serializers import UserSerializer
+
+
+def get_legacy_serializer(serializer_class):
+    class LegacyListSerializer(serializer_class.Meta.list_serializer_class):
+        def represent(self, item):
+            return self.child.to_representation(item)
+
+    return LegacyListSerializer
+
+
+class ListSerializersParityTest(TestCase):
+    def setUp(self):
+        now = timezone.now()
+
+        self.users = [
+            create_user(
+                f"user{index}",
+                bio="Bio" if index % 2 else None,
+                avatar=f"users/avatars/{index}.png" if index % 3 else None,
+            )
+            for index in range(6)
+        ]
+        self.reader = self.users[0]
+        self.chat = create_chat(self.reader, self.users[1:])
+        self.private_chat = create_chat(
+            self.reader, [self.users[1]], is_private=True
+        )
+
+        messages = Message.objects.bulk_create(
+            [
+                Message(
+                    chat=self.chat,
+                    sender=self.users[index % 6] if index % 7 else None,
+                    text=f"Parity message {index}",
+                    voice=f"msges/voices/{index}.ogg" if index % 5 else "",
+                    created_at=now - timedelta(seconds=index),
+                    updated_at=now - timedelta(seconds=index),
+                )
+                for index in range(20)
+            ]
+        )
+        Message.objects.create(
+            chat=self.private_chat, sender=self.users[1], text="Hi"
+        )
+
+        MessageFile.objects.bulk_create(
+            [
+                MessageFile(message=message, item=f"msges/files/{index}.png")
+                for index, message in enumerate(messages)
+                if index % 4 == 0
+            ]
+        )
+        ReadMark.objects.bulk_create(
+            [
+                ReadMark(
+                    chat=self.chat,
+                    user=user,
+                    last_read_message=messages[index * 3],
+                    last_read_at=messages[index * 3].created_at,
+                )
+                for index, user in enumerate(self.users)
+            ]
+        )
+
+        for user in self.users[::2]:
+            touch(user.id)
+
+        rebuild_inbox(Chat.objects.all())
+
+        self.request = Request(APIRequestFactory().get("/api/messages/"))
+        self.request.user = self.reader
+
+    def get_messages(self):
+        return (
+            Message.objects.filter(chat=self.chat)
+            .select_related("sender")
+            .prefetch_related("files")
+            .order_by("-created_at", "-id")
+        )
+
+    def assertSameOutput(self, serializer_class, page):
+        context = {"request": self.request}
+        legacy = get_legacy_serializer(serializer_class)(
+            page, child=serializer_class(), context=context
+        )
+        fast = serializer_class(page, many=True, context=context)
+
+        self.assertTrue(page)
+        self.assertEqual(
+            JSONRenderer().render(fast.data),
+            JSONRenderer().render(legacy.data),
+        )
+
+    def test_messages(self):
+        self.assertSameOutput(MessageSerializer, list(self.get_messages()))
+
+    def test_message_search(self):
+        page = list(get_backend().search(self.get_messages(), "parity"))
+
+        self.assertSameOutput(MessageSearchSerializer, page)
+
+    def test_inbox(self):
+        page = list(
+            self.reader.inbox.select_related("chat__creator").prefetch_related(
+                Prefetch(
+                    "chat__members",
+                    queryset=User.objects.order_by("id")[
+                        : Constants.CHAT_MEMBERS_PREVIEW_SIZE
+                    ],
+                    to_attr="members_preview",
+                )
+            )
+        )
+
+        self.assertEqual(len(page), 2)
+        self.assertSameOutput(InboxItemSerializer, page)
+
+    def test_users(self):
+        self.assertSameOutput(
+            UserSerializer, list(self.chat.members.order_by("id"))
+        )
@@ -0,0 +1,40 @@
+import threading
+
+from django.test import TransactionTestCase
+
+from msges.writer import GroupCommitWriter
+
+
+class GroupCommitWriterTest(TransactionTestCase):
+    def test_timed_out_write_is_skipped(self):
+        writer = GroupCommitWriter(batch_size=1, window=0, timeout=0.1)
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+        results = []
+
+        def slow_write():
+            started.set()
+            release.wait()
+            calls.append("slow")
+            return "slow"
+
+        def late_write():
+            calls.append("late")
+            return "late"
+
+        thread = threading.Thread(
+            target=lambda: results.append(writer.submit(slow_write))
+        )
+        thread.start()
+        started.wait()
+
+        with self.assertRaises(TimeoutError):
+            writer.submit(late_write)
+
+        release.set()
+        thread.join()
+
+        self.assertEqual(results, ["slow"])
+        self.assertEqual(writer.submit(lambda: "next"), "next")
+        self.assertEqual(calls, ["slow"])
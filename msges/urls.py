@@ -3,6 +3,7 @@ from django.urls import path
 from .views import (
     MessageDetail,
     MessageListCreateView,
+    MessageSearchView,
     read_all_messages,
     read_message,
 )
@@ -13,6 +14,11 @@ urlpatterns = [
         MessageListCreateView.as_view(),
         name="message-list-create",
     ),
+    path(
+        "messages/search/",
+        MessageSearchView.as_view(),
+        name="message-search",
+    ),
     path("messages/read_all/", read_all_messages, name="messages-read"),
     path("message/<uuid:id>/", MessageDetail.as_view(), name="message-detail"),
     path("message/<uuid:id>/read/", read_message, name="message-read"),
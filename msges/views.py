@@ -1,14 +1,25 @@
 from django.db import transaction
 from django.utils import timezone
-from rest_framework import filters, generics, status
+from rest_framework import filters, generics, serializers, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.exceptions import MethodNotAllowed, PermissionDenied
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from application.pagination import Pagination
-from application.settings import PRODUCTION
+from application.pagination import KeysetPagination, Pagination
+from application.replicas import ReplicaReadMixin
+from application.settings import PRODUCTION, Constants
+from centrifugo.outbox import add_event
+from chats.activity import touch_chat
+from chats.counters import get_messages_count
+from chats.inbox import (
+    update_inbox_on_create,
+    update_inbox_on_delete,
+    update_inbox_on_edit,
+    update_inbox_on_read,
+)
 from chats.models import Chat
+from chats.permissions import get_request_chat, is_request_chat_member
 
 from .models import Message
 from .permissions import (
@@ -16,17 +27,25 @@ from .permissions import (
     IsMessageChatMember,
     IsMessageSender,
     IsNotMessageSender,
+    get_request_message,
+)
+from .reading import advance_read_mark, get_read_marks
+from .search import get_backend
+from .serializers import (
+    MessageCreateSerializer,
+    MessageSearchSerializer,
+    MessageSerializer,
 )
-from .serializers import MessageCreateSerializer, MessageSerializer
 from .tasks import (
-    start_publishing_message,
+    publish_read_event,
     start_reading_chat_messages,
     start_updating_messages_limits_for_user,
 )
+from .writer import write
 
 
-class MessageListCreateView(generics.ListCreateAPIView):
-    pagination_class = Pagination
+class MessageListCreateView(ReplicaReadMixin, generics.ListCreateAPIView):
+    pagination_class = KeysetPagination
     serializer_class = MessageCreateSerializer
     permission_classes = [IsAuthenticated]
 
@@ -41,8 +60,11 @@ class MessageListCreateView(generics.ListCreateAPIView):
     def get_queryset(self):
         chat_id = self.request.GET.get("chat")
         if chat_id:
-            chat = generics.get_object_or_404(Chat, id=chat_id)
-            return chat.messages.all()
+            return (
+                Message.objects.filter(chat_id=chat_id)
+                .select_related("sender")
+                .prefetch_related("files")
+            )
         return Message.objects.none()
 
     def get_permissions(self):
@@ -72,49 +94,98 @@ class MessageListCreateView(generics.ListCreateAPIView):
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
+    def create_message(self, serializer, chat):
+        created_at = timezone.now()
+
+        message = serializer.save(
+            chat=chat,
+            created_at=created_at,
+            updated_at=created_at,
+        )
+
+        touch_chat(chat.id, created_at)
+        update_inbox_on_create(message)
+        add_event("create", serializer.data, chat.id)
+
+        return message
+
     def post(self, request, *args, **kwargs):
         chat_id = request.data.get("chat")
-        chat = generics.get_object_or_404(Chat, id=chat_id)
+        chat = get_request_chat(request, chat_id)
+
+        if not chat.is_member:
+            raise PermissionDenied()
+
+        context = self.get_serializer_context()
+        context["read_marks"] = {chat.id: []}
 
-        if PRODUCTION:
+        serializer = self.get_serializer(data=request.data, context=context)
+        serializer.is_valid(raise_exception=True)
+
+        write(lambda: self.create_message(serializer, chat))
+
+        if (
+            PRODUCTION
+            and get_messages_count(chat.id, request.user.id)
+            >= Constants.MAX_CHAT_MESSSAGES_PER_USER
+        ):
             start_updating_messages_limits_for_user.delay(
                 chat_id=chat.id,
                 user_id=request.user.id,
             )
 
-        serializer = self.get_serializer(
-            data=request.data, context={"request": request}
-        )
-        serializer.is_valid(raise_exception=True)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-        with transaction.atomic():
-            message = serializer.save()
 
-            message.updated_at = message.created_at
-            message.save()
+class MessageSearchView(ReplicaReadMixin, generics.ListAPIView):
+    pagination_class = Pagination
+    serializer_class = MessageSearchSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        query = self.request.query_params.get("q")
+        chat_id = self.request.query_params.get("chat")
+
+        if not query:
+            raise serializers.ValidationError(
+                "Search query is required in url"
+            )
 
-            chat.updated_at = message.created_at
-            chat.save()
+        if chat_id:
+            if not is_request_chat_member(self.request, chat_id):
+                raise PermissionDenied()
 
-        start_publishing_message.delay(
-            event="create",
-            message=MessageSerializer(
-                message, context={"request": request}
-            ).data,
-            members=chat.get_members_ids_list(),
+            queryset = Message.objects.filter(chat_id=chat_id)
+        else:
+            queryset = Message.objects.filter(
+                chat_id__in=Chat.members.through.objects.filter(
+                    user_id=self.request.user.id
+                ).values("chat_id")
+            )
+
+        queryset = queryset.select_related("sender").prefetch_related("files")
+        return get_backend().search(queryset, query)
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.get_queryset())
+
+        context = self.get_serializer_context()
+        context["read_marks"] = get_read_marks(
+            {message.chat_id for message in page}
         )
 
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+        serializer = self.get_serializer(page, many=True, context=context)
+        return self.get_paginated_response(serializer.data)
 
 
-class MessageDetail(generics.RetrieveUpdateDestroyAPIView):
+class MessageDetail(ReplicaReadMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Message.objects.all()
     serializer_class = MessageSerializer
     http_method_names = ["get", "patch", "delete"]
 
     def get_object(self):
         message_id = self.kwargs["id"]
-        return generics.get_object_or_404(Message, id=message_id)
+        return get_request_message(self.request, message_id)
 
     def get_permissions(self):
         if self.request.method == "GET":
@@ -138,7 +209,7 @@ class MessageDetail(generics.RetrieveUpdateDestroyAPIView):
         )
 
         serializer.is_valid(raise_exception=True)
-        message_text = message.text
+        message_text = serializer.validated_data.get("text", message.text)
 
         if message_text != message.text:
             with transaction.atomic():
@@ -147,26 +218,23 @@ class MessageDetail(generics.RetrieveUpdateDestroyAPIView):
                 message.updated_at = timezone.now()
                 message.save()
 
-                chat = generics.get_object_or_404(Chat, id=message.chat.id)
-
-            start_publishing_message.delay(
-                event="update",
-                message=serializer.data,
-                members=chat.get_members_ids_list(),
-            )
+                update_inbox_on_edit(message)
+                add_event("update", serializer.data, message.chat_id)
 
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def perform_destroy(self, instance):
-        chat = generics.get_object_or_404(Chat, id=instance.chat.id)
+        chat = instance.chat
+        data = MessageSerializer(instance).data
+        message_id = instance.id
 
-        start_publishing_message.delay(
-            event="delete",
-            message=MessageSerializer(instance).data,
-            members=chat.get_members_ids_list(),
-        )
+        with transaction.atomic():
+            super().perform_destroy(instance)
 
-        return super().perform_destroy(instance)
+            update_inbox_on_delete(
+                chat, message_id, instance.sender_id, instance.created_at
+            )
+            add_event("delete", data, chat.id)
 
     def put(self, request, *args, **kwargs):
         raise MethodNotAllowed()
@@ -175,21 +243,20 @@ class MessageDetail(generics.RetrieveUpdateDestroyAPIView):
 @api_view(["POST"])
 @permission_classes([IsAuthenticated, IsMessageChatMember, IsNotMessageSender])
 def read_message(request, id):
-    message = generics.get_object_or_404(Message, id=id)
-    message.was_read_by.add(request.user)
+    message = get_request_message(request, id)
 
-    publish_data = MessageSerializer(
+    with transaction.atomic():
+        advance_read_mark(message.chat_id, request.user.id, message)
+        update_inbox_on_read(message.chat, request.user.id)
+
+    publish_read_event(message.chat_id, request.user.id)
+
+    data = MessageSerializer(
         message,
         context={"request": request},
     ).data
 
-    start_publishing_message.delay(
-        event="read",
-        message=publish_data,
-        members=message.chat.get_members_ids_list(),
-    )
-
-    return Response(publish_data, status=status.HTTP_200_OK)
+    return Response(data, status=status.HTTP_200_OK)
 
 
 @api_view(["POST"])
@@ -203,13 +270,11 @@ def read_all_messages(request):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    chat = generics.get_object_or_404(Chat, id=chat_id)
-
-    if not chat.members.filter(id=request.user.id).exists():
+    if not is_request_chat_member(request, chat_id):
         raise PermissionDenied()
 
     start_reading_chat_messages.delay(
-        chat_id=chat.id,
+        chat_id=chat_id,
         user_id=request.user.id,
     )
 
@@ -0,0 +1,131 @@
+import contextvars
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from django.db import close_old_connections, transaction
+
+from application.settings import (
+    MESSAGE_GROUP_COMMIT,
+    MESSAGE_GROUP_COMMIT_BATCH_SIZE,
+    MESSAGE_GROUP_COMMIT_TIMEOUT,
+    MESSAGE_GROUP_COMMIT_WINDOW,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class GroupCommitWriter:
+    def __init__(
+        self,
+        batch_size=MESSAGE_GROUP_COMMIT_BATCH_SIZE,
+        window=MESSAGE_GROUP_COMMIT_WINDOW,
+        timeout=MESSAGE_GROUP_COMMIT_TIMEOUT,
+    ):
+        self.batch_size = batch_size
+        self.window = window
+        self.timeout = timeout
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(
+            target=self.run, name="group-commit-writer", daemon=True
+        )
+        self.thread.start()
+
+    def submit(self, func):
+        future = Future()
+        self.queue.put((contextvars.copy_context(), func, future))
+
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            # A write that has not started is dropped, so a retry of the
+            # request does not create a duplicate. A started one may commit
+            # and its result is awaited instead
+            if future.cancel():
+                raise
+
+            return future.result()
+
+    def get_batch(self):
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + self.window
+
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+
+            try:
+                if remaining > 0:
+                    batch.append(self.queue.get(timeout=remaining))
+                else:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+
+        return batch
+
+    def commit(self, batch):
+        results = []
+
+        with transaction.atomic():
+            for context, func, future in batch:
+                try:
+                    with transaction.atomic():
+                        results.append((future, context.run(func), None))
+                except Exception as error:
+                    results.append((future, None, error))
+
+        return results
+
+    def run(self):
+        while True:
+            batch = [
+                (context, func, future)
+                for context, func, future in self.get_batch()
+                if future.set_running_or_notify_cancel()
+            ]
+
+            if not batch:
+                continue
+
+            close_old_connections()
+
+            try:
+                results = self.commit(batch)
+            except Exception as error:
+                logger.exception(
+                    "Group commit of %s writes failed", len(batch)
+                )
+                results = [(future, None, error) for _, _, future in batch]
+
+            for future, result, error in results:
+                if error is None:
+                    future.set_result(result)
+                else:
+                    future.set_exception(error)
+
+
+_writer = None
+_writer_pid = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    global _writer, _writer_pid
+
+    with _writer_lock:
+        if _writer is None or _writer_pid != os.getpid():
+            _writer = GroupCommitWriter()
+            _writer_pid = os.getpid()
+
+    return _writer
+
+
+def write(func):
+    if not MESSAGE_GROUP_COMMIT:
+        with transaction.atomic():
+            return func()
+
+    return get_writer().submit(func)
@@ -0,0 +1,20 @@
+import logging
+
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .presence import touch
+
+logger = logging.getLogger(__name__)
+
+
+class PresenceJWTAuthentication(JWTAuthentication):
+    def authenticate(self, request):
+        result = super().authenticate(request)
+
+        if result is not None:
+            try:
+                touch(result[0].id)
+            except Exception:
+                logger.exception("Failed to update user presence")
+
+        return result
@@ -0,0 +1,19 @@
+from rest_framework import filters
+
+from application.search import get_rank
+
+from .search import search_users
+
+
+class SearchFilter(filters.SearchFilter):
+    def filter_queryset(self, request, queryset, view):
+        search = self.get_search_terms(request)
+
+        if not search:
+            return queryset
+
+        ranks = search_users(" ".join(search))
+
+        return queryset.filter(id__in=ranks).order_by(
+            get_rank(id=ranks).desc(), *queryset.model._meta.ordering
+        )
@@ -0,0 +1,42 @@
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+from application.search import get_tokens
+
+
+def fill_search_tokens(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    UserSearchToken = apps.get_model('users', 'UserSearchToken')
+
+    tokens = [
+        UserSearchToken(user_id=user.id, token=token)
+        for user in User.objects.only('username', 'first_name', 'last_name').iterator()
+        for token in get_tokens(user.username, user.first_name, user.last_name)
+    ]
+
+    UserSearchToken.objects.bulk_create(tokens, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSearchToken',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('token', models.CharField(max_length=64)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['token', 'user'], name='users_users_token_836861_idx')],
+                'unique_together': {('user', 'token')},
+            },
+        ),
+        migrations.RunPython(fill_search_tokens, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+import application.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_search_tokens'),
+    ]
+
+    operations = [
+        # The default is only used by Python, and altering the field would
+        # rebuild the table on SQLite
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='user',
+                    name='id',
+                    field=models.UUIDField(default=application.ids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+            ],
+        ),
+    ]
@@ -5,6 +5,7 @@ from django.core.validators import FileExtensionValidator
 from django.db import models
 from django.utils import timezone
 
+from application.ids import uuid7
 from application.settings import Constants
 
 
@@ -12,7 +13,7 @@ class User(AbstractUser):
     id = models.UUIDField(
         editable=False,
         primary_key=True,
-        default=uuid.uuid4,
+        default=uuid7,
     )
 
     bio = models.CharField(
@@ -79,3 +80,26 @@ class UserIP(models.Model):
 
     def __str__(self):
         return f"{self.user}:{self.ip_address}"
+
+
+class UserSearchToken(models.Model):
+    id = models.UUIDField(
+        editable=False,
+        primary_key=True,
+        default=uuid.uuid4,
+    )
+
+    user = models.ForeignKey(
+        User,
+        related_name="search_tokens",
+        on_delete=models.CASCADE,
+    )
+
+    token = models.CharField(max_length=64)
+
+    def __str__(self):
+        return f"{self.user}:{self.token}"
+
+    class Meta:
+        unique_together = ["user", "token"]
+        indexes = [models.Index(fields=["token", "user"])]
@@ -0,0 +1,85 @@
+import time
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+from django_redis import get_redis_connection
+
+User = get_user_model()
+
+PRESENCE_KEY = "users:presence"
+PRESENCE_FLUSHED_AT_KEY = "users:presence:flushed_at"
+ONLINE_TIMEOUT = timedelta(minutes=5)
+
+
+def to_datetime(timestamp):
+    return datetime.fromtimestamp(timestamp, tz=dt_timezone.utc)
+
+
+def is_online(last_online_at):
+    return last_online_at >= timezone.now() - ONLINE_TIMEOUT
+
+
+def touch(user_id):
+    get_redis_connection("default").zadd(
+        PRESENCE_KEY, {str(user_id): time.time()}
+    )
+
+
+def get_last_online_at(user_ids):
+    user_ids = list(user_ids)
+
+    if not user_ids:
+        return {}
+
+    scores = get_redis_connection("default").zmscore(
+        PRESENCE_KEY, [str(user_id) for user_id in user_ids]
+    )
+
+    return {
+        user_id: to_datetime(score)
+        for user_id, score in zip(user_ids, scores)
+        if score is not None
+    }
+
+
+def flush_presence():
+    connection = get_redis_connection("default")
+
+    now = time.time()
+    flushed_at = float(connection.get(PRESENCE_FLUSHED_AT_KEY) or 0)
+    threshold = now - ONLINE_TIMEOUT.total_seconds()
+
+    seen = connection.zrangebyscore(
+        PRESENCE_KEY, flushed_at, "+inf", withscores=True
+    )
+    offline = connection.zrangebyscore(PRESENCE_KEY, "-inf", threshold)
+
+    with transaction.atomic():
+        User.objects.bulk_update(
+            [
+                User(
+                    id=user_id.decode(),
+                    is_online=True,
+                    last_online_at=to_datetime(score),
+                )
+                for user_id, score in seen
+                if score > threshold
+            ],
+            ["is_online", "last_online_at"],
+            batch_size=500,
+        )
+
+        User.objects.filter(
+            id__in=[user_id.decode() for user_id in offline],
+            is_online=True,
+        ).update(is_online=False)
+
+        User.objects.filter(
+            last_online_at__lt=to_datetime(threshold), is_online=True
+        ).update(is_online=False)
+
+    connection.zremrangebyscore(PRESENCE_KEY, "-inf", threshold)
+    connection.set(PRESENCE_FLUSHED_AT_KEY, now)
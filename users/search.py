@@ -0,0 +1,29 @@
+from application.search import get_tokens, search_tokens, update_tokens
+
+from .models import UserSearchToken
+
+INDEXED_FIELDS = {"username", "first_name", "last_name"}
+
+
+def get_user_tokens(user):
+    return get_tokens(user.username, user.first_name, user.last_name)
+
+
+def update_user_search_tokens(user):
+    update_tokens(
+        UserSearchToken.objects.filter(user=user),
+        lambda tokens: UserSearchToken.objects.bulk_create(
+            [UserSearchToken(user=user, token=token) for token in tokens],
+            ignore_conflicts=True,
+        ),
+        get_user_tokens(user),
+    )
+
+
+def search_users(query, user_ids=None):
+    queryset = UserSearchToken.objects.all()
+
+    if user_ids is not None:
+        queryset = queryset.filter(user_id__in=user_ids)
+
+    return search_tokens(queryset, "user_id", query)
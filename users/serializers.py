@@ -2,11 +2,14 @@ import re
 
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
+from django.db import models
 from rest_framework import serializers
 
+from application.representation import represent_datetime, represent_file
 from application.settings import Constants
 from chats.models import Chat
 from users.anonymization import get_bot_username, get_deleted_user
+from users.presence import get_last_online_at, is_online
 
 User = get_user_model()
 
@@ -98,14 +101,90 @@ class UserCreateSerializer(serializers.ModelSerializer):
         read_only_fields = get_default_readonly_fields()
 
 
+def load_presence(users, context):
+    presence = context.setdefault("presence", {})
+    user_ids = {user.id for user in users if user.id not in presence}
+
+    # Offline users are stored too, so they are not looked up one by one
+    presence.update(dict.fromkeys(user_ids))
+    presence.update(get_last_online_at(user_ids))
+
+
+def represent_user(user, context):
+    if user is None:
+        return get_deleted_user()
+
+    presence = context.setdefault("presence", {})
+
+    if user.id not in presence:
+        presence.update(get_last_online_at([user.id]))
+
+    last_online_at = presence.get(user.id)
+    representation = {
+        "id": str(user.id),
+        "username": user.username,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "bio": user.bio,
+        "avatar": represent_file(user.avatar, context),
+        "is_online": user.is_online,
+        "last_online_at": user.last_online_at,
+    }
+
+    if last_online_at:
+        representation["is_online"] = is_online(last_online_at)
+
+    if last_online_at and last_online_at > user.last_online_at:
+        representation["last_online_at"] = last_online_at
+
+    representation["last_online_at"] = represent_datetime(
+        representation["last_online_at"]
+    )
+
+    return representation
+
+
+class UserListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        if isinstance(data, models.manager.BaseManager):
+            data = data.all()
+
+        load_presence(data, self.context)
+
+        return [self.represent(user) for user in data]
+
+    def represent(self, user):
+        return represent_user(user, self.context)
+
+
 class UserSerializer(serializers.ModelSerializer):
+    def get_presence(self, instance):
+        presence = self.context.setdefault("presence", {})
+
+        if instance.id not in presence:
+            presence.update(get_last_online_at([instance.id]))
+
+        return presence.get(instance.id)
+
     def to_representation(self, instance):
         if instance is None:
             return get_deleted_user()
 
-        return super().to_representation(instance)
+        representation = super().to_representation(instance)
+        last_online_at = self.get_presence(instance)
+
+        if last_online_at:
+            representation["is_online"] = is_online(last_online_at)
+
+        if last_online_at and last_online_at > instance.last_online_at:
+            representation["last_online_at"] = self.fields[
+                "last_online_at"
+            ].to_representation(last_online_at)
+
+        return representation
 
     class Meta:
         model = User
         fields = get_default_fields()
         read_only_fields = get_default_readonly_fields()
+        list_serializer_class = UserListSerializer
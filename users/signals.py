@@ -0,0 +1,15 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .search import INDEXED_FIELDS, update_user_search_tokens
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+def update_search_tokens_on_save(sender, instance, update_fields, **kwargs):
+    if update_fields and not INDEXED_FIELDS.intersection(update_fields):
+        return
+
+    update_user_search_tokens(instance)
@@ -1,15 +1,18 @@
 from django.contrib.auth import get_user_model
 from django.db import transaction
-from rest_framework import filters, generics, serializers, status
+from rest_framework import generics, serializers, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.exceptions import MethodNotAllowed
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 
 from application.pagination import Pagination
+from application.replicas import ReplicaReadMixin
 from application.settings import PRODUCTION, Constants
+from chats.inbox import update_inbox_on_user_update
 from users.models import UserIP
 
+from .filters import SearchFilter
 from .serializers import UserCreateSerializer, UserSerializer
 
 User = get_user_model()
@@ -52,7 +55,7 @@ class UserCreate(generics.CreateAPIView):
                 )
 
 
-class UserDetail(generics.RetrieveUpdateDestroyAPIView):
+class UserDetail(ReplicaReadMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
@@ -71,7 +74,9 @@ class UserDetail(generics.RetrieveUpdateDestroyAPIView):
         if self.request.user != self.get_object():
             self.permission_denied(self.request)
 
-        serializer.save()
+        with transaction.atomic():
+            user = serializer.save()
+            update_inbox_on_user_update(user)
 
     def perform_destroy(self, instance):
         if self.request.user != instance:
@@ -83,12 +88,11 @@ class UserDetail(generics.RetrieveUpdateDestroyAPIView):
         raise MethodNotAllowed()
 
 
-class UserList(generics.ListAPIView):
+class UserList(ReplicaReadMixin, generics.ListAPIView):
     pagination_class = Pagination
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter]
-    search_fields = ["$username", "$first_name", "$last_name"]
+    filter_backends = [SearchFilter]
 
     def get_queryset(self):
         return User.objects.exclude(id=self.request.user.id)